@@ -3,6 +3,14 @@ class Config:
     UPDATE_RATE = 16
     PLOT_HEIGHT = 600
     WINDOW_SIZE = (1200, 800)
+    RECEIVER_QUEUE_PACKETS = 64  # packets buffered between socket and processing threads (16 packets/s)
+    RECEIVER_QUEUE_POLICY = 'block'  # 'block' = backpressure when full, 'drop' = discard newest packet
+    RECORDING_BACKEND = 'stream'  # 'stream' = write to disk while recording, 'memory' = keep in RAM (1M sample cap)
+    RECORDING_FORMAT = 'csv'  # 'csv', 'binary' (int16 .bin + .json sidecar) or 'chunked' (compressed .otbc)
+    DEVICE_BUFFER_WARNING = 1000  # Buffer channel level (raw units) above which a device backlog warning is raised
+    ELECTRODE_LAYOUT = '8x8'  # electrode array on the HDsEMG channels: '8x8', '13x5', '4x8', '2x(4x8)' (see electrode_grid.LAYOUTS)
+    SPATIAL_FILTER = 'ndd'  # 'spatial' stage until one is picked on the Heatmap tab: 'sd_long', 'sd_trans', 'dd_long', 'dd_trans' or 'ndd' (Laplacian), see spatial.SPATIAL_FILTERS
+    USE_OPENGL = False  # opt-in OpenGL plot viewports; falls back to raster when no hardware GL context exists
     '''
     # Configure device with specific parameters
     FSAMP = 0  # 2000 Hz
@@ -0,0 +1,87 @@
+"""Min/max envelope decimation for plotting long buffers."""
+
+import numpy as np
+
+
+class MinMaxDecimator:
+    """Incrementally maintained min/max envelope of a scrolling RingBuffer.
+
+    Samples are grouped into bins of `bin_size` by their absolute index
+    (ring.total at the time they were appended), so a bin keeps its value as
+    the window scrolls and only the bins touched by new samples are
+    recomputed. Each bin is drawn as two points (its min and its max), so a
+    plot `num_bins` pixels wide gets about 2 points per pixel column and
+    still shows every peak. Like the ring, bin values are stored twice so
+    the time-ordered bins are always one contiguous slice.
+    """
+
+    def __init__(self, num_channels, length, num_bins, dt):
+        self.num_channels = num_channels
+        self.length = length
+        self.bin_size = max(1, -(-length // max(1, num_bins)))  # ceil
+        self.num_bins = max(1, length // self.bin_size)  # bins that fit completely in the window
+        self.dt = dt
+
+        self.mins = np.zeros((num_channels, 2 * self.num_bins))
+        self.maxs = np.zeros((num_channels, 2 * self.num_bins))
+        self.total = 0  # samples already folded into the bins
+
+        self._bin_offsets = np.arange(self.num_bins) * self.bin_size * dt
+        self.x = np.empty(2 * self.num_bins)
+        self._y = np.empty((num_channels, 2 * self.num_bins))
+
+    def update(self, ring):
+        """Fold the samples appended to `ring` since the last update into the bins."""
+        bs = self.bin_size
+        if ring.total <= self.total:
+            return
+        first_bin = self.total // bs  # may be partially filled already; recomputed whole
+        last_bin = (ring.total - 1) // bs
+        first_bin = max(first_bin, last_bin - self.num_bins + 1)
+        seg = ring.latest(ring.total - first_bin * bs)
+
+        count = last_bin - first_bin + 1
+        mins = np.empty((self.num_channels, count))
+        maxs = np.empty((self.num_channels, count))
+        nfull = seg.shape[1] // bs
+        if nfull:
+            blocks = seg[:, :nfull * bs].reshape(self.num_channels, nfull, bs)
+            blocks.min(axis=2, out=mins[:, :nfull])
+            blocks.max(axis=2, out=maxs[:, :nfull])
+        if nfull < count:
+            # Bin still being filled
+            mins[:, nfull] = seg[:, nfull * bs:].min(axis=1)
+            maxs[:, nfull] = seg[:, nfull * bs:].max(axis=1)
+
+        pos = (first_bin + np.arange(count)) % self.num_bins
+        for ring_pos in (pos, pos + self.num_bins):
+            self.mins[:, ring_pos] = mins
+            self.maxs[:, ring_pos] = maxs
+        self.total = ring.total
+
+    def rebuild(self, ring):
+        """Recompute every bin from the samples currently in `ring`."""
+        self.mins[:] = ring.fill_value
+        self.maxs[:] = ring.fill_value
+        self.total = 0
+        self.update(ring)
+
+    def envelope(self):
+        """Return (x, y): y of shape (channels, 2 * num_bins), min/max interleaved, oldest first.
+
+        x is in seconds from the left edge of the window, with the newest
+        sample at (length - 1) * dt.
+        """
+        bs = self.bin_size
+        last_bin = (self.total - 1) // bs
+        first_bin = last_bin - self.num_bins + 1
+        pos = first_bin % self.num_bins
+        self._y[:, 0::2] = self.mins[:, pos:pos + self.num_bins]
+        self._y[:, 1::2] = self.maxs[:, pos:pos + self.num_bins]
+
+        # First bin starts this many samples after the window's oldest sample
+        start = first_bin * bs - (self.total - self.length)
+        np.add(self._bin_offsets, start * self.dt, out=self.x[0::2])
+        np.add(self.x[0::2], (bs - 1) * self.dt, out=self.x[1::2])
+        self.x[-1] = (self.length - 1) * self.dt  # newest bin may be partial
+        return self.x, self._y
@@ -3,9 +3,10 @@ import sys
 
 
 class SessantaquattroPlus:
-    def __init__(self, host="0.0.0.0", port=45454):
+    def __init__(self, host="0.0.0.0", port=45454, check_network=True):
         self.host = host
         self.port = port
+        self.check_network = check_network  # False when a local simulator connects instead of the device
         self.nchannels = 72
         self.frequency = 2000
         self.server_socket = None
@@ -92,7 +93,7 @@ class SessantaquattroPlus:
         
     def start_server(self, connection_timeout=10):
         # Pre-flight checks
-        if not self.is_connected_to_device_network():
+        if self.check_network and not self.is_connected_to_device_network():
             print("Please connect to the Sessantaquattroplus device's WiFi network first")
             sys.exit(1)
         
@@ -0,0 +1,174 @@
+"""Electrode grid layouts: mapping between channel vectors and 2-D grids.
+
+Layouts are registered by name (see LAYOUTS / get_layout). Each layout is an
+index array (grid position -> channel) plus neighbor tables precomputed
+from it, so heatmaps, bad-channel interpolation and spatial filters work
+on any array shape without their own row/column loops.
+"""
+
+import numpy as np
+from scipy import sparse
+
+# (row, col) offsets of the 4- and 8-connected neighborhoods
+NEIGHBOR_OFFSETS_4 = ((-1, 0), (1, 0), (0, -1), (0, 1))
+NEIGHBOR_OFFSETS_8 = NEIGHBOR_OFFSETS_4 + ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class ElectrodeGrid:
+    """Channel <-> (row, col) mapping of an electrode array, precomputed once.
+
+    `index_map[row, col]` is the channel at that position, or -1 where the
+    grid has no electrode. Converting a channel vector to a grid (and back)
+    is a single fancy-indexing operation.
+
+    Neighbors:
+        neighbor_table: (num_channels, 8) channel indices of the 8-connected
+            neighbors, -1 where there is none (edge or empty position);
+            columns follow NEIGHBOR_OFFSETS_8, so the first 4 are the
+            4-connected neighbors
+        neighbors: list with the valid 8-connected neighbors of each channel
+    """
+
+    def __init__(self, index_map, name=None):
+        self.index_map = np.asarray(index_map, dtype=np.intp)
+        self.name = name
+        self.rows, self.cols = self.index_map.shape
+        self.mask = self.index_map >= 0  # positions that hold an electrode
+        self.is_full = bool(self.mask.all())
+
+        channels = self.index_map[self.mask]
+        self.num_channels = int(channels.max()) + 1 if channels.size else 0
+        # Position of every channel (channels not on the grid keep -1)
+        self.channel_rows = np.full(self.num_channels, -1, dtype=np.intp)
+        self.channel_cols = np.full(self.num_channels, -1, dtype=np.intp)
+        grid_rows, grid_cols = np.nonzero(self.mask)
+        self.channel_rows[channels] = grid_rows
+        self.channel_cols[channels] = grid_cols
+
+        self.neighbor_table = self._build_neighbor_table(NEIGHBOR_OFFSETS_8)
+        self.neighbors = [row[row >= 0] for row in self.neighbor_table]
+
+    def _build_neighbor_table(self, offsets):
+        padded = np.pad(self.index_map, 1, constant_values=-1)
+        table = np.full((self.num_channels, len(offsets)), -1, dtype=np.intp)
+        on_grid = self.channel_rows >= 0
+        for k, (dr, dc) in enumerate(offsets):
+            table[on_grid, k] = padded[self.channel_rows[on_grid] + 1 + dr, self.channel_cols[on_grid] + 1 + dc]
+        return table
+
+    @classmethod
+    def column_major(cls, rows, cols, name=None, missing=()):
+        """Channels numbered up each column, starting at the last row of column 0.
+
+        This is the Sessantaquattro+ 8x8 numbering: channel_idx = col * rows + (rows - 1 - row).
+        `missing` lists (row, col) positions without an electrode; they are
+        skipped in the numbering.
+        """
+        index_map = np.full((rows, cols), -1, dtype=np.intp)
+        absent = set(missing)
+        channel = 0
+        for col in range(cols):
+            for row in range(rows - 1, -1, -1):
+                if (row, col) not in absent:
+                    index_map[row, col] = channel
+                    channel += 1
+        return cls(index_map, name=name)
+
+    @classmethod
+    def combine(cls, grids, name=None, gap=1):
+        """Place several arrays on one device side by side.
+
+        Channels of each array follow those of the previous one, and arrays
+        are separated by `gap` empty columns so they never count as neighbors.
+        """
+        rows = max(g.rows for g in grids)
+        cols = sum(g.cols for g in grids) + gap * (len(grids) - 1)
+        index_map = np.full((rows, cols), -1, dtype=np.intp)
+        col, first_channel = 0, 0
+        for g in grids:
+            block = index_map[:g.rows, col:col + g.cols]
+            block[g.mask] = g.index_map[g.mask] + first_channel
+            col += g.cols + gap
+            first_channel += g.num_channels
+        return cls(index_map, name=name)
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    def to_grid(self, values, out=None, fill=0.0):
+        """Arrange a per-channel vector (at least num_channels long) as a (rows, cols) grid."""
+        values = np.asarray(values)
+        if self.is_full:
+            return np.take(values, self.index_map, out=out)
+        if out is None:
+            out = np.full(self.shape, fill, dtype=np.result_type(values.dtype, np.float64))
+        out[self.mask] = values[self.index_map[self.mask]]
+        return out
+
+    def to_channels(self, grid, out=None):
+        """Inverse of to_grid: write grid values back into a per-channel vector."""
+        if out is None:
+            out = np.zeros(self.num_channels, dtype=np.asarray(grid).dtype)
+        out[self.index_map[self.mask]] = np.asarray(grid)[self.mask]
+        return out
+
+    def channel_numbers(self):
+        """1-based channel number at each grid position (0 where there is no electrode)."""
+        return np.where(self.mask, self.index_map + 1, 0)
+
+    def adjacency_matrix(self, connectivity=8):
+        """Sparse (num_channels, num_channels) 0/1 matrix; A[i, j] = 1 if j neighbors i."""
+        table = self.neighbor_table[:, :connectivity]
+        rows, cols = np.nonzero(table >= 0)
+        return sparse.csr_matrix((np.ones(rows.size), (rows, table[rows, cols])),
+                                 shape=(self.num_channels, self.num_channels))
+
+    def neighbor_mean(self, values, valid=None, connectivity=8):
+        """Mean of each channel's neighbors, using only neighbors flagged in `valid`.
+
+        Args:
+            values: per-channel vector (at least num_channels long)
+            valid: optional boolean per-channel vector; invalid channels are not used as neighbors
+            connectivity: 4 or 8
+
+        Returns:
+            tuple: (mean, count) per channel; mean is NaN where count is 0
+        """
+        table = self.neighbor_table[:, :connectivity]
+        present = table >= 0
+        if valid is not None:
+            present &= np.asarray(valid)[np.where(present, table, 0)]
+        count = present.sum(axis=1)
+        total = np.where(present, np.asarray(values)[np.where(present, table, 0)], 0.0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+        return mean, count
+
+
+# Layout registry: name -> ElectrodeGrid. Add new arrays here (or with register_layout).
+LAYOUTS = {}
+
+
+def register_layout(name, grid):
+    grid.name = name
+    LAYOUTS[name] = grid
+    return grid
+
+
+def get_layout(name):
+    """Look up a registered layout by name."""
+    try:
+        return LAYOUTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown electrode layout '{name}' (available: {', '.join(LAYOUTS)})") from None
+
+
+# 8x8 HDsEMG array of the Sessantaquattro+ (first 64 channels)
+SESSANTAQUATTRO_8X8 = register_layout('8x8', ElectrodeGrid.column_major(8, 8))
+# 13x5 array: 64 electrodes, the corner position at row 0 / column 0 has none
+register_layout('13x5', ElectrodeGrid.column_major(13, 5, missing=[(0, 0)]))
+# 4x8 array (32 channels)
+register_layout('4x8', ElectrodeGrid.column_major(4, 8))
+# Two 4x8 arrays on one device (64 channels), shown side by side
+register_layout('2x(4x8)', ElectrodeGrid.combine([LAYOUTS['4x8'], LAYOUTS['4x8']]))
@@ -0,0 +1,124 @@
+"""Always-on latency histograms for the acquisition loop.
+
+Timings are taken with time.perf_counter_ns() and recorded into log-scale
+histograms (4 buckets per power of two, so percentiles are within ~12% of
+the true value). Recording is a few integer operations and a list
+increment, cheap enough to leave on for every packet.
+"""
+
+import time
+
+SUB_BUCKET_BITS = 2
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+NUM_BUCKETS = 64 * SUB_BUCKETS
+
+
+def _bucket(ns):
+    if ns < SUB_BUCKETS:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return (bits - SUB_BUCKET_BITS) * SUB_BUCKETS + ((ns >> (bits - SUB_BUCKET_BITS - 1)) & (SUB_BUCKETS - 1))
+
+
+def _bucket_bounds(bucket):
+    """Return (lower, upper) nanoseconds covered by a bucket."""
+    if bucket < SUB_BUCKETS:
+        return bucket, bucket + 1
+    shift = bucket // SUB_BUCKETS - 1
+    lower = (SUB_BUCKETS + bucket % SUB_BUCKETS) << shift
+    return lower, lower + (1 << shift)
+
+
+class LatencyHistogram:
+    """Histogram of durations in nanoseconds, written by one thread."""
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def reset(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def percentile(self, p, counts=None, count=None):
+        """Approximate p-th percentile in nanoseconds (bucket midpoint, capped at the max)."""
+        counts = self.counts if counts is None else counts
+        count = self.count if count is None else count
+        if not count:
+            return 0.0
+        rank = p / 100 * count
+        seen = 0
+        for bucket, n in enumerate(counts):
+            seen += n
+            if n and seen >= rank:
+                lower, upper = _bucket_bounds(bucket)
+                return min((lower + upper) / 2, self.max_ns)
+        return float(self.max_ns)
+
+    def snapshot(self):
+        """Summary in milliseconds.
+
+        Returns:
+            dict: count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, total_ms
+        """
+        counts = list(self.counts)  # copy: the writer thread keeps recording
+        count = sum(counts)
+        total_ns = self.total_ns
+        return {
+            'count': count,
+            'mean_ms': total_ns / count / 1e6 if count else 0.0,
+            'p50_ms': self.percentile(50, counts, count) / 1e6,
+            'p95_ms': self.percentile(95, counts, count) / 1e6,
+            'p99_ms': self.percentile(99, counts, count) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+            'total_ms': total_ns / 1e6,
+        }
+
+
+class LatencyMetrics:
+    """Named LatencyHistograms, created on first use.
+
+    Each name should be recorded from a single thread; any thread may read
+    a snapshot.
+
+    Example:
+        start = time.perf_counter_ns()
+        decode(...)
+        metrics.record('decode', time.perf_counter_ns() - start)
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self.started = time.perf_counter()
+
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = LatencyHistogram()
+        return histogram
+
+    def record(self, name, ns):
+        self.histogram(name).record(ns)
+
+    def names(self):
+        return list(self._histograms)
+
+    def reset(self):
+        for histogram in list(self._histograms.values()):
+            histogram.reset()
+        self.started = time.perf_counter()
+
+    def snapshot(self):
+        """Return {name: histogram summary} for every recorded phase."""
+        return {name: histogram.snapshot() for name, histogram in list(self._histograms.items())}
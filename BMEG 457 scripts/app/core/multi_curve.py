@@ -0,0 +1,97 @@
+"""Single graphics item that draws every channel of a track."""
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5 import QtCore
+
+
+class MultiChannelCurve(pg.GraphicsObject):
+    """Draw all channels of a (channels, samples) array as one item.
+
+    Instead of one PlotDataItem per channel, the visible channels are
+    flattened into a single arrayToQPath call per pen, with a NaN sample
+    between channels so the line breaks at the end of each one. Channel i uses
+    pens[i % len(pens)], so the number of paths (and the Python work per
+    frame) is bounded by the number of pens, not the number of channels.
+    """
+
+    def __init__(self, num_channels, pens):
+        super().__init__()
+        self.num_channels = num_channels
+        self.pens = [pg.mkPen(p) for p in pens]
+
+        # Channels sorted by pen so each pen's rows are one contiguous block
+        groups = np.arange(num_channels) % len(self.pens)
+        self._order = np.argsort(groups, kind='stable')
+        self._group_slices = []
+        for group in range(len(self.pens)):
+            rows = np.flatnonzero(groups[self._order] == group)
+            if rows.size:
+                self._group_slices.append((self.pens[group], slice(rows[0], rows[-1] + 1)))
+
+        self.visible = np.ones(num_channels, dtype=bool)
+        self._paths = []
+        self._xs = None
+        self._ys = None
+        self._bounds = QtCore.QRectF()
+        self._x_range = None
+        self._y_range = None
+
+    def setData(self, x, y):
+        """Set the curves: x of shape (samples,), y of shape (channels, samples)."""
+        x = np.asarray(x)
+        y = np.asarray(y)
+        n = x.shape[0]
+
+        # A NaN column after each channel breaks the line. connect='finite' then adds
+        # each channel as one polygon, avoiding the per-vertex encoding a connect array needs.
+        if self._ys is None or self._ys.shape != (self.num_channels, n + 1):
+            self._xs = np.full((self.num_channels, n + 1), np.nan)
+            self._ys = np.full((self.num_channels, n + 1), np.nan)
+        self._xs[:, :n] = x
+        self._ys[:, :n] = y[self._order]
+        visible = self.visible[self._order]
+
+        paths = []
+        for pen, rows in self._group_slices:
+            shown = visible[rows]
+            if n == 0 or not shown.any():
+                continue
+            if shown.all():
+                xs, ys = self._xs[rows].ravel(), self._ys[rows].ravel()  # views, no copy
+            else:
+                xs, ys = self._xs[rows][shown].ravel(), self._ys[rows][shown].ravel()
+            paths.append((pen, pg.arrayToQPath(xs, ys, connect='finite', finiteCheck=False)))
+
+        self.prepareGeometryChange()
+        self._paths = paths
+        if paths:
+            shown = y[self.visible]
+            self._x_range = (float(x[0]), float(x[-1]))
+            self._y_range = (float(shown.min()), float(shown.max()))
+            self._bounds = QtCore.QRectF(self._x_range[0], self._y_range[0],
+                                         self._x_range[1] - self._x_range[0],
+                                         self._y_range[1] - self._y_range[0])
+        else:
+            self._x_range = self._y_range = None
+            self._bounds = QtCore.QRectF()
+        self.informViewBoundsChanged()
+        self.update()
+
+    def set_visible_channels(self, channels):
+        """Only draw the listed channel indices (takes effect on the next setData)."""
+        self.visible[:] = False
+        self.visible[[c for c in channels if 0 <= c < self.num_channels]] = True
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        return self._x_range if ax == 0 else self._y_range
+
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        # Same antialiasing default as PlotCurveItem
+        painter.setRenderHint(painter.RenderHint.Antialiasing, bool(pg.getConfigOption('antialias')))
+        for pen, path in self._paths:
+            painter.setPen(pen)
+            painter.drawPath(path)
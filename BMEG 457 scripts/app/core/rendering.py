@@ -0,0 +1,87 @@
+"""Plot rendering backend selection (OpenGL viewport or Qt raster)."""
+
+from PyQt5 import QtGui
+
+# Renderers that are slower than Qt's own raster painter
+SOFTWARE_RENDERERS = ('llvmpipe', 'softpipe', 'swrast', 'software rasterizer', 'microsoft basic render')
+
+_gl_status = None
+
+
+def opengl_status():
+    """Check once whether a hardware OpenGL context can be created.
+
+    Needs a running QApplication.
+
+    Returns:
+        tuple: (available, reason) where reason is the GL renderer name or why GL is unavailable
+    """
+    global _gl_status
+    if _gl_status is not None:
+        return _gl_status
+
+    if QtGui.QGuiApplication.instance() is None:
+        return False, "no QApplication"  # not cached: may succeed once the app exists
+
+    try:
+        context = QtGui.QOpenGLContext()
+        if not context.create():
+            _gl_status = (False, "could not create an OpenGL context")
+            return _gl_status
+        surface = QtGui.QOffscreenSurface()
+        surface.setFormat(context.format())
+        surface.create()
+        if not context.makeCurrent(surface):
+            _gl_status = (False, "could not make the OpenGL context current")
+            return _gl_status
+        try:
+            renderer = _renderer_name(context)
+        finally:
+            context.doneCurrent()
+    except Exception as e:
+        _gl_status = (False, f"{type(e).__name__}: {e}")
+        return _gl_status
+
+    if renderer and any(name in renderer.lower() for name in SOFTWARE_RENDERERS):
+        _gl_status = (False, f"software renderer ({renderer})")
+    else:
+        _gl_status = (True, renderer or "unknown renderer")
+    return _gl_status
+
+
+def _renderer_name(context):
+    """GL_RENDERER string of the current context, or None if it can't be queried."""
+    try:
+        functions = context.versionFunctions()
+        if functions is None:
+            return None
+        functions.initializeOpenGLFunctions()
+        return functions.glGetString(0x1F01)  # GL_RENDERER
+    except Exception:
+        return None
+
+
+def apply_rendering(plot_widget, use_opengl):
+    """Switch a pyqtgraph PlotWidget to an OpenGL viewport if requested and available.
+
+    Returns:
+        bool: True if the widget renders through OpenGL
+    """
+    if not use_opengl:
+        return False
+    available, reason = opengl_status()
+    if not available:
+        _report_fallback(reason)
+        return False
+    plot_widget.useOpenGL(True)
+    return True
+
+
+_fallback_reported = False
+
+
+def _report_fallback(reason):
+    global _fallback_reported
+    if not _fallback_reported:
+        print(f"[RENDER] OpenGL requested but unavailable ({reason}); using raster rendering")
+        _fallback_reported = True
@@ -0,0 +1,81 @@
+"""Fixed-length multi-channel ring buffer with time-ordered views."""
+
+import numpy as np
+
+
+class RingBuffer:
+    """Ring buffer of the latest `length` samples of a (channels, samples) stream.
+
+    The backing array is twice as long as the ring and every sample is
+    written at both `i` and `i + length`. The last `length` samples are then
+    always contiguous in memory, so `ordered_view()` and `latest(n)` return
+    plain slices (oldest sample first) and never need to copy or
+    concatenate. `append_block` costs O(block size), independent of `length`.
+
+    Until `length` samples have been appended, the oldest part of the views
+    holds `fill_value`.
+    """
+
+    def __init__(self, num_channels, length, dtype=np.float64, fill_value=0):
+        self.num_channels = num_channels
+        self.length = int(length)
+        self.fill_value = fill_value
+        self._data = np.full((num_channels, 2 * self.length), fill_value, dtype=dtype)
+        self.index = 0  # position the next sample is written to (= oldest sample)
+        self.total = 0  # samples appended since creation / clear()
+
+    def __len__(self):
+        """Number of valid samples (at most `length`)."""
+        return min(self.total, self.length)
+
+    @property
+    def shape(self):
+        return (self.num_channels, self.length)
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    def append_block(self, block):
+        """Append a (channels, samples) block; blocks longer than the ring keep their tail."""
+        n = block.shape[1]
+        self.total += n
+        if n >= self.length:
+            self._data[:, :self.length] = block[:, n - self.length:]
+            self._data[:, self.length:] = self._data[:, :self.length]
+            self.index = 0
+            return
+
+        first = min(n, self.length - self.index)
+        self._write(self.index, block[:, :first])
+        if first < n:
+            self._write(0, block[:, first:])
+        self.index = (self.index + n) % self.length
+
+    def _write(self, pos, block):
+        n = block.shape[1]
+        self._data[:, pos:pos + n] = block
+        self._data[:, pos + self.length:pos + self.length + n] = block
+
+    def ordered_view(self):
+        """View of the whole ring, oldest sample first (read-only by convention)."""
+        return self._data[:, self.index:self.index + self.length]
+
+    def latest(self, n):
+        """View of the newest `n` samples (n <= length), oldest first."""
+        n = min(int(n), self.length)
+        end = self.index + self.length
+        return self._data[:, end - n:end]
+
+    def clear(self):
+        self._data[:] = self.fill_value
+        self.index = 0
+        self.total = 0
+
+    def resized(self, length):
+        """Return a new ring of `length` samples holding the newest samples of this one."""
+        ring = RingBuffer(self.num_channels, length, self._data.dtype, self.fill_value)
+        keep = min(len(self), ring.length)
+        if keep:
+            ring.append_block(self.latest(keep))
+        return ring
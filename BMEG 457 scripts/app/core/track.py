@@ -1,9 +1,15 @@
 import numpy as np
 import pyqtgraph as pg
 
+from app.core.decimation import MinMaxDecimator
+from app.core.multi_curve import MultiChannelCurve
+from app.core.rendering import apply_rendering
+from app.core.ring_buffer import RingBuffer
+
 # individual plots
 class Track:
-    def __init__(self, title, frequency, num_channels, offset, conv_fact, plot_time=1):
+    def __init__(self, title, frequency, num_channels, offset, conv_fact, plot_time=1, decimate=True,
+                 single_item=None, use_opengl=False):
         self.title = title
         self.frequency = frequency
         self.num_channels = num_channels
@@ -11,9 +17,22 @@ class Track:
         self.conv_fact = conv_fact
         self.plot_time = plot_time
 
-        self.buffer = np.zeros((num_channels, int(plot_time * frequency)))
-        self.buffer_index = 0
-        self.time_array = np.linspace(0, plot_time, self.buffer.shape[1])
+        # Min/max envelope used when the buffer has more samples than the plot has pixels
+        self.decimate = decimate
+        self.decimator = None
+        self._decimator_width = None
+
+        # Bumped on every change to the plotted data; draw() records the generation it showed
+        self.generation = 0
+        self.drawn_generation = -1
+
+        # Raw samples, plus a scaled and offset copy that draw() hands to the curves as-is.
+        # Both scroll: the newest sample is always at the right edge of the plot.
+        self.channel_offsets = (self.offset * np.arange(num_channels))[:, None]
+        self.ring = RingBuffer(num_channels, int(plot_time * frequency))
+        self.display_ring = RingBuffer(num_channels, self.ring.length)
+        self.time_array = np.linspace(0, plot_time, self.ring.length)
+        self._rebuild_display()
 
         self.plot_widget = pg.PlotWidget(title=self.title)
         self.plot_widget.setXRange(0, self.plot_time)
@@ -22,6 +41,8 @@ class Track:
         self.plot_widget.getViewBox().setBackgroundColor((30, 30, 30))
         self.plot_widget.setAntialiasing(True)
         self.plot_widget.enableAutoRange()
+        # Opt-in OpenGL viewport; stays on raster if no usable GL context exists
+        self.uses_opengl = apply_rendering(self.plot_widget, use_opengl)
 
         # Add labels and units
         if 'HDsEMG' in title or 'channels' in title:
@@ -30,35 +51,122 @@ class Track:
             self.plot_widget.setLabel("left", "Amplitude", units="A.U.")
         self.plot_widget.setLabel("bottom", "Time", units="s")
 
+        # Wide tracks (HDsEMG) draw all channels through one item instead of one curve per channel
+        if single_item is None:
+            single_item = num_channels > 8
         self.curves = []
-        for i in range(num_channels):
-            pen = pg.mkPen(color=(255, 255, 255), width=1) if title in [
-                "AUX 1", "AUX 2", "Quaternions", "Buffer", "Ramp"
-            ] else pg.mkPen(color=i, width=1)
+        self.multi_curve = None
+        if single_item:
+            # pg.intColor cycles through 9 hues, so 9 pens reproduce the per-channel colors
+            self.multi_curve = MultiChannelCurve(num_channels, [pg.mkPen(color=i, width=1) for i in range(9)])
+            self.plot_widget.addItem(self.multi_curve)
+        else:
+            for i in range(num_channels):
+                pen = pg.mkPen(color=(255, 255, 255), width=1) if title in [
+                    "AUX 1", "AUX 2", "Quaternions", "Buffer", "Ramp"
+                ] else pg.mkPen(color=i, width=1)
 
-            curve_name = f"Ch {i+1}" if i < 8 or num_channels <= 8 else None
-            self.curves.append(self.plot_widget.plot(pen=pen, name=curve_name))
+                curve_name = f"Ch {i+1}" if i < 8 or num_channels <= 8 else None
+                self.curves.append(self.plot_widget.plot(pen=pen, name=curve_name))
 
         # by default all channels are visible; use set_visible_channels to change
         self.visible_channels = list(range(self.num_channels))
 
+    @property
+    def buffer(self):
+        """Time-ordered (channels, samples) view of the raw samples, newest last. Do not write to it."""
+        return self.ring.ordered_view()
+
+    @property
+    def display(self):
+        """Time-ordered view of the scaled and offset samples that are plotted."""
+        return self.display_ring.ordered_view()
+
+    def _rebuild_display(self):
+        self.display_ring.clear()
+        self.display_ring.append_block(self.ring.ordered_view() * self.conv_fact + self.channel_offsets)
+
     def feed(self, packet):
-        packet_size = packet.shape[1]
-        # Use buffer management with proper wrap-around
-        if self.buffer_index + packet_size > self.buffer.shape[1]:
-            end_space = self.buffer.shape[1] - self.buffer_index
-            if end_space > 0:
-                self.buffer[:, self.buffer_index:] = packet[:, :end_space]
-            self.buffer[:, :packet_size-end_space] = packet[:, end_space:]
-            self.buffer_index = packet_size - end_space
-        else:
-            self.buffer[:, self.buffer_index:self.buffer_index + packet_size] = packet
-            self.buffer_index = (self.buffer_index + packet_size) % self.buffer.shape[1]
+        self.ring.append_block(packet)
+        self.display_ring.append_block(packet * self.conv_fact + self.channel_offsets)
+        if self.decimator is not None:
+            self.decimator.update(self.display_ring)
+        self.generation += 1
+
+    def set_data(self, data):
+        """Replace the track contents with time-ordered (channels, samples) data, newest last."""
+        self.ring.clear()
+        self.ring.append_block(data)
+        self.invalidate()
+
+    def _plot_width(self):
+        """Width of the plot area in pixels."""
+        return max(100, int(self.plot_widget.getPlotItem().getViewBox().width()))
+
+    def _get_decimator(self):
+        """Return an up-to-date decimator, or None when the full buffer fits in the plot."""
+        if not self.decimate:
+            return None
+        width = self._plot_width()
+        length = self.ring.length
+        if length <= 2 * width:
+            self.decimator = None
+            return None
+        decimator = self.decimator
+        if decimator is None or decimator.length != length or self._decimator_width != width:
+            # New width or buffer: rebuild once, then feed() keeps it current
+            decimator = MinMaxDecimator(self.num_channels, length, width, self.plot_time / max(1, length - 1))
+            decimator.rebuild(self.display_ring)
+            self.decimator = decimator
+            self._decimator_width = width
+        return decimator
+
+    def invalidate(self):
+        """Rebuild the display data and envelope from the raw samples."""
+        self._rebuild_display()
+        self.decimator = None
+        self.generation += 1
+
+    def set_scaling(self, conv_fact=None, offset=None):
+        """Change the conversion factor and/or channel spacing; rebuilds the display data once."""
+        if conv_fact is not None:
+            self.conv_fact = conv_fact
+        if offset is not None:
+            self.offset = offset
+            self.channel_offsets = (self.offset * np.arange(self.num_channels))[:, None]
+        self.invalidate()
+
+    @property
+    def is_dirty(self):
+        """True if the data changed since the last draw()."""
+        return self.generation != self.drawn_generation
 
     def draw(self):
+        # Read before drawing so a packet fed mid-draw leaves the track dirty
+        self.drawn_generation = self.generation
+        decimator = self._get_decimator()
+        if decimator is not None:
+            # ~2 points per pixel column instead of the whole buffer
+            x, y = decimator.envelope()
+        else:
+            x, y = self.time_array, self.display
+        # y is already scaled and offset, so the curves get views without any per-frame arithmetic
+        if self.multi_curve is not None:
+            self.multi_curve.setData(x, y)
+            return
         for i, curve in enumerate(self.curves):
             # draw data for channel i regardless of visibility — visibility is controlled via show()/hide()
-            curve.setData(self.time_array, self.buffer[i, :] * self.conv_fact + (self.offset * i))
+            curve.setData(x, y[i, :])
+
+    def set_plot_time(self, new_time):
+        """Resize the buffer to a new time window, keeping the most recent samples."""
+        self.ring = self.ring.resized(int(new_time * self.frequency))
+        self.display_ring = RingBuffer(self.num_channels, self.ring.length)
+
+        self.plot_time = new_time
+        self.time_array = np.linspace(0, new_time, self.ring.length)
+        self.plot_widget.setXRange(0, new_time)
+        self.invalidate()
 
     def set_visible_channels(self, channels):
         """
@@ -67,6 +175,9 @@ class Track:
         """
         channels_set = set(int(c) for c in channels)
         self.visible_channels = sorted([c for c in channels_set if 0 <= c < self.num_channels])
+        if self.multi_curve is not None:
+            self.multi_curve.set_visible_channels(self.visible_channels)
+        self.generation += 1
 
         for ch_idx, curve in enumerate(self.curves):
             if ch_idx in channels_set:
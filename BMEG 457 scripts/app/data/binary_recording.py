@@ -0,0 +1,160 @@
+"""Compact binary recording format: raw int16 frames plus a JSON sidecar.
+
+A recording is two files sharing a base name:
+    recording_<timestamp>.bin   frames of int16 samples, one frame per sample
+                                instant with all channels interleaved (the same
+                                layout the device streams)
+    recording_<timestamp>.json  sidecar with sampling frequency, channel count,
+                                byte order, start time, track layout with
+                                conversion factors, and calibration values
+
+`BinaryRecording` opens the frames with np.memmap, so multi-GB sessions open
+instantly and any time range or channel subset can be sliced without reading
+the rest of the file.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+FORMAT_NAME = 'otb-python-app-int16'
+FORMAT_VERSION = 1
+
+
+def sidecar_path(filename):
+    """Return the JSON sidecar path for a .bin recording."""
+    return os.path.splitext(filename)[0] + '.json'
+
+
+class BinarySink:
+    """Append packets to a .bin recording and keep its JSON sidecar up to date.
+
+    Same interface as CsvSink so it can be used by StreamingRecorder and by
+    RecordingManager when saving an in-memory recording.
+    """
+
+    extension = '.bin'
+
+    def __init__(self, filename, nchannels, sampling_frequency=None, metadata=None, byteorder='<'):
+        if byteorder not in ('<', '>'):
+            raise ValueError("byteorder must be '<' (little-endian) or '>' (big-endian)")
+        self.filename = filename
+        self.nchannels = nchannels
+        self.sampling_frequency = sampling_frequency
+        self.metadata = dict(metadata or {})
+        self.dtype = np.dtype(byteorder + 'i2')
+        self.num_samples = 0
+        self.first_anchor = None
+
+        self._file = open(filename, 'wb')
+        self._write_sidecar()
+
+    def write(self, data, anchor_time):
+        if self.first_anchor is None:
+            self.first_anchor = anchor_time
+        # (channels, samples) -> interleaved frames in the file's byte order
+        self._file.write(np.ascontiguousarray(data.T, dtype=self.dtype).tobytes())
+        self.num_samples += data.shape[1]
+
+    def close(self):
+        self._file.close()
+        self._write_sidecar()
+
+    def _write_sidecar(self):
+        header = {
+            'format': FORMAT_NAME,
+            'version': FORMAT_VERSION,
+            'data_file': os.path.basename(self.filename),
+            'dtype': self.dtype.str,
+            'layout': 'frames',  # samples x channels, channels interleaved
+            'nchannels': self.nchannels,
+            'sampling_frequency': self.sampling_frequency,
+            'num_samples': self.num_samples,
+            'first_sample_offset': self.first_anchor,  # seconds after start_time
+            'start_time': self.metadata.get('start_time', time.time()),
+            'tracks': self.metadata.get('tracks', []),
+            'calibration': self.metadata.get('calibration'),
+        }
+        with open(sidecar_path(self.filename), 'w') as f:
+            json.dump(header, f, indent=2)
+
+
+class BinaryRecording:
+    """Memory-mapped reader for recordings written by BinarySink.
+
+    Attributes:
+        header: the sidecar contents
+        data: np.memmap of shape (num_samples, nchannels)
+    """
+
+    def __init__(self, filename):
+        if filename.endswith('.json'):
+            filename = os.path.splitext(filename)[0] + '.bin'
+        self.filename = filename
+        with open(sidecar_path(filename)) as f:
+            self.header = json.load(f)
+
+        self.nchannels = self.header['nchannels']
+        self.sampling_frequency = self.header['sampling_frequency']
+        self.dtype = np.dtype(self.header['dtype'])
+
+        # Trust the file size over the sidecar so interrupted recordings still open
+        frame_bytes = self.nchannels * self.dtype.itemsize
+        self.num_samples = os.path.getsize(filename) // frame_bytes
+        if self.num_samples:
+            self.data = np.memmap(filename, dtype=self.dtype, mode='r', shape=(self.num_samples, self.nchannels))
+        else:
+            self.data = np.empty((0, self.nchannels), dtype=self.dtype)
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sampling_frequency
+
+    @property
+    def start_time(self):
+        return self.header.get('start_time')
+
+    @property
+    def calibration(self):
+        return self.header.get('calibration')
+
+    def _sample_range(self, start_time, stop_time):
+        fs = self.sampling_frequency
+        start = 0 if start_time is None else int(np.clip(round(start_time * fs), 0, self.num_samples))
+        stop = self.num_samples if stop_time is None else int(np.clip(round(stop_time * fs), start, self.num_samples))
+        return start, stop
+
+    def read(self, start_time=None, stop_time=None, channels=None):
+        """Read a time window as a (channels, samples) int16 array.
+
+        Args:
+            start_time, stop_time: seconds from the first sample (None = edge of file)
+            channels: optional index/list/slice of channels to read
+        """
+        start, stop = self._sample_range(start_time, stop_time)
+        frames = self.data[start:stop]
+        if channels is not None:
+            frames = frames[:, channels]
+        return np.array(frames.T, dtype=np.int16)
+
+    def times(self, start_time=None, stop_time=None):
+        """Sample times (s) matching read() for the same window."""
+        start, stop = self._sample_range(start_time, stop_time)
+        return np.arange(start, stop) / self.sampling_frequency
+
+    def conversion_factors(self):
+        """Per-channel conversion factors from the track layout (1 where unknown)."""
+        factors = np.ones(self.nchannels)
+        for track in self.header.get('tracks', []):
+            first = track['first_channel']
+            factors[first:first + track['num_channels']] = track['conv_fact']
+        return factors
+
+    def read_scaled(self, start_time=None, stop_time=None, channels=None):
+        """Like read(), but converted to physical units with the track conversion factors."""
+        factors = self.conversion_factors()
+        if channels is not None:
+            factors = factors[channels]
+        return self.read(start_time, stop_time, channels) * np.reshape(factors, (-1, 1))
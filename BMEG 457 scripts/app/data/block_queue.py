@@ -0,0 +1,116 @@
+"""Bounded single-producer/single-consumer queue of preallocated packet blocks."""
+
+import threading
+
+
+class BlockQueue:
+    """Hand fixed-size byte blocks from the socket thread to the processing thread.
+
+    All blocks are allocated up front and reused. The producer copies a packet
+    into the next free block with `put`; the consumer borrows the oldest block
+    with `get` and hands it back with `release`. The head and tail counters are
+    each written by only one side, so the data path needs no lock; events are
+    only used to sleep while the queue is empty (consumer) or full (producer).
+
+    Policies when the queue is full:
+        'block' - the producer waits for a free block (backpressure onto TCP)
+        'drop'  - the incoming packet is discarded and counted in `dropped`
+    """
+
+    POLICIES = ('block', 'drop')
+
+    def __init__(self, block_size, capacity=64, policy='block'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {self.POLICIES}")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.block_size = block_size
+        self.capacity = capacity
+        self.policy = policy
+
+        self._blocks = [bytearray(block_size) for _ in range(capacity)]
+        self._views = [memoryview(block) for block in self._blocks]
+        self._head = 0  # blocks published, written by the producer only
+        self._tail = 0  # blocks released, written by the consumer only
+        self._data_ready = threading.Event()
+        self._space_ready = threading.Event()
+        self.closed = False
+
+        # Metrics
+        self.pushed = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._head - self._tail
+
+    def put(self, data, poll_interval=0.5):
+        """Copy `data` into the next free block.
+
+        Returns:
+            bool: True if queued, False if dropped or the queue was closed
+        """
+        if len(self) >= self.capacity:
+            if self.policy == 'drop':
+                self.dropped += 1
+                return False
+            self.blocked += 1
+            while len(self) >= self.capacity and not self.closed:
+                self._space_ready.clear()
+                if len(self) >= self.capacity:
+                    self._space_ready.wait(poll_interval)
+        if self.closed:
+            return False
+
+        self._views[self._head % self.capacity][:] = data
+        self._head += 1  # publish the block
+        self.pushed += 1
+        depth = len(self)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._data_ready.set()
+        return True
+
+    def get(self, timeout=None):
+        """Borrow the oldest queued block.
+
+        Returns a memoryview that stays valid until `release()` is called, or
+        None if nothing arrived within `timeout` or the queue is closed and empty.
+        """
+        if self._head == self._tail:
+            self._data_ready.clear()
+            if self._head == self._tail:
+                if self.closed or not self._data_ready.wait(timeout):
+                    return None
+                if self._head == self._tail:
+                    return None  # woken by close()
+        return self._views[self._tail % self.capacity]
+
+    def release(self):
+        """Return the block obtained from `get()` to the producer."""
+        self._tail += 1
+        self._space_ready.set()
+
+    def close(self):
+        """Wake both sides; further puts are refused, queued blocks can still be drained."""
+        self.closed = True
+        self._data_ready.set()
+        self._space_ready.set()
+
+    def get_stats(self):
+        """Get queue metrics.
+
+        Returns:
+            dict: Current depth and counters since creation
+        """
+        return {
+            'capacity': self.capacity,
+            'policy': self.policy,
+            'depth': len(self),
+            'max_depth': self.max_depth,
+            'pushed': self.pushed,
+            'dropped': self.dropped,
+            'blocked': self.blocked,
+        }
@@ -0,0 +1,282 @@
+"""Chunked, compressed columnar recording format.
+
+Samples are grouped into fixed-length time chunks and every channel of a
+chunk is compressed on its own, so a reader can pull one channel or one time
+window by decompressing only the blocks it touches.
+
+Codec (lossless, per channel block):
+    1. first-order delta in int16 with wraparound (x[0], x[1]-x[0], ...)
+    2. byte shuffle: all low bytes, then all high bytes
+    3. zlib
+
+File layout:
+    MAGIC | header length (uint32 LE) | header JSON |
+    block | block | ... | footer JSON | footer length (uint64 LE)
+
+The header holds the channel count, sampling frequency, chunk length and
+metadata (track layout, calibration, start time). The footer repeats them
+and adds the chunk index: for each chunk its first sample, length, and the
+(offset, nbytes) of every channel block. Blocks are written chunk by chunk,
+channel by channel, and every zlib stream marks its own end, so a
+recording cut short before the footer was written (crash, power loss) is
+still readable: the index is rebuilt by scanning the blocks, and only the
+unfinished last chunk is lost.
+"""
+
+import json
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b'OTBCHNK2'
+_HEADER_LEN = struct.Struct('<I')
+_FOOTER_LEN = struct.Struct('<Q')
+_SCAN_READ = 65536  # bytes read at a time when rebuilding the chunk index
+
+
+def encode_block(samples, level=6):
+    """Compress a 1-D int16 array with delta + byte shuffle + zlib."""
+    x = np.asarray(samples, dtype='<i2')
+    delta = np.empty_like(x)
+    delta[:1] = x[:1]
+    np.subtract(x[1:], x[:-1], out=delta[1:])  # wraps modulo 2**16, so it stays lossless
+    shuffled = delta.view(np.uint8).reshape(-1, 2).T
+    return zlib.compress(shuffled.tobytes(), level)
+
+
+def decode_block(payload, length):
+    """Inverse of encode_block; returns a 1-D int16 array of `length` samples."""
+    planes = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(2, length)
+    delta = np.ascontiguousarray(planes.T).view('<i2').ravel()
+    return np.cumsum(delta, dtype=np.int16)
+
+
+class ChunkedSink:
+    """Write packets into a chunked, compressed recording.
+
+    Same interface as CsvSink/BinarySink. Packets are collected into a
+    preallocated (channels, chunk_samples) int16 buffer; each full chunk is
+    compressed channel by channel, appended to the file and flushed.
+    """
+
+    extension = '.otbc'
+
+    def __init__(self, filename, nchannels, sampling_frequency=None, metadata=None,
+                 chunk_samples=8192, level=6):
+        self.filename = filename
+        self.nchannels = nchannels
+        self.sampling_frequency = sampling_frequency
+        self.metadata = dict(metadata or {})
+        self.chunk_samples = chunk_samples
+        self.level = level
+
+        self.num_samples = 0
+        self.first_anchor = None
+        self.chunks = []
+
+        self._pending = np.empty((nchannels, chunk_samples), dtype=np.int16)
+        self._pending_len = 0
+        self._file = open(filename, 'wb')
+        header = json.dumps(self._header()).encode('utf-8')
+        self._file.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        self._offset = len(MAGIC) + _HEADER_LEN.size + len(header)
+
+    def _header(self):
+        return {
+            'nchannels': self.nchannels,
+            'sampling_frequency': self.sampling_frequency,
+            'chunk_samples': self.chunk_samples,
+            'codec': 'delta-shuffle-zlib',
+            'dtype': '<i2',
+            'start_time': self.metadata.get('start_time'),
+            'tracks': self.metadata.get('tracks', []),
+            'calibration': self.metadata.get('calibration'),
+        }
+
+    def write(self, data, anchor_time):
+        if self.first_anchor is None:
+            self.first_anchor = anchor_time
+        n = data.shape[1]
+        written = 0
+        while written < n:
+            count = min(n - written, self.chunk_samples - self._pending_len)
+            self._pending[:, self._pending_len:self._pending_len + count] = data[:, written:written + count]
+            self._pending_len += count
+            written += count
+            if self._pending_len == self.chunk_samples:
+                self._flush_chunk()
+
+    def _flush_chunk(self):
+        length = self._pending_len
+        if not length:
+            return
+        blocks = []
+        for ch in range(self.nchannels):
+            payload = encode_block(self._pending[ch, :length], self.level)
+            self._file.write(payload)
+            blocks.append([self._offset, len(payload)])
+            self._offset += len(payload)
+        self.chunks.append({'start': self.num_samples, 'length': length, 'blocks': blocks})
+        self.num_samples += length
+        self._pending_len = 0
+        self._file.flush()  # a crash then loses at most the chunk being collected
+
+    def close(self):
+        self._flush_chunk()
+        footer = self._header()
+        footer.update({
+            'num_samples': self.num_samples,
+            'first_sample_offset': self.first_anchor,
+            'chunks': self.chunks,
+        })
+        encoded = json.dumps(footer).encode('utf-8')
+        self._file.write(encoded)
+        self._file.write(_FOOTER_LEN.pack(len(encoded)))
+        self._file.close()
+
+
+class ChunkedRecording:
+    """Reader for files written by ChunkedSink.
+
+    Only the chunk/channel blocks overlapping the requested window are read
+    and decompressed. If the footer is missing (the recording was cut
+    short), the chunk index is rebuilt from the blocks and `recovered` is set.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.recovered = False
+        with open(filename, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not a chunked recording")
+            (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+            data_start = len(MAGIC) + _HEADER_LEN.size + header_len
+
+            self.header = self._read_footer(f, data_start)
+            if self.header is None:
+                self.header = self._scan_chunks(f, header, data_start)
+                self.recovered = True
+                print(f"[RECORDING] {filename} has no footer; recovered {self.header['num_samples']} samples "
+                      f"in {len(self.header['chunks'])} chunks")
+
+        self.nchannels = self.header['nchannels']
+        self.sampling_frequency = self.header['sampling_frequency']
+        self.num_samples = self.header['num_samples']
+        self.chunks = self.header['chunks']
+        self._chunk_starts = np.array([c['start'] for c in self.chunks], dtype=np.int64)
+
+    @staticmethod
+    def _read_footer(f, data_start):
+        """Return the footer dict, or None if the file ends without a valid one."""
+        size = f.seek(0, 2)
+        if size - data_start < _FOOTER_LEN.size:
+            return None
+        f.seek(-_FOOTER_LEN.size, 2)
+        (footer_len,) = _FOOTER_LEN.unpack(f.read(_FOOTER_LEN.size))
+        if footer_len > size - data_start - _FOOTER_LEN.size:
+            return None
+        f.seek(-_FOOTER_LEN.size - footer_len, 2)
+        try:
+            footer = json.loads(f.read(footer_len).decode('utf-8'))
+        except ValueError:  # includes JSON and UTF-8 decode errors
+            return None
+        return footer if isinstance(footer, dict) and 'chunks' in footer else None
+
+    @staticmethod
+    def _scan_chunks(f, header, data_start):
+        """Rebuild the chunk index by walking the zlib streams after the header.
+
+        Every chunk holds one block per channel, all of the same length. The
+        scan stops at the first block that does not end within the file; the
+        chunk it belongs to is dropped.
+        """
+        nchannels = header['nchannels']
+        chunks = []
+        num_samples = 0
+        offset = data_start
+        while True:
+            blocks = []
+            lengths = set()
+            for _ in range(nchannels):
+                decompressor = zlib.decompressobj()
+                f.seek(offset)
+                raw = 0
+                consumed = 0
+                try:
+                    while not decompressor.eof:
+                        data = f.read(_SCAN_READ)
+                        if not data:
+                            break
+                        raw += len(decompressor.decompress(data))
+                        consumed += len(data)
+                except zlib.error:
+                    break
+                if not decompressor.eof:
+                    break
+                nbytes = consumed - len(decompressor.unused_data)
+                blocks.append([offset, nbytes])
+                lengths.add(raw // 2)
+                offset += nbytes
+            if len(blocks) < nchannels or len(lengths) != 1:
+                break
+            length = lengths.pop()
+            chunks.append({'start': num_samples, 'length': length, 'blocks': blocks})
+            num_samples += length
+
+        recovered = dict(header)
+        recovered.update({'num_samples': num_samples, 'first_sample_offset': None, 'chunks': chunks})
+        return recovered
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sampling_frequency
+
+    @property
+    def calibration(self):
+        return self.header.get('calibration')
+
+    def compressed_size(self):
+        """Total bytes of compressed sample data."""
+        return sum(nbytes for chunk in self.chunks for _, nbytes in chunk['blocks'])
+
+    def _sample_range(self, start_time, stop_time):
+        fs = self.sampling_frequency
+        start = 0 if start_time is None else int(np.clip(round(start_time * fs), 0, self.num_samples))
+        stop = self.num_samples if stop_time is None else int(np.clip(round(stop_time * fs), start, self.num_samples))
+        return start, stop
+
+    def read_samples(self, start, stop, channels=None):
+        """Read samples [start, stop) as a (channels, samples) int16 array."""
+        channels = np.arange(self.nchannels)[channels if channels is not None else slice(None)]
+        channels = np.atleast_1d(channels)
+        out = np.empty((len(channels), max(stop - start, 0)), dtype=np.int16)
+        if stop <= start:
+            return out
+
+        first = int(np.searchsorted(self._chunk_starts, start, side='right') - 1)
+        with open(self.filename, 'rb') as f:
+            for chunk in self.chunks[first:]:
+                c0 = chunk['start']
+                if c0 >= stop:
+                    break
+                lo = max(start, c0) - c0
+                hi = min(stop, c0 + chunk['length']) - c0
+                for row, ch in enumerate(channels):
+                    offset, nbytes = chunk['blocks'][ch]
+                    f.seek(offset)
+                    block = decode_block(f.read(nbytes), chunk['length'])
+                    out[row, c0 + lo - start:c0 + hi - start] = block[lo:hi]
+        return out
+
+    def read(self, start_time=None, stop_time=None, channels=None):
+        """Read a time window (seconds) as a (channels, samples) int16 array."""
+        start, stop = self._sample_range(start_time, stop_time)
+        return self.read_samples(start, stop, channels)
+
+    def times(self, start_time=None, stop_time=None):
+        """Sample times (s) matching read() for the same window."""
+        start, stop = self._sample_range(start_time, stop_time)
+        return np.arange(start, stop) / self.sampling_frequency
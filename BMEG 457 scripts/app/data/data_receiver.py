@@ -1,9 +1,29 @@
-import struct
 import numpy as np
 import time
 import socket
+import threading
 from PyQt5 import QtCore
-from app.processing.pipeline import ProcessingPipeline, get_pipeline
+from app.core.config import Config
+from app.core.metrics import LatencyMetrics
+from app.data.block_queue import BlockQueue
+from app.data.packet_buffer import PacketReassembler
+from app.data.ramp_monitor import RampMonitor, accessory_channels
+from app.processing.pipeline import build_receiver_graph
+
+
+# Device frames are big-endian signed 16-bit samples, interleaved by channel
+PACKET_DTYPE = np.dtype('>i2')
+
+
+def decode_packet(data, nchannels):
+    """Decode one device packet into a (channels, samples) array.
+
+    `data` may be any buffer-protocol object (bytes, bytearray, memoryview).
+    The result is a zero-copy view over `data`, so it is only valid for as
+    long as the underlying buffer is left untouched; call `.copy()` on it
+    before handing it to anything that outlives the packet.
+    """
+    return np.frombuffer(data, dtype=PACKET_DTYPE).reshape(-1, nchannels).T
 
 
 class DataReceiverThread(QtCore.QThread):
@@ -12,8 +32,12 @@ class DataReceiverThread(QtCore.QThread):
     stage_output = QtCore.pyqtSignal(str, np.ndarray)
     status_update = QtCore.pyqtSignal(str)
     error_signal = QtCore.pyqtSignal(str)
+    # (samples lost in this packet, total samples lost), from gaps in the Ramp channel
+    sample_loss = QtCore.pyqtSignal(int, int)
+    # Buffer channel level, emitted when it rises above Config.DEVICE_BUFFER_WARNING
+    device_buffer_warning = QtCore.pyqtSignal(int)
 
-    def __init__(self, device, client_socket, tracks):
+    def __init__(self, device, client_socket, tracks, queue_capacity=None, queue_policy=None):
         super().__init__()
         self.device = device
         self.client_socket = client_socket
@@ -22,9 +46,24 @@ class DataReceiverThread(QtCore.QThread):
         self.packet_count = 0
         self.last_time = time.time()
         self.fps = 0
+        # Created in run() once the packet size is known
+        self.reassembler = None
+        self.block_queue = None
+        self.queue_capacity = queue_capacity or Config.RECEIVER_QUEUE_PACKETS
+        self.queue_policy = queue_policy or Config.RECEIVER_QUEUE_POLICY
         
-        # Processing pipelines for multi-stage output
-        self.processor = get_pipeline('final')
+        # Per-phase timing histograms (recv wait, reassembly, decode, stages, emit, feed), see get_metrics()
+        self.metrics = LatencyMetrics()
+        
+        # Sample-loss detection from the Ramp counter (None if the mode has no accessory
+        # channels or the source has no Ramp, e.g. a replayed OT BioLab archive)
+        channels = accessory_channels(self.device.nchannels) if getattr(self.device, 'has_ramp', True) else None
+        self.ramp_monitor = RampMonitor(channels[1], buffer_channel=channels[0]) if channels else None
+        self.buffer_warning_active = False
+        self.stream_restarted = True  # set by the recv loop, the worker resets the RampMonitor
+        
+        # Stage graph over the named pipelines ('filtered', 'rectified', 'spatial', 'final')
+        self.graph = build_receiver_graph(metrics=self.metrics)
         
         # Set socket timeout to prevent infinite blocking
         try:
@@ -34,6 +73,11 @@ class DataReceiverThread(QtCore.QThread):
             print(f"[RECEIVER] WARNING: Could not set socket timeout: {e}")
 
     def run(self):
+        """Acquisition loop: socket recv and packet reassembly only.
+
+        Complete packets are copied into the block queue and decoded/processed
+        by the worker thread started here, so a slow pipeline cannot stall recv.
+        """
         # Calculate expected packet size
         expected_bytes = self.device.nchannels * 2 * (self.device.frequency // 16)
         print(f"[RECEIVER] Thread run() started")
@@ -41,108 +85,60 @@ class DataReceiverThread(QtCore.QThread):
         print(f"[RECEIVER] Expecting {expected_bytes} bytes per packet ({self.device.nchannels} channels)")
         print(f"[RECEIVER] Initial running state: {self.running}")
 
-        # Buffer to accumulate incomplete packets
-        buffer = b''
+        # Preallocated buffer to reassemble packets in place
+        self.reassembler = PacketReassembler(expected_bytes)
+        reassembler = self.reassembler
+        self.stream_restarted = True
+
+        # Bounded hand-off to the processing worker
+        self.block_queue = BlockQueue(expected_bytes, capacity=self.queue_capacity, policy=self.queue_policy)
+        block_queue = self.block_queue
+        worker = threading.Thread(target=self._processing_loop, name="ReceiverProcessing", daemon=True)
+        worker.start()
+        print(f"[RECEIVER] Processing worker started (queue: {self.queue_capacity} packets, policy: {self.queue_policy})")
         
         # Keep thread alive indefinitely - only exit on error or explicit stop
         thread_alive = True
+        metrics = self.metrics
         
         while thread_alive:
             try:
-                # Receive data (may be partial) - request more to avoid multiple small reads
-                chunk = self.client_socket.recv(expected_bytes * 2)
+                # Receive data (may be partial) straight into the reassembly buffer
+                t0 = time.perf_counter_ns()
+                received = reassembler.recv_into(self.client_socket)
+                t1 = time.perf_counter_ns()
+                metrics.record('recv_wait', t1 - t0)
                 
-                if not chunk:
-                    print("[RECEIVER] Socket closed by remote end")
-                    self.error_signal.emit("Connection closed by device")
+                if not received:
+                    if getattr(self.client_socket, 'finished', False):
+                        # A replayed recording (app.data.replay) ended normally
+                        print("[RECEIVER] Replay finished")
+                        self.status_update.emit("Replay finished")
+                    else:
+                        print("[RECEIVER] Socket closed by remote end")
+                        self.error_signal.emit("Connection closed by device")
                     thread_alive = False
                     break
                 
-                buffer += chunk
+                # Hand every complete packet to the worker
+                for data in reassembler.packets():
+                    t2 = time.perf_counter_ns()
+                    metrics.record('reassembly', t2 - t1)
+                    block_queue.put(data)
+                    t1 = time.perf_counter_ns()
+                    metrics.record('queue_put', t1 - t2)
                 
-                # Process all complete packets in the buffer
-                while len(buffer) >= expected_bytes:
-                    # Extract one complete packet
-                    data = buffer[:expected_bytes]
-                    buffer = buffer[expected_bytes:]
-                    
-                    # Unpack as big-endian signed shorts (16-bit)
-                    unpacked_data = struct.unpack(f'>{len(data) // 2}h', data)
-                    reshaped = np.array(unpacked_data).reshape((-1, self.device.nchannels)).T
-                    
-                    # Multi-stage processing pipeline
-                    reshaped_data = reshaped
-                    
-                    # Emit raw stage
-                    try:
-                        self.stage_output.emit('raw', reshaped_data.copy())
-                    except Exception as e:
-                        if self.packet_count == 0:
-                            print(f"[RECEIVER] ERROR emitting raw stage_output: {e}")
-                    
-                    # Filtered stage with fallback
-                    try:
-                        filtered = get_pipeline('filtered').run(reshaped_data)
-                        self.stage_output.emit('filtered', filtered.copy())
-                    except Exception as e:
-                        if self.packet_count == 0:
-                            print(f"[RECEIVER] Filtering failed (likely small packet), using raw data: {e}")
-                        filtered = reshaped_data
-                    
-                    # Rectified stage with fallback
-                    try:
-                        rectified = get_pipeline('rectified').run(filtered)
-                        self.stage_output.emit('rectified', rectified.copy())
-                    except Exception as e:
-                        if self.packet_count == 0:
-                            print(f"[RECEIVER] Rectification failed: {e}")
-                        rectified = filtered
-                    
-                    # Final processed data with fallback
-                    try:
-                        processed = self.processor.run(reshaped_data)
-                    except Exception as e:
-                        if self.packet_count == 0:
-                            print(f"[RECEIVER] Final processing failed, using rectified data: {e}")
-                        processed = rectified
-                    
-                    # Emit final stage
-                    try:
-                        self.stage_output.emit('final', processed.copy())
-                        if self.packet_count == 0:
-                            print("[RECEIVER] First 'final' stage_output signal emitted")
-                    except Exception as e:
-                        if self.packet_count == 0:
-                            print(f"[RECEIVER] ERROR emitting final stage_output: {e}")
-                    
-                    # Only feed tracks and emit signals when streaming is active
-                    if self.running:
-                        # Feed tracks with processed data
-                        idx = 0
-                        for track in self.tracks:
-                            track.feed(processed[idx:idx + track.num_channels])
-                            idx += track.num_channels
-                        
-                        self.data_received.emit(processed)
-                    
-                    # Update packet count and FPS
-                    self.packet_count += 1
-                    if self.packet_count == 1:
-                        print(f"[RECEIVER] First packet processed successfully!")
-                    
-                    if self.packet_count % 100 == 0:
-                        now = time.time()
-                        elapsed = now - self.last_time
-                        self.fps = 100 / elapsed if elapsed > 0 else 0
-                        self.last_time = now
-                        if self.running:  # Only emit status when streaming
-                            self.status_update.emit(f"Data rate: {self.fps:.1f} packets/s | Channels: {self.device.nchannels}")
-                            print(f"[RECEIVER] Packet #{self.packet_count}: {self.fps:.1f} packets/s")
+                if block_queue.closed:
+                    # Worker stopped on an error
+                    thread_alive = False
+                    break
             
             except socket.timeout:
                 # Socket timeout - normal when paused (running=False)
                 if self.running:
                     print("[RECEIVER] Socket timeout while streaming - no data in 5 seconds")
+                # The device stream may have restarted: the next ramp value is not a gap
+                self.stream_restarted = True
                 # Don't exit - continue loop to allow pause/resume
                 continue
                 
@@ -154,11 +150,181 @@ class DataReceiverThread(QtCore.QThread):
                 thread_alive = False
                 break
         
+        # Let the worker drain what is already queued, then stop it
+        block_queue.close()
+        worker.join()
+        
         print(f"[RECEIVER] Thread run() exiting - total packets received: {self.packet_count}")
         
         # Log any remaining buffer data
-        if buffer:
-            print(f"[RECEIVER] WARNING: {len(buffer)} bytes left in buffer on exit")
+        if len(reassembler):
+            print(f"[RECEIVER] WARNING: {len(reassembler)} bytes left in buffer on exit")
+        print(f"[RECEIVER] Reassembly stats: {reassembler.get_stats()}")
+        print(f"[RECEIVER] Queue stats: {block_queue.get_stats()}")
+
+    def _processing_loop(self):
+        """Worker loop: decode and process queued packets until the queue is closed and empty."""
+        block_queue = self.block_queue
+        while True:
+            data = block_queue.get(timeout=0.5)
+            if data is None:
+                if block_queue.closed and not len(block_queue):
+                    break
+                continue
+            try:
+                self._process_packet(data)
+            except Exception as e:
+                print(f"[RECEIVER] Processing error: {type(e).__name__}: {e}")
+                self.error_signal.emit(f"Error: {e}")
+                import traceback
+                traceback.print_exc()
+                block_queue.close()
+                break
+            finally:
+                block_queue.release()
+
+    def _process_packet(self, data):
+        """Decode one packet, run the stage graph, emit outputs and feed tracks."""
+        metrics = self.metrics
+        t_start = time.perf_counter_ns()
+        # View as big-endian signed shorts (16-bit), no per-sample unpacking.
+        # The view aliases the queue block until it is released.
+        reshaped = decode_packet(data, self.device.nchannels)
+        t = time.perf_counter_ns()
+        metrics.record('decode', t - t_start)
+        
+        if self.ramp_monitor is not None:
+            self._check_continuity(reshaped)
+            now = time.perf_counter_ns()
+            metrics.record('continuity', now - t)
+            t = now
+        
+        # Multi-stage processing: one pass over the stage graph computes each
+        # needed stage once; 'final' is only needed while tracks are fed
+        required = ('final',) if self.running else ()
+        outputs = self.graph.run(reshaped, required=required)
+        now = time.perf_counter_ns()
+        metrics.record('pipeline', now - t)
+        t = now
+        if self.packet_count == 0:
+            for stage_name, e in self.graph.last_errors.items():
+                print(f"[RECEIVER] Stage '{stage_name}' failed, using fallback data: {e}")
+        
+        # Emit stages that have subscribers. Outputs that alias the queue block
+        # are materialized once; freshly computed arrays are emitted as-is.
+        materialized = {}
+        for stage_name in self.graph.subscribed_stages():
+            out = outputs[stage_name]
+            if np.may_share_memory(out, reshaped):
+                if id(out) not in materialized:
+                    materialized[id(out)] = out.copy()
+                out = materialized[id(out)]
+            try:
+                self.stage_output.emit(stage_name, out)
+            except Exception as e:
+                if self.packet_count == 0:
+                    print(f"[RECEIVER] ERROR emitting {stage_name} stage_output: {e}")
+        emit_ns = time.perf_counter_ns() - t
+        
+        # Only feed tracks and emit signals when streaming is active
+        if self.running:
+            processed = outputs['final']
+            # Feed tracks with processed data
+            t = time.perf_counter_ns()
+            idx = 0
+            for track in self.tracks:
+                track.feed(processed[idx:idx + track.num_channels])
+                idx += track.num_channels
+            now = time.perf_counter_ns()
+            metrics.record('track_feed', now - t)
+            t = now
+            
+            if id(processed) in materialized:
+                processed = materialized[id(processed)]
+            elif np.may_share_memory(processed, reshaped):
+                processed = processed.copy()
+            self.data_received.emit(processed)
+            emit_ns += time.perf_counter_ns() - t
+        metrics.record('emit', emit_ns)
+        metrics.record('packet', time.perf_counter_ns() - t_start)
+        
+        # Update packet count and FPS
+        self.packet_count += 1
+        if self.packet_count == 1:
+            print(f"[RECEIVER] First packet processed successfully!")
+        
+        if self.packet_count % 100 == 0:
+            now = time.time()
+            elapsed = now - self.last_time
+            self.fps = 100 / elapsed if elapsed > 0 else 0
+            self.last_time = now
+            if self.running:  # Only emit status when streaming
+                self.status_update.emit(f"Data rate: {self.fps:.1f} packets/s | Channels: {self.device.nchannels}")
+                print(f"[RECEIVER] Packet #{self.packet_count}: {self.fps:.1f} packets/s | "
+                      f"buffer high-water hits: {self.reassembler.high_water_hits} | "
+                      f"queue depth: {len(self.block_queue)} (max {self.block_queue.max_depth}, "
+                      f"dropped {self.block_queue.dropped})")
+
+    def _check_continuity(self, reshaped):
+        """Count samples lost before this packet and watch the device buffer level."""
+        monitor = self.ramp_monitor
+        if self.stream_restarted:
+            self.stream_restarted = False
+            monitor.reset()
+        lost = monitor.check(reshaped)
+        if lost:
+            print(f"[RECEIVER] Sample loss: {lost} samples missing before packet #{self.packet_count + 1} "
+                  f"(total {monitor.lost_samples})")
+            self.sample_loss.emit(lost, monitor.lost_samples)
+        
+        level = monitor.buffer_level
+        if level is not None:
+            above = level > Config.DEVICE_BUFFER_WARNING
+            if above and not self.buffer_warning_active:
+                print(f"[RECEIVER] Device buffer level {level} above {Config.DEVICE_BUFFER_WARNING}")
+                self.device_buffer_warning.emit(level)
+            self.buffer_warning_active = above
+
+    def get_metrics(self):
+        """Get timing and throughput metrics of the receive/processing loop.
+
+        Phases (milliseconds per call): recv_wait (blocked in socket recv),
+        reassembly, queue_put (includes waiting on a full queue), decode,
+        continuity (Ramp/Buffer check), pipeline (whole stage graph) and
+        stage:<name> for each stage,
+        emit (stage_output and data_received signals), track_feed, and
+        packet (decode to the end of processing).
+
+        Returns:
+            dict: phases (name -> count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, total_ms),
+                packets, packets_per_s, budget_ms (signal duration of one packet),
+                budget_used (mean packet processing time / budget_ms), queue stats,
+                continuity (RampMonitor.get_stats(), None without a Ramp channel)
+        """
+        phases = self.metrics.snapshot()
+        budget_ms = 1000 * (self.device.frequency // 16) / self.device.frequency
+        packet = phases.get('packet')
+        return {
+            'phases': phases,
+            'packets': self.packet_count,
+            'packets_per_s': self.fps,
+            'budget_ms': budget_ms,
+            'budget_used': packet['mean_ms'] / budget_ms if packet else 0.0,
+            'queue': self.block_queue.get_stats() if self.block_queue is not None else None,
+            'continuity': self.ramp_monitor.get_stats() if self.ramp_monitor is not None else None,
+        }
+
+    def reset_metrics(self):
+        """Clear the timing histograms (e.g. after changing settings)."""
+        self.metrics.reset()
+
+    def subscribe_stage(self, stage_name):
+        """Request that `stage_name` outputs be computed and emitted via stage_output."""
+        self.graph.subscribe(stage_name)
+
+    def unsubscribe_stage(self, stage_name):
+        """Drop a subscription made with subscribe_stage()."""
+        self.graph.unsubscribe(stage_name)
 
     def stop(self):
         """Completely stop the receiver thread (called on window close)."""
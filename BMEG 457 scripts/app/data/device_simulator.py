@@ -0,0 +1,259 @@
+"""Sessantaquattro+ simulator: streams synthetic EMG to the app's TCP server.
+
+Behaves like the device: connects to the SessantaquattroPlus server, reads
+the 16-bit command word built by `create_command`, and streams big-endian
+int16 frames (interleaved by channel, frequency // 16 samples per packet)
+for the commanded NCH/FSAMP/MODE until GO is cleared or the socket closes.
+
+The signal is deterministic for a given seed: EMG bursts on the HDsEMG
+channels, 60 Hz hum, dead and saturated channels, and a sample counter on
+the ramp channel. `speed` scales the stream rate (2.0 = twice real time);
+speed=0 sends as fast as the receiver accepts, for throughput tests.
+
+Run from the "BMEG 457 scripts" directory, then start streaming in the app
+(started with `python main.py --simulate`, which skips the WiFi check):
+    python -m app.data.device_simulator
+    python -m app.data.device_simulator --speed 0 --duration 30
+"""
+
+import argparse
+import select
+import socket
+import time
+
+import numpy as np
+
+from app.core.device import SessantaquattroPlus
+
+PACKETS_PER_SECOND = 16
+ACCESSORY_CHANNELS = 8  # AUX 1, AUX 2, 4 quaternions, buffer, ramp
+LSB_VOLTS = 0.000000286  # HDsEMG conversion factor (V per LSB)
+
+
+def parse_command(command):
+    """Split a command word from `create_command` into its fields.
+
+    Returns:
+        dict: FSAMP, NCH, MODE, HRES, HPF, EXTEN, TRIG, REC, GO
+    """
+    command &= 0xFFFF
+    return {
+        'GO': command & 0x1,
+        'REC': (command >> 1) & 0x1,
+        'TRIG': (command >> 2) & 0x3,
+        'EXTEN': (command >> 4) & 0x3,
+        'HPF': (command >> 6) & 0x1,
+        'HRES': (command >> 7) & 0x1,
+        'MODE': (command >> 8) & 0x7,
+        'NCH': (command >> 11) & 0x3,
+        'FSAMP': (command >> 13) & 0x3,
+    }
+
+
+class SyntheticEMG:
+    """Deterministic multi-channel test signal in device units (int16).
+
+    Channel layout follows TrackManager: HDsEMG channels first, then the 8
+    accessory channels (AUX 1/2, quaternions, buffer, ramp) when they fit.
+    """
+
+    def __init__(self, nchannels, frequency, seed=0, dead_channels=(5,), saturated_channels=(20,),
+                 burst_period=2.0, burst_duty=0.5, hum_freq=60.0):
+        self.nchannels = nchannels
+        self.frequency = frequency
+        self.main = max(4, nchannels - ACCESSORY_CHANNELS)
+        self.has_accessory = nchannels >= self.main + ACCESSORY_CHANNELS
+        self.dead_channels = [c for c in dead_channels if c < self.main]
+        self.saturated_channels = [c for c in saturated_channels if c < self.main]
+        self.burst_period = burst_period
+        self.burst_duty = burst_duty
+        self.hum_freq = hum_freq
+        self.rng = np.random.default_rng(seed)
+        self.sample = 0  # absolute index of the next sample
+
+        # Per-channel burst amplitude: smooth hot spot across the array, ~0.1-0.5 mV RMS
+        position = np.arange(self.main) / max(1, self.main - 1)
+        self.gain = (0.1e-3 + 0.4e-3 * np.exp(-((position - 0.4) / 0.25) ** 2)) / LSB_VOLTS
+        self.gain[self.saturated_channels] *= 100  # clips at the int16 limits during bursts
+        self.baseline = 5e-6 / LSB_VOLTS  # ~5 uV RMS noise at rest
+        self.hum = 20e-6 / LSB_VOLTS * self.rng.uniform(0.5, 1.5, self.main)[:, None]  # 60 Hz pickup
+
+    def envelope(self, t):
+        """Burst activation in [0, 1] at times t (seconds): on for burst_duty of each period."""
+        phase = (t % self.burst_period) / self.burst_period
+        edge = 0.1  # fraction of the period spent ramping up/down
+        rise = np.clip(phase / edge, 0, 1)
+        fall = np.clip((self.burst_duty - phase) / edge, 0, 1)
+        return np.minimum(rise, fall)
+
+    def next_block(self, nsamples):
+        """Return the next (nchannels, nsamples) int16 block."""
+        n = np.arange(self.sample, self.sample + nsamples)
+        t = n / self.frequency
+        out = np.zeros((self.nchannels, nsamples))
+
+        noise = self.rng.standard_normal((self.main, nsamples))
+        amplitude = self.baseline + self.gain[:, None] * self.envelope(t)
+        out[:self.main] = noise * amplitude + self.hum * np.sin(2 * np.pi * self.hum_freq * t)
+        out[self.dead_channels] = 0
+
+        if self.has_accessory:
+            aux = self.main
+            out[aux] = 1000 * np.sin(2 * np.pi * 0.5 * t)       # AUX 1: slow sine
+            out[aux + 1] = 1000 * (self.envelope(t) > 0.5)      # AUX 2: burst trigger
+            out[aux + 2] = 16384                                # quaternions: identity rotation
+            out[aux + 6] = 0                                    # buffer usage
+            out[aux + 7] = (n + 2 ** 15) % 2 ** 16 - 2 ** 15    # ramp: sample counter, wraps like int16
+
+        self.sample += nsamples
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16)
+
+
+class DeviceSimulator:
+    """TCP client standing in for the Sessantaquattro+.
+
+    Args:
+        host, port: address of the app's SessantaquattroPlus server
+        speed: stream rate relative to real time; 0 = as fast as possible
+        duration: stop after this many seconds of signal (None = until stopped)
+        seed: seed of the synthetic signal
+        connect_timeout: seconds to keep retrying while the server is not listening yet
+    """
+
+    def __init__(self, host="127.0.0.1", port=45454, speed=1.0, duration=None, seed=0, connect_timeout=30,
+                 **signal_options):
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.duration = duration
+        self.seed = seed
+        self.connect_timeout = connect_timeout
+        self.signal_options = signal_options
+        self.sock = None
+        self.running = False
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.elapsed = 0.0
+
+    def connect(self):
+        deadline = time.perf_counter() + self.connect_timeout
+        while True:
+            try:
+                self.sock = socket.create_connection((self.host, self.port), timeout=1.0)
+                self.sock.settimeout(None)
+                print(f"[SIMULATOR] Connected to {self.host}:{self.port}")
+                return
+            except OSError:
+                if time.perf_counter() > deadline:
+                    raise ConnectionError(f"No server at {self.host}:{self.port} after {self.connect_timeout} s")
+                time.sleep(0.2)
+
+    def _read_command(self, timeout=None):
+        """Read one 2-byte command.
+
+        Returns None if the server closed the connection, or False if no
+        command arrived within `timeout` seconds (None = wait indefinitely).
+        """
+        if timeout is not None:
+            ready, _, _ = select.select([self.sock], [], [], timeout)
+            if not ready:
+                return False
+        data = b''
+        while len(data) < 2:
+            chunk = self.sock.recv(2 - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return int.from_bytes(data, byteorder='big', signed=True)
+
+    def run(self):
+        """Connect, wait for a start command and stream until stopped.
+
+        Returns:
+            dict: packets, bytes, elapsed seconds and achieved rate relative to real time
+        """
+        self.running = True
+        if self.sock is None:
+            self.connect()
+        try:
+            command = self._read_command()
+            while command is not None and self.running:
+                fields = parse_command(command)
+                if fields['GO']:
+                    command = self._stream(fields)
+                else:
+                    print("[SIMULATOR] GO=0 received, waiting for a new command")
+                    command = self._read_command()
+        except (ConnectionError, OSError) as e:
+            print(f"[SIMULATOR] Connection closed: {e}")
+        finally:
+            self.running = False
+            self.sock.close()
+            self.sock = None
+        return self.get_stats()
+
+    def _stream(self, fields):
+        """Stream packets for one GO command; returns the next command, or None to stop."""
+        device = SessantaquattroPlus()
+        nchannels = device.get_num_channels(fields['NCH'], fields['MODE'])
+        frequency = device.get_sampling_frequency(fields['FSAMP'], fields['MODE'])
+        packet_samples = frequency // PACKETS_PER_SECOND
+        signal = SyntheticEMG(nchannels, frequency, seed=self.seed, **self.signal_options)
+        pace = packet_samples / frequency / self.speed if self.speed else 0.0
+        max_packets = None if self.duration is None else int(self.duration * PACKETS_PER_SECOND)
+        print(f"[SIMULATOR] Streaming {nchannels} channels at {frequency} Hz "
+              f"({'max rate' if not pace else f'{self.speed:g}x real time'})")
+
+        start = time.perf_counter()
+        sent = 0
+        try:
+            while self.running and (max_packets is None or sent < max_packets):
+                packet = signal.next_block(packet_samples).T.astype('>i2').tobytes()
+                self.sock.sendall(packet)
+                sent += 1
+                self.packets_sent += 1
+                self.bytes_sent += len(packet)
+
+                # Sleep until the next packet is due; poll for a new command meanwhile
+                wait = start + sent * pace - time.perf_counter() if pace else 0.0
+                command = self._read_command(timeout=max(0.0, wait))
+                if command is not False:
+                    return command
+            return None
+        finally:
+            self.elapsed += time.perf_counter() - start
+            print(f"[SIMULATOR] Sent {sent} packets")
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self):
+        seconds_of_signal = self.packets_sent / PACKETS_PER_SECOND
+        return {
+            'packets': self.packets_sent,
+            'bytes': self.bytes_sent,
+            'elapsed': self.elapsed,
+            'realtime_factor': seconds_of_signal / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Sessantaquattro+ for the OTB-Python-App")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=45454)
+    parser.add_argument('--speed', type=float, default=1.0, help="rate relative to real time (0 = as fast as possible)")
+    parser.add_argument('--duration', type=float, default=None, help="seconds of signal to send")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    simulator = DeviceSimulator(args.host, args.port, speed=args.speed, duration=args.duration, seed=args.seed)
+    try:
+        stats = simulator.run()
+    except KeyboardInterrupt:
+        stats = simulator.get_stats()
+    print(f"[SIMULATOR] {stats['packets']} packets, {stats['bytes'] / 1e6:.1f} MB, "
+          f"{stats['realtime_factor']:.1f}x real time")
+
+
+if __name__ == "__main__":
+    main()
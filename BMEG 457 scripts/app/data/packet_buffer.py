@@ -0,0 +1,114 @@
+"""Fixed-capacity socket reassembly buffer for device packets."""
+
+
+class PacketReassembler:
+    """Reassemble fixed-size packets from a stream socket without copying.
+
+    Bytes are received straight into a preallocated bytearray with
+    `recv_into`, and complete packets are handed out as memoryview slices of
+    that same bytearray. A handed-out view is only valid until the next call
+    to `recv_into`, which may compact the unread tail to the front.
+
+    The high-water mark is a fill level (fraction of capacity). Every
+    receive that leaves the buffer at or above it is counted, which tells
+    the caller it is falling behind the device.
+    """
+
+    def __init__(self, packet_size, capacity_packets=8, high_water=0.75):
+        if packet_size <= 0:
+            raise ValueError("packet_size must be positive")
+        if capacity_packets < 2:
+            raise ValueError("capacity_packets must be at least 2")
+
+        self.packet_size = packet_size
+        self.capacity = packet_size * capacity_packets
+        self.high_water_bytes = int(self.capacity * high_water)
+
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self._read_pos = 0   # start of unread data
+        self._write_pos = 0  # end of unread data
+
+        # Statistics
+        self.bytes_received = 0
+        self.packets_out = 0
+        self.recv_calls = 0
+        self.compactions = 0
+        self.high_water_hits = 0
+        self.peak_fill = 0
+
+    def __len__(self):
+        """Number of unread bytes currently held."""
+        return self._write_pos - self._read_pos
+
+    def recv_into(self, sock):
+        """Receive from `sock` into the free space of the buffer.
+
+        Returns the number of bytes received (0 means the peer closed).
+        """
+        self._make_room()
+        if self._write_pos == self.capacity:
+            raise BufferError("Reassembly buffer full - packets were not consumed")
+        n = sock.recv_into(self._view[self._write_pos:])
+        self.recv_calls += 1
+        if n:
+            self._write_pos += n
+            self.bytes_received += n
+            fill = len(self)
+            if fill > self.peak_fill:
+                self.peak_fill = fill
+            if fill >= self.high_water_bytes:
+                self.high_water_hits += 1
+        return n
+
+    def next_packet(self):
+        """Return a memoryview of the next complete packet, or None."""
+        if len(self) < self.packet_size:
+            return None
+        start = self._read_pos
+        self._read_pos += self.packet_size
+        self.packets_out += 1
+        return self._view[start:self._read_pos]
+
+    def packets(self):
+        """Yield every complete packet currently buffered."""
+        packet = self.next_packet()
+        while packet is not None:
+            yield packet
+            packet = self.next_packet()
+
+    def _make_room(self):
+        """Ensure at least one packet worth of free space at the write end."""
+        if self._read_pos == self._write_pos:
+            # Everything consumed - rewind for free
+            self._read_pos = self._write_pos = 0
+        elif self.capacity - self._write_pos < self.packet_size and self._read_pos > 0:
+            # Move the unread tail (normally less than one packet) to the front.
+            # bytes() keeps the copy well-defined when source and target overlap.
+            unread = len(self)
+            self._buffer[:unread] = bytes(self._view[self._read_pos:self._write_pos])
+            self._read_pos = 0
+            self._write_pos = unread
+            self.compactions += 1
+
+    def reset(self):
+        """Drop any buffered bytes."""
+        self._read_pos = self._write_pos = 0
+
+    def get_stats(self):
+        """Get reassembly statistics.
+
+        Returns:
+            dict: Counters describing buffer usage since creation
+        """
+        return {
+            'capacity': self.capacity,
+            'fill': len(self),
+            'peak_fill': self.peak_fill,
+            'high_water_bytes': self.high_water_bytes,
+            'high_water_hits': self.high_water_hits,
+            'recv_calls': self.recv_calls,
+            'bytes_received': self.bytes_received,
+            'packets_out': self.packets_out,
+            'compactions': self.compactions,
+        }
@@ -0,0 +1,105 @@
+"""Sample-loss detection from the device's Ramp counter and Buffer channels."""
+
+import numpy as np
+
+RAMP_MODULO = 1 << 16  # the ramp is sent as a 16-bit sample and wraps around
+RESYNC_STEP = RAMP_MODULO // 2  # larger forward steps are a counter restart, not a gap
+
+
+def accessory_channels(nchannels):
+    """Return (buffer_channel, ramp_channel) for a device channel count, or None.
+
+    Matches the track layout of TrackManager: the 8 accessory channels are
+    the last ones, ending with Buffer and Ramp (70 and 71 in 72-channel mode).
+    """
+    if nchannels < 12:  # fewer than 4 HDsEMG channels + 8 accessory channels
+        return None
+    return nchannels - 2, nchannels - 1
+
+
+class RampMonitor:
+    """Checks the Ramp counter of every packet for missing samples.
+
+    The device increments the ramp by `step` per sample, so any other
+    difference between consecutive samples (modulo 2**16, including across
+    packet boundaries) is a gap: a difference of d means d // step - 1
+    samples were lost. A difference of 0 means a repeated sample. A
+    difference above RESYNC_STEP is the counter jumping backwards (the device
+    restarted its stream); it is counted as a resync and the check carries
+    on from the new value without reporting a loss.
+
+    The Buffer channel reports how full the device's transmit buffer is;
+    its latest and highest values are tracked so a growing backlog
+    (processing or WiFi too slow for the device) is visible before samples
+    are actually lost.
+    """
+
+    def __init__(self, ramp_channel, buffer_channel=None, step=1):
+        self.ramp_channel = ramp_channel
+        self.buffer_channel = buffer_channel
+        self.step = step
+        self.last_ramp = None
+        self.samples_checked = 0
+        self.lost_samples = 0
+        self.gaps = 0             # discontinuities that lost samples
+        self.repeated_samples = 0
+        self.resyncs = 0          # ramp restarts (jumps backwards)
+        self.buffer_level = None  # last Buffer channel value
+        self.buffer_max = None
+
+    def check(self, block):
+        """Check one decoded (channels, samples) packet.
+
+        Returns:
+            int: samples lost before or inside this packet
+        """
+        ramp = block[self.ramp_channel].astype(np.int64)
+        if self.last_ramp is None:
+            steps = np.diff(ramp)
+        else:
+            steps = np.diff(ramp, prepend=self.last_ramp)
+        self.last_ramp = int(ramp[-1])
+        steps %= RAMP_MODULO
+        self.samples_checked += ramp.size
+
+        lost = 0
+        bad = steps != self.step
+        if bad.any():
+            bad_steps = steps[bad]
+            resync = bad_steps > RESYNC_STEP
+            repeated = int(np.count_nonzero(bad_steps == 0))
+            missing = bad_steps[(bad_steps != 0) & ~resync] // self.step - 1
+            lost = int(missing.sum())
+            self.repeated_samples += repeated
+            self.resyncs += int(np.count_nonzero(resync))
+            self.gaps += int(np.count_nonzero(missing))
+            self.lost_samples += lost
+
+        if self.buffer_channel is not None:
+            level = int(block[self.buffer_channel].max())
+            self.buffer_level = level
+            self.buffer_max = level if self.buffer_max is None else max(self.buffer_max, level)
+        return lost
+
+    def reset(self):
+        """Forget the counters and the last ramp value (e.g. after reconnecting)."""
+        self.__init__(self.ramp_channel, self.buffer_channel, self.step)
+
+    def get_stats(self):
+        """Get continuity counters.
+
+        Returns:
+            dict: samples_checked, lost_samples, loss_ratio, gaps, repeated_samples,
+                resyncs, buffer_level, buffer_max
+        """
+        checked = self.samples_checked + self.lost_samples
+        return {
+            'samples_checked': self.samples_checked,
+            'lost_samples': self.lost_samples,
+            'loss_ratio': self.lost_samples / checked if checked else 0.0,
+            'gaps': self.gaps,
+            'repeated_samples': self.repeated_samples,
+            'resyncs': self.resyncs,
+            'buffer_level': self.buffer_level,
+            'buffer_max': self.buffer_max,
+        }
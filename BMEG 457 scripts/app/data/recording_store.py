@@ -0,0 +1,90 @@
+"""In-memory sample store used by RecordingManager."""
+
+import numpy as np
+
+
+class ChunkedSampleStore:
+    """Append-only (channels, samples) int16 store made of preallocated chunks.
+
+    Whole packets are copied in with one slice assignment per chunk they
+    touch. Each packet also records an anchor time. With a sampling
+    frequency, sample i is timestamped first anchor + i / fs: packets reach
+    the GUI thread in bursts, so later anchors are only arrival times and
+    would give overlapping, non-monotonic timestamps. Without one, every
+    sample gets its packet's anchor.
+    """
+
+    def __init__(self, nchannels, sampling_frequency=None, chunk_samples=65536, dtype=np.int16):
+        self.nchannels = nchannels
+        self.sampling_frequency = sampling_frequency
+        self.chunk_samples = chunk_samples
+        self.dtype = np.dtype(dtype)
+
+        self._chunks = []
+        self.num_samples = 0
+
+        # Per-packet anchors: index of the packet's first sample and its time
+        self._packet_starts = []
+        self._packet_times = []
+
+    def __len__(self):
+        return self.num_samples
+
+    def append(self, data, anchor_time, max_samples=None):
+        """Append a (channels, samples) packet.
+
+        Args:
+            data: array of shape (nchannels, samples)
+            anchor_time: time (s) of the packet's first sample
+            max_samples: optional cap; samples beyond it are not stored
+
+        Returns:
+            int: number of samples stored
+        """
+        n = data.shape[1]
+        if max_samples is not None:
+            n = min(n, max_samples - self.num_samples)
+        if n <= 0:
+            return 0
+
+        self._packet_starts.append(self.num_samples)
+        self._packet_times.append(anchor_time)
+
+        written = 0
+        while written < n:
+            if self.num_samples == len(self._chunks) * self.chunk_samples:
+                self._chunks.append(np.empty((self.nchannels, self.chunk_samples), dtype=self.dtype))
+            chunk = self._chunks[-1]
+            offset = self.num_samples % self.chunk_samples
+            count = min(n - written, self.chunk_samples - offset)
+            chunk[:, offset:offset + count] = data[:, written:written + count]
+            written += count
+            self.num_samples += count
+        return n
+
+    def timestamps(self, start=0, stop=None):
+        """Timestamps (s) for samples [start, stop)."""
+        stop = self.num_samples if stop is None else stop
+        index = np.arange(start, stop)
+        if not self._packet_starts:
+            return index.astype(np.float64)
+        if self.sampling_frequency:
+            return self._packet_times[0] + index / self.sampling_frequency
+        starts = np.asarray(self._packet_starts)
+        packet = np.searchsorted(starts, index, side='right') - 1
+        return np.asarray(self._packet_times, dtype=np.float64)[packet]
+
+    def iter_chunks(self):
+        """Yield (start_index, view) for each filled chunk, in order."""
+        for i, chunk in enumerate(self._chunks):
+            start = i * self.chunk_samples
+            filled = min(self.chunk_samples, self.num_samples - start)
+            if filled <= 0:
+                break
+            yield start, chunk[:, :filled]
+
+    def to_array(self):
+        """Return all samples as one contiguous (channels, samples) array."""
+        if not self._chunks:
+            return np.empty((self.nchannels, 0), dtype=self.dtype)
+        return np.concatenate([view for _, view in self.iter_chunks()], axis=1)
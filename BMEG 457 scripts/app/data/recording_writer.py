@@ -0,0 +1,122 @@
+"""Incremental recording writers used by RecordingManager's streaming backend."""
+
+import csv
+import queue
+import threading
+
+import numpy as np
+
+
+class CsvSink:
+    """Append packets to a CSV file with the same layout as save_recording_to_csv.
+
+    Columns: Timestamp, Channel_1 ... Channel_N. With a sampling frequency,
+    sample i is timestamped first anchor + i / fs (as ChunkedSampleStore
+    does), so timestamps stay evenly spaced however bursty packet arrival
+    was; without one, every sample gets its packet's anchor.
+    """
+
+    extension = '.csv'
+
+    def __init__(self, filename, nchannels, sampling_frequency=None, metadata=None):
+        self.filename = filename
+        self.nchannels = nchannels
+        self.sampling_frequency = sampling_frequency
+        self._file = open(filename, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['Timestamp'] + [f'Channel_{i+1}' for i in range(nchannels)])
+        self.first_anchor = None
+        self.num_samples = 0
+
+    def write(self, data, anchor_time):
+        if self.first_anchor is None:
+            self.first_anchor = anchor_time
+        n = data.shape[1]
+        if self.sampling_frequency:
+            timestamps = self.first_anchor + np.arange(self.num_samples, self.num_samples + n) / self.sampling_frequency
+        else:
+            timestamps = np.full(n, anchor_time, dtype=np.float64)
+        self.num_samples += n
+        self._writer.writerows([t] + row for t, row in zip(timestamps.tolist(), data.T.tolist()))
+
+    def close(self):
+        self._file.close()
+
+
+class StreamingRecorder:
+    """Write recorded packets to disk from a background thread as they arrive.
+
+    `write()` only enqueues the packet, so the caller (the GUI thread) never
+    waits on disk I/O and memory use stays flat for any recording length.
+    The sink is created by the writer thread on the first packet, once the
+    channel count is known. `stop()` returns immediately; the writer drains
+    whatever is still queued and closes the file on its own.
+    """
+
+    def __init__(self, filename, sampling_frequency=None, sink_class=CsvSink, metadata=None, on_error=None):
+        self.filename = filename
+        self.sampling_frequency = sampling_frequency
+        self.sink_class = sink_class
+        self.metadata = metadata
+        self.on_error = on_error
+
+        self.num_samples = 0      # samples accepted by write()
+        self.samples_written = 0  # samples flushed to the sink
+        self.error = None
+
+        self._queue = queue.Queue()
+        self._sink = None
+        self._thread = threading.Thread(target=self._run, name="RecordingWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, data, anchor_time):
+        """Queue a (channels, samples) packet; `data` must not be modified afterwards."""
+        if self.error is not None:
+            return
+        self.num_samples += data.shape[1]
+        self._queue.put((data, anchor_time))
+
+    def stop(self):
+        """Ask the writer to finish; does not wait for queued packets to be written."""
+        self._queue.put(None)
+
+    def wait(self, timeout=None):
+        """Block until the writer has flushed everything and closed the file.
+
+        Returns:
+            bool: True if the writer finished within `timeout`
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def pending_packets(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue  # keep draining so stop() is still honoured
+            data, anchor_time = item
+            try:
+                if self._sink is None:
+                    self._sink = self.sink_class(self.filename, data.shape[0], self.sampling_frequency,
+                                                 metadata=self.metadata)
+                self._sink.write(data, anchor_time)
+                self.samples_written += data.shape[1]
+            except Exception as e:
+                self.error = e
+                print(f"[RECORDING] Writer error: {e}")
+                if self.on_error is not None:
+                    self.on_error(e)
+
+        if self._sink is not None:
+            try:
+                self._sink.close()
+            except Exception as e:
+                self.error = self.error or e
+                print(f"[RECORDING] Error closing {self.filename}: {e}")
+        print(f"[RECORDING] Writer finished: {self.samples_written} samples in {self.filename}")
@@ -0,0 +1,260 @@
+"""Replay a recorded session through the live receive path.
+
+`ReplayDevice` stands in for SessantaquattroPlus: its `client_socket` is a
+`ReplaySocket` that hands out the recording as device packets (big-endian
+int16, interleaved by channel, frequency // 16 samples each), so
+DataReceiverThread and SoundtrackWindow run exactly as with the device.
+Packets are paced at `speed` times real time; speed=0 is unthrottled.
+
+Readable recordings:
+    .csv        written by RecordingManager (Timestamp + Channel_N columns)
+    .bin/.json  binary recordings (app.data.binary_recording)
+    .otbc       chunked recordings (app.data.chunked_recording)
+    .otb+/.otb4 OT BioLab archives with 16-bit samples
+"""
+
+import csv
+import os
+import socket
+import tarfile
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from app.data.binary_recording import BinaryRecording
+from app.data.chunked_recording import ChunkedRecording
+
+PACKETS_PER_SECOND = 16
+DEVICE_FREQUENCIES = (500, 1000, 2000, 4000, 8000, 16000)
+RECORDING_EXTENSIONS = ('.csv', '.bin', '.json', '.otbc', '.otb+', '.otb4')
+NO_RAMP_EXTENSIONS = ('.otb+', '.otb4')  # OT BioLab exports: the last channels are not Buffer/Ramp
+
+
+def load_recording(filename):
+    """Read a recording as raw device samples.
+
+    Returns:
+        tuple: (data, frequency) with data an int16 array of shape (channels, samples)
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.csv':
+        return _load_csv(filename)
+    if ext in ('.bin', '.json'):
+        recording = BinaryRecording(filename)
+        return recording.read(), int(recording.sampling_frequency)
+    if ext == '.otbc':
+        recording = ChunkedRecording(filename)
+        return recording.read(), int(recording.sampling_frequency)
+    if ext == '.otb+':
+        return _load_otb_plus(filename)
+    if ext == '.otb4':
+        return _load_otb4(filename)
+    raise ValueError(f"Unsupported recording type '{ext}' (supported: {', '.join(RECORDING_EXTENSIONS)})")
+
+
+def _nearest_device_frequency(frequency):
+    return min(DEVICE_FREQUENCIES, key=lambda f: abs(f - frequency))
+
+
+def _load_csv(filename):
+    with open(filename, newline='') as f:
+        header = next(csv.reader(f))
+        if not header or header[0] != 'Timestamp':
+            raise ValueError(f"{filename} is not a recording CSV (expected a Timestamp column first)")
+        table = np.loadtxt(f, delimiter=',', ndmin=2)
+    if table.shape[0] < 2:
+        raise ValueError(f"{filename} has fewer than 2 samples")
+    # Timestamps are packet anchor + i / fs, so the typical step is the sample period
+    period = np.median(np.diff(table[:, 0]))
+    frequency = _nearest_device_frequency(1 / period) if period > 0 else 2000
+    data = np.clip(np.round(table[:, 1:].T), -32768, 32767).astype(np.int16)
+    return data, frequency
+
+
+def _read_member(archive, name):
+    member = archive.extractfile(name)
+    if member is None:
+        raise ValueError(f"{archive.name}: '{name}' is not a file")
+    return member.read()
+
+
+def _samples_from_sig(raw, nchannels, bits, filename):
+    if bits != 16:
+        raise ValueError(f"{filename}: {bits}-bit samples are not supported, only 16-bit")
+    samples = np.frombuffer(raw, dtype='<i2')
+    usable = samples.size // nchannels * nchannels
+    return samples[:usable].reshape(-1, nchannels).T.copy()
+
+
+def _load_otb_plus(filename):
+    """OTB+: tar with <name>.sig (little-endian samples, interleaved) and <name>.xml (Device attributes)."""
+    with tarfile.open(filename) as archive:
+        names = archive.getnames()
+        sig = next((n for n in names if n.lower().endswith('.sig')), None)
+        if sig is None:
+            raise ValueError(f"{filename}: no .sig file in archive")
+        xml_name = os.path.splitext(sig)[0] + '.xml'
+        if xml_name not in names:
+            raise ValueError(f"{filename}: missing {xml_name}")
+        device = ET.fromstring(_read_member(archive, xml_name))
+        if device.tag != 'Device':
+            device = device.find('.//Device')
+        nchannels = int(device.get('DeviceTotalChannels'))
+        frequency = int(float(device.get('SampleFrequency')))
+        bits = int(device.get('ad_bits', 16))
+        return _samples_from_sig(_read_member(archive, sig), nchannels, bits, filename), frequency
+
+
+def _load_otb4(filename):
+    """OTB4: tar with Tracks_*.xml (TrackInfo entries) and the .sig signal streams they refer to.
+
+    The tracks of the largest signal stream are read; their channels are
+    interleaved in that stream in track order.
+    """
+    with tarfile.open(filename) as archive:
+        names = archive.getnames()
+        tracks = []
+        for name in names:
+            if name.lower().endswith('.xml') and os.path.basename(name).lower().startswith('tracks'):
+                tracks += ET.fromstring(_read_member(archive, name)).iter('TrackInfo')
+        if not tracks:
+            raise ValueError(f"{filename}: no TrackInfo entries found")
+        sig_files = [n for n in names if n.lower().endswith('.sig')]
+
+        streams = {}  # signal stream file -> [(nchannels, frequency, bits)]
+        for track in tracks:
+            path = track.findtext('SignalStreamPath') or (sig_files[0] if len(sig_files) == 1 else None)
+            if path is None:
+                raise ValueError(f"{filename}: track without SignalStreamPath")
+            streams.setdefault(os.path.basename(path), []).append((
+                int(track.findtext('NumberOfChannels')),
+                int(float(track.findtext('SamplingFrequency'))),
+                int(track.findtext('ADC_Nbits') or 16),
+            ))
+        stream, info = max(streams.items(), key=lambda item: sum(t[0] for t in item[1]))
+        sig = next((n for n in sig_files if os.path.basename(n) == stream), None)
+        if sig is None:
+            raise ValueError(f"{filename}: signal stream {stream} not in archive")
+        nchannels = sum(t[0] for t in info)
+        frequency = info[0][1]
+        bits = info[0][2]
+        return _samples_from_sig(_read_member(archive, sig), nchannels, bits, filename), frequency
+
+
+class ReplaySocket:
+    """Socket-like source of device packets from an in-memory recording.
+
+    Implements the calls DataReceiverThread makes (recv_into, settimeout,
+    close). Packets become available at `speed` times real time from
+    `start()`; recv_into blocks until the next one is due and returns 0
+    (peer closed) at the end of the recording.
+    """
+
+    def __init__(self, data, frequency, speed=1.0):
+        self.data = data
+        self.frequency = frequency
+        self.speed = speed
+        self.packet_samples = frequency // PACKETS_PER_SECOND
+        self.num_packets = data.shape[1] // self.packet_samples
+        self.packet_index = 0     # packets handed out (including the one being read)
+        self._pending = None      # unread bytes of the current packet
+        self._start = None
+        self._timeout = None
+        self._closed = False
+
+    def start(self):
+        """Start the replay clock (done by the GO command)."""
+        self._start = time.perf_counter()
+        self.packet_index = 0
+
+    def settimeout(self, timeout):
+        self._timeout = timeout
+
+    def close(self):
+        self._closed = True
+
+    def _next_packet(self):
+        if self.packet_index >= self.num_packets:
+            return None
+        if self.speed:
+            due = self._start + self.packet_index / PACKETS_PER_SECOND / self.speed
+            wait = due - time.perf_counter()
+            if wait > 0:
+                if self._timeout is not None and wait > self._timeout:
+                    time.sleep(self._timeout)
+                    raise socket.timeout("timed out")
+                time.sleep(wait)
+        n = self.packet_index * self.packet_samples
+        self.packet_index += 1
+        return memoryview(self.data[:, n:n + self.packet_samples].T.astype('>i2').tobytes())
+
+    def recv_into(self, buffer, nbytes=0):
+        if self._closed:
+            raise OSError("replay socket closed")
+        if self._start is None:
+            # No GO yet: behave like a silent device
+            if self._timeout is not None:
+                time.sleep(self._timeout)
+                raise socket.timeout("timed out")
+            raise OSError("replay not started")
+        if not self._pending:
+            self._pending = self._next_packet()
+            if self._pending is None:
+                return 0
+        n = min(len(buffer), len(self._pending), nbytes or len(buffer))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    @property
+    def finished(self):
+        """True once the whole recording has been handed out."""
+        return self.packet_index >= self.num_packets and not self._pending
+
+    @property
+    def position(self):
+        """Seconds of the recording handed out so far."""
+        return self.packet_index / PACKETS_PER_SECOND
+
+    @property
+    def duration(self):
+        return self.num_packets / PACKETS_PER_SECOND
+
+
+class ReplayDevice:
+    """Drop-in replacement for SessantaquattroPlus that streams a recording.
+
+    Channel count and sampling frequency come from the recording, so the
+    command built by create_command is ignored apart from its GO bit.
+    `has_ramp` is False for OT BioLab archives, which carry no Ramp counter
+    for the receiver's continuity check.
+    """
+
+    def __init__(self, filename, speed=1.0):
+        self.filename = filename
+        self.speed = speed
+        self.data, self.frequency = load_recording(filename)
+        self.nchannels = self.data.shape[0]
+        self.has_ramp = os.path.splitext(filename)[1].lower() not in NO_RAMP_EXTENSIONS
+        self.server_socket = None
+        self.client_socket = None
+        print(f"[REPLAY] {os.path.basename(filename)}: {self.nchannels} channels at {self.frequency} Hz, "
+              f"{self.data.shape[1] / self.frequency:.1f} s "
+              f"({'unthrottled' if not speed else f'{speed:g}x real time'})")
+
+    def create_command(self, GO=1, **kwargs):
+        """Return the GO bit; the rest of the configuration comes from the recording."""
+        return GO
+
+    def start_server(self, connection_timeout=10):
+        self.client_socket = ReplaySocket(self.data, self.frequency, speed=self.speed)
+
+    def send_command(self, command):
+        if command & 1:
+            self.client_socket.start()
+            print("[REPLAY] Replay started")
+
+    def stop_server(self):
+        if self.client_socket:
+            self.client_socket.close()
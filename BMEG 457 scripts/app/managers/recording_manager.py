@@ -1,4 +1,21 @@
-"""Recording manager for handling EMG data recording and CSV export."""
+"""Recording manager for handling EMG data recording and CSV export.
+
+Two backends are available:
+    'memory' - samples are kept in RAM (capped at max_samples) and written
+               to disk by save_recording() after recording stops
+    'stream' - packets are written to disk by a background thread while
+               recording, so length is limited only by disk space and
+               saving at stop time is immediate
+
+and three file formats:
+    'csv'    - Timestamp + one column per channel
+    'binary' - raw int16 frames (.bin) with a JSON sidecar holding fs,
+               channel layout, conversion factors and calibration values;
+               read back with app.data.binary_recording.BinaryRecording
+    'chunked' - chunked, losslessly compressed channel blocks (.otbc) for
+               long sessions; read back with
+               app.data.chunked_recording.ChunkedRecording
+"""
 
 from PyQt5 import QtWidgets, QtCore
 import csv
@@ -6,6 +23,11 @@ from datetime import datetime
 import os
 import time
 
+from app.data.binary_recording import BinarySink
+from app.data.chunked_recording import ChunkedSink
+from app.data.recording_store import ChunkedSampleStore
+from app.data.recording_writer import CsvSink, StreamingRecorder
+
 
 class RecordingManager(QtCore.QObject):
     """Manages recording state and CSV export for EMG data."""
@@ -15,17 +37,52 @@ class RecordingManager(QtCore.QObject):
     # Signal emitted when recording status changes
     status_update = QtCore.pyqtSignal(str)
     
-    def __init__(self, max_samples=1000000):
+    BACKENDS = ('memory', 'stream')
+    SINKS = {'csv': CsvSink, 'binary': BinarySink, 'chunked': ChunkedSink}
+    
+    def __init__(self, max_samples=1000000, sampling_frequency=None, backend='memory', file_format='csv',
+                 recordings_dir="recordings"):
         super().__init__()
-        self.recording_data = []  # List of (timestamp, channel_data) tuples
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown recording backend '{backend}', expected one of {self.BACKENDS}")
+        if file_format not in self.SINKS:
+            raise ValueError(f"Unknown recording format '{file_format}', expected one of {tuple(self.SINKS)}")
+        self.recording_data = None  # ChunkedSampleStore, created on the first packet ('memory' backend)
+        self.writer = None  # StreamingRecorder for the current recording ('stream' backend)
         self.recording_start_time = None
-        self.max_recording_samples = max_samples
+        self.max_recording_samples = max_samples  # only enforced by the 'memory' backend
+        self.sampling_frequency = sampling_frequency  # used to interpolate sample timestamps
+        self.backend = backend
+        self.file_format = file_format
+        self.recordings_dir = recordings_dir
+        # Extra information stored with binary recordings (track layout, calibration, ...)
+        self.metadata = {}
         self.is_recording = False
     
+    @property
+    def num_samples(self):
+        if self.writer is not None:
+            return self.writer.num_samples
+        return len(self.recording_data) if self.recording_data is not None else 0
+    
+    def _new_recording_filename(self, extension):
+        """Create the recordings directory if needed and return a timestamped file path."""
+        if not os.path.exists(self.recordings_dir):
+            os.makedirs(self.recordings_dir)
+        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.recordings_dir, f"recording_{timestamp_str}{extension}")
+    
     def start_recording(self):
         """Start recording data."""
-        self.recording_data = []
+        self.recording_data = None
+        self.writer = None
         self.recording_start_time = time.time()
+        if self.backend == 'stream':
+            sink_class = self.SINKS[self.file_format]
+            filename = self._new_recording_filename(sink_class.extension)
+            self.writer = StreamingRecorder(filename, self.sampling_frequency, sink_class=sink_class,
+                                            metadata=self._recording_metadata(), on_error=self._on_writer_error)
+            print(f"[RECORDING] Streaming to {filename}")
         self.is_recording = True
         print("[RECORDING] Recording started - waiting for data...")
         print(f"[RECORDING] is_recording flag set to: {self.is_recording}")
@@ -33,10 +90,40 @@ class RecordingManager(QtCore.QObject):
     
     def stop_recording(self):
         """Stop recording data."""
-        print(f"[RECORDING] Recording stopped - collected {len(self.recording_data)} samples")
+        print(f"[RECORDING] Recording stopped - collected {self.num_samples} samples")
         self.is_recording = False
+        if self.writer is not None:
+            # Returns immediately; the writer thread flushes the remaining packets
+            self.writer.stop()
         return True
     
+    def set_metadata(self, **metadata):
+        """Update the metadata saved alongside binary recordings.
+        
+        Typical keys: tracks (list of dicts with title, num_channels,
+        first_channel, offset, conv_fact) and calibration (dict of lists).
+        """
+        self.metadata.update(metadata)
+    
+    def _recording_metadata(self):
+        metadata = dict(self.metadata)
+        metadata['start_time'] = self.recording_start_time
+        return metadata
+    
+    def _on_writer_error(self, error):
+        """Called from the writer thread when writing to disk fails."""
+        self.status_update.emit(f"Recording write error: {error}")
+    
+    def wait_for_writer(self, timeout=None):
+        """Wait for a streaming recording to be fully flushed to disk (e.g. before exit).
+        
+        Returns:
+            bool: True if nothing is left to write
+        """
+        if self.writer is None:
+            return True
+        return self.writer.wait(timeout)
+    
     def on_data_for_recording(self, stage_name, data):
         """Capture data from the receiver thread for recording.
         
@@ -44,10 +131,6 @@ class RecordingManager(QtCore.QObject):
             stage_name: Name of the processing stage ('raw', 'filtered', 'rectified', or 'final')
             data: numpy array of shape (channels, samples)
         """
-        # Debug: Log every call to see if signal is firing
-        if len(self.recording_data) == 0 and self.is_recording:
-            print(f"[RECORDING] on_data_for_recording called: stage={stage_name}, is_recording={self.is_recording}, data.shape={data.shape}")
-        
         # Record 'raw' stage data (unprocessed, most reliable)
         # Changed from 'final' because processing pipeline may fail on small packets
         if stage_name != 'raw':
@@ -57,60 +140,91 @@ class RecordingManager(QtCore.QObject):
             return
         
         try:
-            # Check for overflow protection
-            if len(self.recording_data) >= self.max_recording_samples:
+            # Packet anchor: seconds since recording start. Only the first packet's
+            # anchor is used when fs is known; later samples are offset from it by
+            # sample_index / fs (see ChunkedSampleStore)
+            anchor = time.time() - self.recording_start_time
+            
+            if self.writer is not None:
+                self.writer.write(data, anchor)
+                return
+            
+            # Check for overflow protection (once per packet)
+            if self.num_samples >= self.max_recording_samples:
                 # Stop recording and warn user
                 self.overflow_stop_requested.emit()
                 return
             
             # data shape: (channels, samples)
-            # Store each sample with timestamp
-            num_samples = data.shape[1]
-            current_time = time.time()
+            if self.recording_data is None:
+                print(f"[RECORDING] First data received! Shape: {data.shape}, samples: {data.shape[1]}")
+                self.recording_data = ChunkedSampleStore(data.shape[0], self.sampling_frequency)
             
-            # Log first sample received
-            if len(self.recording_data) == 0:
-                print(f"[RECORDING] First data received! Shape: {data.shape}, samples: {num_samples}")
+            self.recording_data.append(data, anchor, max_samples=self.max_recording_samples)
             
-            for sample_idx in range(num_samples):
-                # Calculate relative timestamp (seconds since recording start)
-                timestamp = current_time - self.recording_start_time
-                
-                # Get all channels for this sample
-                sample_data = data[:, sample_idx].copy()
-                
-                # Store as tuple: (timestamp, channel_data_array)
-                self.recording_data.append((timestamp, sample_data))
-                
-                # Re-check overflow for each sample
-                if len(self.recording_data) >= self.max_recording_samples:
-                    self.overflow_stop_requested.emit()
-                    break
+            if self.num_samples >= self.max_recording_samples:
+                self.overflow_stop_requested.emit()
                     
         except Exception as e:
             print(f"Error collecting recording data: {e}")
     
+    def save_recording(self):
+        """Save the recording in the configured file format.
+        
+        Returns:
+            tuple: (success: bool, message: str, filename: str or None)
+        """
+        if self.writer is not None:
+            return self._finish_streamed_recording()
+        if self.file_format == 'csv':
+            return self.save_recording_to_csv()
+        
+        if not self.num_samples:
+            return False, "No data recorded", None
+        
+        try:
+            store = self.recording_data
+            sink_class = self.SINKS[self.file_format]
+            filename = self._new_recording_filename(sink_class.extension)
+            sink = sink_class(filename, store.nchannels, self.sampling_frequency, metadata=self._recording_metadata())
+            for start, block in store.iter_chunks():
+                sink.write(block, store.timestamps(start, start + 1)[0])
+            sink.close()
+            
+            message = f"Recording saved: {filename} ({store.num_samples} samples)"
+            print(message)
+            
+            # Clear recording data to free memory
+            self.recording_data = None
+            self.recording_start_time = None
+            
+            return True, message, filename
+            
+        except Exception as e:
+            error_msg = f"Error saving recording: {e}"
+            print(error_msg)
+            return False, error_msg, None
+    
     def save_recording_to_csv(self):
         """Save recorded data to CSV file.
         
+        With the 'stream' backend the file has already been written while
+        recording, so this only reports it and returns immediately.
+        
         Returns:
             tuple: (success: bool, message: str, filename: str or None)
         """
-        if not self.recording_data:
+        if self.writer is not None:
+            return self._finish_streamed_recording()
+        
+        if not self.num_samples:
             return False, "No data recorded", None
         
         try:
-            # Create recordings directory if it doesn't exist
-            recordings_dir = "recordings"
-            if not os.path.exists(recordings_dir):
-                os.makedirs(recordings_dir)
-            
-            # Generate filename with timestamp
-            timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(recordings_dir, f"recording_{timestamp_str}.csv")
+            filename = self._new_recording_filename('.csv')
             
-            # Determine number of channels from first sample
-            num_channels = len(self.recording_data[0][1])
+            store = self.recording_data
+            num_channels = store.nchannels
             
             # Write CSV file
             with open(filename, 'w', newline='') as csvfile:
@@ -120,17 +234,17 @@ class RecordingManager(QtCore.QObject):
                 header = ['Timestamp'] + [f'Channel_{i+1}' for i in range(num_channels)]
                 writer.writerow(header)
                 
-                # Write data rows
-                for timestamp, channel_data in self.recording_data:
-                    row = [timestamp] + channel_data.tolist()
-                    writer.writerow(row)
+                # Write data rows chunk by chunk
+                for start, block in store.iter_chunks():
+                    timestamps = store.timestamps(start, start + block.shape[1])
+                    writer.writerows([t] + row for t, row in zip(timestamps.tolist(), block.T.tolist()))
             
-            num_samples = len(self.recording_data)
+            num_samples = store.num_samples
             message = f"Recording saved: {filename} ({num_samples} samples)"
             print(message)
             
             # Clear recording data to free memory
-            self.recording_data = []
+            self.recording_data = None
             self.recording_start_time = None
             
             return True, message, filename
@@ -140,9 +254,23 @@ class RecordingManager(QtCore.QObject):
             print(error_msg)
             return False, error_msg, None
     
+    def _finish_streamed_recording(self):
+        """Report the file written by the streaming backend."""
+        writer = self.writer
+        num_samples = writer.num_samples
+        if writer.error is not None:
+            return False, f"Error saving recording: {writer.error}", writer.filename
+        if not num_samples:
+            return False, "No data recorded", None
+        
+        message = f"Recording saved: {writer.filename} ({num_samples} samples)"
+        print(message)
+        self.recording_start_time = None
+        return True, message, writer.filename
+    
     def clear_recording_data(self):
         """Clear all recorded data from memory."""
-        self.recording_data = []
+        self.recording_data = None
         self.recording_start_time = None
     
     def get_recording_info(self):
@@ -151,7 +279,7 @@ class RecordingManager(QtCore.QObject):
         Returns:
             dict: Information about recording (num_samples, duration, is_recording)
         """
-        num_samples = len(self.recording_data)
+        num_samples = self.num_samples
         duration = None
         if self.recording_start_time is not None:
             duration = time.time() - self.recording_start_time
@@ -160,5 +288,7 @@ class RecordingManager(QtCore.QObject):
             'num_samples': num_samples,
             'duration': duration,
             'is_recording': self.is_recording,
-            'max_samples': self.max_recording_samples
+            'max_samples': self.max_recording_samples if self.backend == 'memory' else None,
+            'backend': self.backend,
+            'pending_packets': self.writer.pending_packets if self.writer is not None else 0
         }
@@ -2,6 +2,7 @@
 
 from PyQt5 import QtWidgets
 import numpy as np
+from app.core.config import Config
 from app.core.track import Track
 
 
@@ -26,6 +27,11 @@ class TrackManager:
         self.feature_track = None
         self.feature_containers = []
         self.feature_tracks = []
+        self.track_info = []
+
+        # Source state (HDsEMG generation, selection) the derived HD tracks were last built from
+        self._hd_average_source = None
+        self._hd_channel_source = None
         
         self._initialize_tracks()
     
@@ -65,11 +71,20 @@ class TrackManager:
                     ('Ramp', 1, main + 7, 1, 1),
                 ])
         
+        if not getattr(self.device, 'has_ramp', True):
+            # Source without device counters (e.g. a replayed OT BioLab archive): plain channels
+            track_info = [(f"Channel {idx + 1}" if title in ("Buffer", "Ramp") else title, n, idx, offset, conv)
+                          for title, n, idx, offset, conv in track_info]
+        
+        # Keep the layout so recordings can store each track's channels and conversion factor
+        self.track_info = track_info
+        
         for title, n, idx, offset, conv in track_info:
             track_container = QtWidgets.QWidget()
             layout = QtWidgets.QVBoxLayout(track_container)
 
-            track = Track(title, self.device.frequency, n, offset, conv, self.plot_time)
+            track = Track(title, self.device.frequency, n, offset, conv, self.plot_time,
+                          use_opengl=Config.USE_OPENGL)
             self.tracks.append(track)
 
             track.plot_widget.setMinimumHeight(300)
@@ -82,7 +97,8 @@ class TrackManager:
                 self.hdsemg_track = track
                 # create averaged-track container (shows the mean across selected channels)
                 self.hd_average_channels = list(range(n))
-                self.hd_average_track = Track("HD Average", self.device.frequency, 1, 0, conv, self.plot_time)
+                self.hd_average_track = Track("HD Average", self.device.frequency, 1, 0, conv, self.plot_time,
+                                              use_opengl=Config.USE_OPENGL)
                 self.hd_average_track.plot_widget.setMinimumHeight(300)
                 hd_avg_container = QtWidgets.QWidget()
                 hd_avg_layout = QtWidgets.QVBoxLayout(hd_avg_container)
@@ -93,7 +109,8 @@ class TrackManager:
             if "Features" in title.lower():
                 # add to features tab instead
                 self.feature_scroll_layout.addWidget(track_container)
-                self.feature_track = Track("Feature", self.device.frequency, 1, 0, conv, self.plot_time)
+                self.feature_track = Track("Feature", self.device.frequency, 1, 0, conv, self.plot_time,
+                                           use_opengl=Config.USE_OPENGL)
                 self.feature_track.plot_widget.setMinimumHeight(300)
                 feature_container = QtWidgets.QWidget()
                 feature_layout = QtWidgets.QVBoxLayout(feature_container)
@@ -110,74 +127,89 @@ class TrackManager:
             new_time: New time window in seconds
         """
         for track in self.tracks:
-            new_buf = np.zeros((track.num_channels, int(new_time * track.frequency)))
-
-            copy = min(new_buf.shape[1], track.buffer.shape[1])
-            new_buf[:, -copy:] = track.buffer[:, -copy:]
+            track.set_plot_time(new_time)
 
-            track.plot_time = new_time
-            track.buffer = new_buf
-            track.buffer_index = min(track.buffer_index, new_buf.shape[1])
-            track.time_array = np.linspace(0, new_time, new_buf.shape[1])
-            track.plot_widget.setXRange(0, new_time)
+        if self.hd_average_track is not None:
+            self.hd_average_track.set_plot_time(new_time)
 
         # also resize per-channel HDsEMG tracks if present
         if self.hd_channel_tracks:
             for ch_track in self.hd_channel_tracks:
-                new_buf = np.zeros((ch_track.num_channels, int(new_time * ch_track.frequency)))
-                copy = min(new_buf.shape[1], ch_track.buffer.shape[1])
-                new_buf[:, -copy:] = ch_track.buffer[:, -copy:]
-                ch_track.plot_time = new_time
-                ch_track.buffer = new_buf
-                ch_track.buffer_index = min(ch_track.buffer_index, new_buf.shape[1])
-                ch_track.time_array = np.linspace(0, new_time, new_buf.shape[1])
-                ch_track.plot_widget.setXRange(0, new_time)
+                ch_track.set_plot_time(new_time)
     
     def update_hd_average(self):
-        """Update the HD average track with mean of selected channels."""
+        """Update the HD average track with mean of selected channels.
+
+        Returns:
+            bool: True if the track was redrawn (False if the HDsEMG data and selection are unchanged)
+        """
         if self.hd_average_track is None or not self.hd_average_channels or self.hdsemg_track is None:
-            return
+            return False
+
+        source = (self.hdsemg_track.generation, tuple(self.hd_average_channels))
+        if source == self._hd_average_source:
+            return False
+        self._hd_average_source = source
         
         try:
             buf = self.hdsemg_track.buffer
             # guard indices
             sel = [i for i in self.hd_average_channels if 0 <= i < buf.shape[0]]
             if sel:
-                avg = np.mean(buf[sel, :], axis=0)
-                # copy into average track buffer
-                if self.hd_average_track.buffer.shape[1] == avg.shape[0]:
-                    self.hd_average_track.buffer[0, :] = avg
-                else:
-                    # resize if needed (shouldn't normally happen)
-                    new_buf = np.zeros((1, avg.shape[0]))
-                    new_buf[0, -avg.shape[0]:] = avg
-                    self.hd_average_track.buffer = new_buf
-                self.hd_average_track.buffer_index = self.hdsemg_track.buffer_index
-                self.hd_average_track.time_array = self.hdsemg_track.time_array
+                # buf is time-ordered, so the average scrolls in step with the HDsEMG track
+                self.hd_average_track.set_data(np.mean(buf[sel, :], axis=0, keepdims=True))
             self.hd_average_track.draw()
         except Exception:
             pass
+        return True
     
     def update_hd_channel_tracks(self):
-        """Update per-channel HD tracks from main HDsEMG buffer."""
+        """Update per-channel HD tracks from main HDsEMG buffer.
+
+        Returns:
+            bool: True if the tracks were redrawn (False if the HDsEMG data is unchanged)
+        """
         if not self.hd_channel_tracks or self.hdsemg_track is None:
-            return
+            return False
+
+        if self.hdsemg_track.generation == self._hd_channel_source:
+            return False
+        self._hd_channel_source = self.hdsemg_track.generation
         
         for idx, ch_track in enumerate(self.hd_channel_tracks):
             try:
                 # copy the corresponding row from main HDsEMG buffer into the 1-channel track
-                if idx < self.hdsemg_track.buffer.shape[0]:
-                    ch_track.buffer[0, :] = self.hdsemg_track.buffer[idx, :]
-                    ch_track.buffer_index = self.hdsemg_track.buffer_index
-                    ch_track.time_array = self.hdsemg_track.time_array
+                if idx < self.hdsemg_track.num_channels:
+                    ch_track.set_data(self.hdsemg_track.buffer[idx:idx + 1, :])
             except Exception:
                 pass
             ch_track.draw()
+        return True
     
     def draw_all_tracks(self):
         """Draw all tracks."""
         for track in self.tracks:
             track.draw()
+
+    def draw_dirty_tracks(self):
+        """Draw only the tracks that received data since their last draw.
+
+        Returns:
+            tuple: (tracks drawn, tracks skipped)
+        """
+        drawn = 0
+        for track in self.tracks:
+            if track.is_dirty:
+                track.draw()
+                drawn += 1
+        return drawn, len(self.tracks) - drawn
+    
+    def get_track_layout(self):
+        """Get the track layout as a list of dicts (title, num_channels, first_channel, offset, conv_fact)."""
+        return [
+            {'title': title, 'num_channels': n, 'first_channel': idx, 'offset': offset, 'conv_fact': conv}
+            for title, n, idx, offset, conv in self.track_info
+        ]
     
     def get_track_titles(self):
         """Get list of all track titles."""
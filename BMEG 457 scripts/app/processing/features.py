@@ -6,9 +6,28 @@
 from scipy.signal import spectrogram
 import numpy as np
 
+# Samples at or beyond these values are treated as saturated (hanging/disconnected electrodes)
+SATURATION_LOW = -32760   # Close to -32768 (int16 min)
+SATURATION_HIGH = 32760   # Close to 32767 (int16 max)
+
 def rms(data):
     return np.sqrt(np.mean(data**2, axis=1, keepdims=True))
 
+def masked_rms(data, low=SATURATION_LOW, high=SATURATION_HIGH):
+    """RMS per channel over non-saturated samples only; 0 for channels with none.
+
+    Args:
+        data: array of shape (channels, samples)
+
+    Returns:
+        np.ndarray: shape (channels,)
+    """
+    valid = (data > low) & (data < high)
+    count = np.count_nonzero(valid, axis=1)
+    clean = np.where(valid, data, 0.0)
+    sum_sq = np.einsum('ij,ij->i', clean, clean)
+    return np.sqrt(sum_sq / np.maximum(count, 1))
+
 def integrated_emg(data):
     return np.sum(np.abs(data), axis=1, keepdims=True)
 
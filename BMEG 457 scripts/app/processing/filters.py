@@ -1,6 +1,38 @@
 #low-pass, high-pass, notch, Butterworth, FIR, etc.
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
 import numpy as np
-from scipy.signal import butter, filtfilt
+from scipy.signal import butter, filtfilt, sosfilt, sosfilt_zi
+
+
+# Butterworth designs shared by every filter in this module. Designs are
+# keyed by (kind, order, cutoffs in Hz, fs, output form) so repeated calls
+# from the receiver loop reuse the coefficients instead of calling butter().
+@lru_cache(maxsize=64)
+def _butter_design(kind, order, cutoffs, fs, output):
+    nyq = fs / 2
+    wn = tuple(c / nyq for c in cutoffs) if len(cutoffs) > 1 else cutoffs[0] / nyq
+    return butter(order, wn, btype=kind, output=output)
+
+def design_butter(kind, order, cutoffs, fs, output="ba"):
+    """Return cached Butterworth coefficients.
+
+    `cutoffs` is a frequency or sequence of frequencies in Hz. Returns
+    (b, a) for output="ba" or the SOS array for output="sos". The arrays
+    are shared between callers and must not be modified.
+    """
+    cutoffs = tuple(float(c) for c in np.atleast_1d(cutoffs))
+    return _butter_design(kind, int(order), cutoffs, float(fs), output)
+
+def filter_cache_info():
+    """Return hit/miss counters for the shared coefficient cache."""
+    info = _butter_design.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+
+def clear_filter_cache():
+    """Drop all cached designs and reset the counters."""
+    _butter_design.cache_clear()
 
 def butter_bandpass(data, low, high, fs, order=4):
     # Check if data is too small for the filter
@@ -16,7 +48,7 @@ def butter_bandpass(data, low, high, fs, order=4):
             # Too small to filter, return as-is
             return data
     
-    b, a = butter(order, [low/fs*2, high/fs*2], btype="band")
+    b, a = design_butter("band", order, (low, high), fs)
     return filtfilt(b, a, data)
 
 def notch(data, freq, fs, quality=30):
@@ -25,7 +57,7 @@ def notch(data, freq, fs, quality=30):
         # Too small to filter, return as-is
         return data
     
-    b, a = butter(2, [freq/(fs/2)-freq/(fs/2)/quality, freq/(fs/2)+freq/(fs/2)/quality], btype="bandstop")
+    b, a = design_butter("bandstop", 2, (freq - freq/quality, freq + freq/quality), fs)
     return filtfilt(b, a, data)
 
 def moving_average(data, window_size=5):
@@ -36,6 +68,70 @@ def rectify(data):
     return abs(data)
 
 def envelope(data, fs, cutoff=5.0):
-    b, a = butter(4, cutoff/(fs/2), btype="low")
+    b, a = design_butter("low", 4, cutoff, fs)
     return filtfilt(b, a, abs(data))
 
+
+class StreamingFilter(ABC):
+    """Causal IIR filter that carries per-channel state across packets.
+
+    Second-order sections are designed once per sampling frequency and the
+    `zi` state is kept between calls, so feeding consecutive packets gives
+    the same output as filtering the whole recording in one go. Subclasses
+    implement `design(fs)` and return an SOS array.
+    """
+
+    def __init__(self):
+        self.fs = None
+        self.sos = None
+        self.zi = None
+
+    @abstractmethod
+    def design(self, fs):
+        """Return the SOS array of the filter at sampling frequency `fs`."""
+        pass
+
+    def reset(self):
+        """Forget the filter state; the next packet starts a new stream."""
+        self.zi = None
+
+    def process(self, data, fs):
+        """Filter one (channels, samples) block and return the filtered block."""
+        if fs != self.fs:
+            self.sos = self.design(fs)
+            self.fs = fs
+            self.zi = None
+
+        x = np.asarray(data, dtype=np.float64)
+        if self.zi is None or self.zi.shape[1] != x.shape[0]:
+            # Start in steady state for each channel's first sample to avoid a step transient
+            self.zi = sosfilt_zi(self.sos)[:, None, :] * x[:, :1]
+
+        y, self.zi = sosfilt(self.sos, x, axis=-1, zi=self.zi)
+        return y
+
+
+class StreamingBandpass(StreamingFilter):
+    """Streaming Butterworth bandpass, the causal counterpart of `butter_bandpass`."""
+
+    def __init__(self, low, high, order=4):
+        super().__init__()
+        self.low = low
+        self.high = high
+        self.order = order
+
+    def design(self, fs):
+        return design_butter("band", self.order, (self.low, self.high), fs, output="sos")
+
+
+class StreamingNotch(StreamingFilter):
+    """Streaming band-stop filter, the causal counterpart of `notch`."""
+
+    def __init__(self, freq, quality=30):
+        super().__init__()
+        self.freq = freq
+        self.quality = quality
+
+    def design(self, fs):
+        band = (self.freq - self.freq/self.quality, self.freq + self.freq/self.quality)
+        return design_butter("bandstop", 2, band, fs, output="sos")
@@ -1,12 +1,23 @@
 # A unified processing pipeline that tracks call.
+import time
+
 
 class ProcessingPipeline:
     def __init__(self):
-        self.stages = []  # list of callables
+        self.stages = []       # list of callables
+        self.reset_hooks = []  # callables that clear stage state (e.g. filter zi)
 
     def add_stage(self, func):
         self.stages.append(func)
 
+    def add_reset_hook(self, func):
+        """Register `func()` to be called by reset(), for stages that keep state between blocks."""
+        self.reset_hooks.append(func)
+
+    def reset(self):
+        for hook in self.reset_hooks:
+            hook()
+
     def run(self, data):
         x = data
         for stage in self.stages:
@@ -33,3 +44,116 @@ def get_pipeline(name: str) -> ProcessingPipeline:
 def clear_pipelines():
     """Clear all registered pipelines (useful for tests)."""
     _PIPELINES.clear()
+
+
+class PipelineGraph:
+    """Named processing stages arranged as a DAG over the registered pipelines.
+
+    Each stage runs the named pipeline (see `get_pipeline`) on the output of
+    its source stage. A run evaluates only the stages that are subscribed to
+    or explicitly required, plus their ancestors, and every stage is computed
+    at most once per block so shared intermediates (e.g. 'filtered' feeding
+    'rectified') are reused. If a stage's pipeline raises, its fallback stage
+    output is used instead (or the source output when no fallback is set).
+    With `metrics` (an app.core.metrics.LatencyMetrics), the run time of
+    every stage is recorded as 'stage:<name>'.
+
+    A stage that did not run on the previous block (nobody needed it) resets
+    its pipeline before running again, so stateful stages such as streaming
+    filters start from the current signal instead of state left over from
+    the last time they ran.
+    """
+
+    def __init__(self, root='raw', metrics=None):
+        self.root = root
+        self.metrics = metrics
+        self._stages = {}       # name -> (source, pipeline name, fallback)
+        self._subscribers = {}  # name -> subscriber count
+        self.failures = {}      # name -> number of failed runs
+        self.last_errors = {}   # name -> most recent exception
+        self._runs = 0          # number of run() calls
+        self._last_run = {}     # name -> run() call in which the stage last ran
+
+    def add_stage(self, name, source, pipeline=None, fallback=None):
+        """Add stage `name` computed from `source` by pipeline `pipeline` (defaults to `name`)."""
+        if source != self.root and source not in self._stages:
+            raise ValueError(f"Unknown source stage '{source}' for '{name}'")
+        if fallback is not None and fallback != self.root and fallback not in self._stages:
+            raise ValueError(f"Unknown fallback stage '{fallback}' for '{name}'")
+        self._stages[name] = (source, pipeline or name, fallback)
+
+    def stage_names(self):
+        return [self.root] + list(self._stages)
+
+    def subscribe(self, name):
+        """Register interest in a stage's output."""
+        if name not in self.stage_names():
+            raise ValueError(f"Unknown stage '{name}'")
+        self._subscribers[name] = self._subscribers.get(name, 0) + 1
+
+    def unsubscribe(self, name):
+        count = self._subscribers.get(name, 0) - 1
+        if count > 0:
+            self._subscribers[name] = count
+        else:
+            self._subscribers.pop(name, None)
+
+    def has_subscribers(self, name):
+        return self._subscribers.get(name, 0) > 0
+
+    def subscribed_stages(self):
+        """Names of stages with at least one live subscriber, in graph order."""
+        subscribed = dict(self._subscribers)  # snapshot, may be changed from the GUI thread
+        return [name for name in self.stage_names() if subscribed.get(name, 0) > 0]
+
+    def run(self, data, required=()):
+        """Evaluate subscribed and `required` stages for one block.
+
+        Returns:
+            dict: stage name -> output for every stage that was computed
+        """
+        self._runs += 1
+        results = {self.root: data}
+        for name in required:
+            self._evaluate(name, results)
+        for name in self.subscribed_stages():
+            self._evaluate(name, results)
+        return results
+
+    def _evaluate(self, name, results):
+        if name in results:
+            return results[name]
+        source, pipeline_name, fallback = self._stages[name]
+        x = self._evaluate(source, results)
+        pipeline = get_pipeline(pipeline_name)
+        if self._last_run.get(name) != self._runs - 1:
+            pipeline.reset()  # resumed after a gap (or first run): drop stale stage state
+        self._last_run[name] = self._runs
+        start = time.perf_counter_ns()
+        try:
+            out = pipeline.run(x)
+            if self.metrics is not None:
+                self.metrics.record(f'stage:{name}', time.perf_counter_ns() - start)
+        except Exception as e:
+            self.failures[name] = self.failures.get(name, 0) + 1
+            self.last_errors[name] = e
+            out = self._evaluate(fallback, results) if fallback is not None else x
+        results[name] = out
+        return out
+
+
+def build_receiver_graph(metrics=None):
+    """Stage graph used by the data receiver.
+
+    raw -> filtered -> rectified, filtered -> spatial, and raw -> final.
+    Fallbacks mirror the receiver's historical behaviour: a failed stage
+    passes its input through, and a failed 'final' falls back to 'rectified'.
+    'spatial' (spatially filtered channels, see app.processing.spatial) is
+    only computed while something subscribes to it.
+    """
+    graph = PipelineGraph('raw', metrics=metrics)
+    graph.add_stage('filtered', source='raw', fallback='raw')
+    graph.add_stage('rectified', source='filtered', fallback='filtered')
+    graph.add_stage('spatial', source='filtered')
+    graph.add_stage('final', source='raw', fallback='rectified')
+    return graph
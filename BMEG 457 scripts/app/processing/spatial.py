@@ -0,0 +1,94 @@
+"""Spatial filters over the electrode grid (single/double differential, Laplacian).
+
+Each filter is a stencil of (row offset, col offset, weight) terms. It is
+turned into an (outputs, channels) matrix once per grid, so filtering a
+whole packet is one matrix product. "Longitudinal" runs along the grid
+columns (row index changes), which is the fiber direction when the array
+is placed with its columns along the muscle; "transverse" runs along the rows.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from app.core.electrode_grid import ElectrodeGrid
+
+# name -> stencil; an output exists at every electrode where all terms land on an electrode
+SPATIAL_FILTERS = {
+    'sd_long': ((0, 0, 1.0), (1, 0, -1.0)),                   # longitudinal single differential
+    'sd_trans': ((0, 0, 1.0), (0, 1, -1.0)),                  # transverse single differential
+    'dd_long': ((-1, 0, -1.0), (0, 0, 2.0), (1, 0, -1.0)),    # longitudinal double differential
+    'dd_trans': ((0, -1, -1.0), (0, 0, 2.0), (0, 1, -1.0)),   # transverse double differential
+    'ndd': ((0, 0, 4.0), (-1, 0, -1.0), (1, 0, -1.0), (0, -1, -1.0), (0, 1, -1.0)),  # normal double differential (Laplacian)
+}
+
+# Display names (e.g. for the heatmap signal selector)
+SPATIAL_FILTER_LABELS = {
+    'sd_long': "Longitudinal SD",
+    'sd_trans': "Transverse SD",
+    'dd_long': "Longitudinal DD",
+    'dd_trans': "Transverse DD",
+    'ndd': "NDD (Laplacian)",
+}
+
+# Below this many channels a dense matmul beats the sparse product
+DENSE_MAX_CHANNELS = 256
+
+
+class SpatialFilter:
+    """Precomputed spatial filter for one electrode grid.
+
+    Attributes:
+        matrix: (num_outputs, grid.num_channels) filter matrix (scipy.sparse csr)
+        output_grid: ElectrodeGrid of the outputs at the position of their
+            stencil center (first electrode for single differentials), so
+            outputs can be shown with the heatmap code; outputs are numbered
+            in the order of their center channel
+        centers: grid channel at the center of each output
+    """
+
+    def __init__(self, grid, kind='ndd'):
+        if kind not in SPATIAL_FILTERS:
+            raise ValueError(f"Unknown spatial filter '{kind}' (available: {', '.join(SPATIAL_FILTERS)})")
+        self.grid = grid
+        self.kind = kind
+        self.matrix, self.centers, self.output_grid = self._build(grid, SPATIAL_FILTERS[kind])
+        self.output_grid.name = f"{grid.name} {kind}"
+        self.num_outputs = len(self.centers)
+        # Small grids: dense weights are faster to apply than the sparse product
+        self._weights = self.matrix.toarray() if grid.num_channels <= DENSE_MAX_CHANNELS else self.matrix
+
+    @staticmethod
+    def _build(grid, stencil):
+        padded = np.pad(grid.index_map, 1, constant_values=-1)
+        on_grid = np.flatnonzero(grid.channel_rows >= 0)
+        rows = grid.channel_rows[on_grid] + 1
+        cols = grid.channel_cols[on_grid] + 1
+        # Channel under every stencil term for every candidate center: (terms, centers)
+        terms = np.array([padded[rows + dr, cols + dc] for dr, dc, _ in stencil])
+        complete = (terms >= 0).all(axis=0)
+        centers = on_grid[complete]  # already in channel order
+        terms = terms[:, complete]
+
+        weights = np.array([w for _, _, w in stencil])
+        out_idx = np.broadcast_to(np.arange(centers.size), terms.shape)
+        matrix = sparse.csr_matrix((np.broadcast_to(weights[:, None], terms.shape).ravel(),
+                                    (out_idx.ravel(), terms.ravel())),
+                                   shape=(centers.size, grid.num_channels))
+
+        index_map = np.full(grid.shape, -1, dtype=np.intp)
+        index_map[grid.channel_rows[centers], grid.channel_cols[centers]] = np.arange(centers.size)
+        return matrix, centers, ElectrodeGrid(index_map)
+
+    def apply(self, data):
+        """Filter per-channel data: a (channels,) vector or (channels, samples) block.
+
+        Only the first grid.num_channels rows are used (auxiliary channels are dropped).
+
+        Returns:
+            np.ndarray: (num_outputs,) or (num_outputs, samples)
+        """
+        return self._weights @ np.asarray(data, dtype=np.float64)[:self.grid.num_channels]
+
+    def process(self, data):
+        """Pipeline stage: spatially filter a (channels, samples) packet."""
+        return self.apply(data)
@@ -3,12 +3,17 @@
 from PyQt5 import QtWidgets, QtCore
 import numpy as np
 
+from app.core.config import Config
+from app.core.electrode_grid import get_layout
+from app.processing.bad_channels import BadChannelInterpolator
+from app.processing.features import masked_rms
+
 
 class CalibrationDialog(QtWidgets.QDialog):
     """Modal dialog that collects RMS data during rest and contraction phases."""
     calibration_complete = QtCore.pyqtSignal(object, object, object)  # emits (baseline_rms, threshold, mvc_rms) as numpy arrays
     
-    def __init__(self, parent, receiver_thread, rest_duration=5, contraction_duration=5):
+    def __init__(self, parent, receiver_thread, rest_duration=5, contraction_duration=5, layout=None):
         super().__init__(parent)
         self.setWindowTitle("EMG Calibration")
         self.setModal(True)
@@ -17,6 +22,8 @@ class CalibrationDialog(QtWidgets.QDialog):
         self.receiver_thread = receiver_thread
         self.rest_duration = rest_duration
         self.contraction_duration = contraction_duration
+        self.grid = get_layout(layout or Config.ELECTRODE_LAYOUT)  # electrode array used for spatial interpolation
+        self.low_channels = np.array([], dtype=int)  # grid channels repaired in the last calibration
         
         # Data collection
         self.rest_rms_values = []
@@ -66,12 +73,28 @@ class CalibrationDialog(QtWidgets.QDialog):
         # Connection to receiver for RMS collection
         self.subscription_connected = False
     
+    def _disconnect_receiver(self):
+        """Stop listening to the receiver and release the 'filtered' stage subscription."""
+        if self.subscription_connected:
+            self.receiver_thread.stage_output.disconnect(self.on_stage_output)
+            self.receiver_thread.unsubscribe_stage('filtered')
+            self.subscription_connected = False
+
+    def reject(self):
+        """Cancel calibration, making sure the receiver subscription is released."""
+        self.countdown_timer.stop()
+        self._disconnect_receiver()
+        super().reject()
+
     def _fix_low_channels_spatial(self, mvc_rms):
-        """Fix unreasonably low channels by averaging neighbors in 8x8 grid.
+        """Fix unreasonably low channels by averaging their neighbors on the electrode grid.
         
-        Assumes first 64 channels are arranged in 8x8 grid (HDsEMG channels).
-        Channel mapping: channel_idx = col * 8 + (7 - row)
-        where row, col are in range [0, 7]
+        Assumes the first `self.grid.num_channels` channels are the HDsEMG array
+        described by `self.grid` (8x8 by default, channel_idx = col * 8 + (7 - row)).
+        Low channels are repaired by a BadChannelInterpolator (8-connected
+        neighbors; clusters of low channels are filled from the outside in).
+        The low channels are kept in `self.low_channels` so the same repair
+        can be applied to the live signal.
         
         Args:
             mvc_rms: numpy array of MVC values per channel
@@ -79,12 +102,14 @@ class CalibrationDialog(QtWidgets.QDialog):
         Returns:
             Fixed mvc_rms array with interpolated values for low channels
         """
-        if len(mvc_rms) < 64:
-            # Not enough channels for 8x8 grid, return as-is
+        self.low_channels = np.array([], dtype=int)
+        n = self.grid.num_channels
+        if len(mvc_rms) < n:
+            # Not enough channels for the grid, return as-is
             return mvc_rms
         
-        # Only process first 64 channels (8x8 HDsEMG grid)
-        grid_channels = mvc_rms[:64].copy()
+        # Only process the grid channels (HDsEMG array)
+        grid_channels = mvc_rms[:n].copy()
         
         # Define threshold for "unreasonably low" - use median of all channels
         median_mvc = np.median(grid_channels)
@@ -92,58 +117,31 @@ class CalibrationDialog(QtWidgets.QDialog):
         
         print(f"[CALIBRATION] MVC median: {median_mvc:.6f}, low threshold: {low_threshold:.6f}")
         
-        # Reshape to 8x8 grid for spatial operations
-        # Note: Channel mapping is col * 8 + (7 - row), so we need to reshape carefully
-        grid = np.zeros((8, 8))
-        for col in range(8):
-            for row in range(8):
-                channel_idx = col * 8 + (7 - row)
-                grid[row, col] = grid_channels[channel_idx]
-        
-        # Find and fix low channels
-        low_channels = []
-        for col in range(8):
-            for row in range(8):
-                if grid[row, col] < low_threshold:
-                    channel_idx = col * 8 + (7 - row)
-                    low_channels.append(channel_idx)
-                    
-                    # Get neighbors in 3x3 window (excluding center)
-                    neighbors = []
-                    for dr in [-1, 0, 1]:
-                        for dc in [-1, 0, 1]:
-                            if dr == 0 and dc == 0:
-                                continue  # Skip center
-                            nr, nc = row + dr, col + dc
-                            if 0 <= nr < 8 and 0 <= nc < 8:
-                                neighbor_val = grid[nr, nc]
-                                # Only use neighbors that are above threshold
-                                if neighbor_val >= low_threshold:
-                                    neighbors.append(neighbor_val)
-                    
-                    # Replace with average of valid neighbors
-                    if neighbors:
-                        avg_neighbor = np.mean(neighbors)
-                        grid[row, col] = avg_neighbor
-                        print(f"[CALIBRATION] Fixed channel {channel_idx+1}: {grid_channels[channel_idx]:.6f} -> {avg_neighbor:.6f} (avg of {len(neighbors)} neighbors)")
-                    else:
-                        # No valid neighbors, use median of all channels
-                        grid[row, col] = median_mvc
-                        print(f"[CALIBRATION] Fixed channel {channel_idx+1}: {grid_channels[channel_idx]:.6f} -> {median_mvc:.6f} (no valid neighbors, using median)")
-        
-        if low_channels:
-            print(f"[CALIBRATION] Fixed {len(low_channels)} low channels: {[ch+1 for ch in low_channels]}")
+        # Replace with average of neighbors, or the median of all channels if none can be reached
+        low = grid_channels < low_threshold
+        interpolator = BadChannelInterpolator(self.grid, np.flatnonzero(low))
+        fixed = interpolator.repair(grid_channels, fill_value=median_mvc)
+        _, direct_count = self.grid.neighbor_mean(grid_channels, valid=~low)
+        
+        low_channels = interpolator.bad_channels
+        for channel_idx in low_channels:
+            if interpolator.fill_pass[channel_idx] == 0:
+                source = "no valid neighbors, using median"
+            elif direct_count[channel_idx]:
+                source = f"avg of {direct_count[channel_idx]} neighbors"
+            else:
+                source = "filled from repaired neighbors"
+            print(f"[CALIBRATION] Fixed channel {channel_idx+1}: {grid_channels[channel_idx]:.6f} -> {fixed[channel_idx]:.6f} ({source})")
+        grid_channels = fixed
+        self.low_channels = low_channels
+        
+        if low_channels.size:
+            print(f"[CALIBRATION] Fixed {len(low_channels)} low channels: {[int(ch)+1 for ch in low_channels]}")
         else:
             print("[CALIBRATION] No low channels detected")
         
-        # Convert grid back to channel array
-        for col in range(8):
-            for row in range(8):
-                channel_idx = col * 8 + (7 - row)
-                grid_channels[channel_idx] = grid[row, col]
-        
         # Update mvc_rms with fixed values
-        mvc_rms[:64] = grid_channels
+        mvc_rms[:n] = grid_channels
         return mvc_rms
 
     def start_calibration(self):
@@ -155,6 +153,7 @@ class CalibrationDialog(QtWidgets.QDialog):
         # Connect to rectified signal to collect RMS during window
         if not self.subscription_connected and self.receiver_thread is not None:
             self.receiver_thread.stage_output.connect(self.on_stage_output)
+            self.receiver_thread.subscribe_stage('filtered')
             self.subscription_connected = True
         
         # Start rest phase
@@ -189,30 +188,10 @@ class CalibrationDialog(QtWidgets.QDialog):
     def on_stage_output(self, stage_name, data):
         """Collect RMS from filtered signal."""
         if stage_name == 'filtered' and self.countdown_timer.isActive():
-            # Filter out saturated values before computing RMS
-            # Saturation indicates hanging/disconnected electrodes
-            saturation_threshold_low = -32760  # Close to -32768 (int16 min)
-            saturation_threshold_high = 32760   # Close to 32767 (int16 max)
-            
-            # Create mask for non-saturated values
-            non_saturated_mask = (data > saturation_threshold_low) & (data < saturation_threshold_high)
-            
-            # Compute RMS per channel (shape: channels x samples)
-            # data shape is (channels, samples)
-            rms_per_channel = np.zeros(data.shape[0])
-            
-            for ch_idx in range(data.shape[0]):
-                channel_data = data[ch_idx]
-                channel_mask = non_saturated_mask[ch_idx]
-                
-                # Only compute RMS from non-saturated samples
-                valid_samples = channel_data[channel_mask]
-                
-                if len(valid_samples) > 0:
-                    rms_per_channel[ch_idx] = np.sqrt(np.mean(valid_samples**2))
-                else:
-                    # All samples saturated - set to 0 (will be handled later)
-                    rms_per_channel[ch_idx] = 0.0
+            # RMS per channel (data shape: channels x samples) over non-saturated samples;
+            # saturation indicates hanging/disconnected electrodes. All-saturated channels get 0
+            # (handled later by spatial interpolation).
+            rms_per_channel = masked_rms(data)
             
             if self.current_phase == 'rest':
                 self.rest_rms_values.append(rms_per_channel)
@@ -299,7 +278,7 @@ class CalibrationDialog(QtWidgets.QDialog):
                 mvc_rms[ch_idx] = 0.0
                 print(f"[CALIBRATION] Channel {ch_idx+1}: ALL VALUES SATURATED - marking for spatial interpolation")
         
-        # Fix unreasonably low MVC values by spatial interpolation (8x8 grid)
+        # Fix unreasonably low MVC values by spatial interpolation on the electrode grid
         mvc_rms = self._fix_low_channels_spatial(mvc_rms)
         
         # Threshold = baseline_mean + 3*std (based on rest baseline)
@@ -312,9 +291,7 @@ class CalibrationDialog(QtWidgets.QDialog):
         self.status_label.setText(f"Calibration complete. Baseline: {mean_baseline:.4f}, Threshold: {mean_threshold:.4f}, MVC: {mean_mvc:.4f}")
         
         # Disconnect receiver signal
-        if self.subscription_connected:
-            self.receiver_thread.stage_output.disconnect(self.on_stage_output)
-            self.subscription_connected = False
+        self._disconnect_receiver()
         
         # Emit calibration values and accept
         self.calibration_complete.emit(baseline_rms, threshold, mvc_rms)
@@ -407,3 +384,107 @@ class TrackVisibilityDialog(QtWidgets.QDialog):
     def selected_titles(self):
         """Return list of selected track titles."""
         return [cb.text() for cb in self.checkboxes if cb.isChecked()]
+
+
+class StatsDialog(QtWidgets.QDialog):
+    """Live view of the receive/processing timing metrics.
+    
+    Non-modal; refreshes itself while open. `get_metrics` returns the dict of
+    SoundtrackWindow.get_metrics() ('receiver' may be None before the device
+    is connected); `reset_metrics` is called by the Reset button.
+    """
+    
+    COLUMNS = ("Count", "Mean", "p50", "p95", "p99", "Max")
+    
+    def __init__(self, parent, get_metrics, reset_metrics=None, refresh_ms=500):
+        super().__init__(parent)
+        self.setWindowTitle("Processing Stats")
+        self.setModal(False)
+        self.resize(560, 420)
+        self.get_metrics = get_metrics
+        self.reset_metrics = reset_metrics
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        self.summary_label = QtWidgets.QLabel("Not connected")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.render_label = QtWidgets.QLabel("")
+        layout.addWidget(self.render_label)
+
+        # One row per phase, times in milliseconds
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([c if c == "Count" else f"{c} (ms)" for c in self.COLUMNS])
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        btn_layout = QtWidgets.QHBoxLayout()
+        btn_layout.addStretch()
+        reset = QtWidgets.QPushButton("Reset")
+        reset.setEnabled(reset_metrics is not None)
+        close = QtWidgets.QPushButton("Close")
+        btn_layout.addWidget(reset)
+        btn_layout.addWidget(close)
+        layout.addLayout(btn_layout)
+
+        reset.clicked.connect(self._reset)
+        close.clicked.connect(self.close)
+
+        # Only runs while the dialog is visible (see showEvent/hideEvent)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(refresh_ms)
+        self.timer.timeout.connect(self.refresh)
+
+    def _reset(self):
+        self.reset_metrics()
+        self.refresh()
+
+    def refresh(self):
+        """Update the labels and table from the current metrics."""
+        metrics = self.get_metrics()
+
+        render = metrics.get('render')
+        if render:
+            self.render_label.setText(f"Render: {render['frames']} frames, {render['skipped_frame_ratio']:.1%} skipped, "
+                                      f"{render['skipped_draw_ratio']:.1%} of plot draws skipped")
+
+        receiver = metrics.get('receiver')
+        if receiver is None:
+            self.summary_label.setText("Not connected")
+            self.table.setRowCount(0)
+            return
+
+        summary = (f"Packets: {receiver['packets']} | {receiver['packets_per_s']:.1f} packets/s | "
+                   f"budget {receiver['budget_ms']:.1f} ms/packet, {receiver['budget_used']:.1%} used")
+        queue = receiver['queue']
+        if queue:
+            summary += f" | queue depth {queue['depth']} (max {queue['max_depth']}, dropped {queue['dropped']})"
+        continuity = receiver.get('continuity')
+        if continuity:
+            buffer_level = continuity['buffer_level']
+            summary += (f"\nSamples lost: {continuity['lost_samples']} ({continuity['loss_ratio']:.3%}) in "
+                        f"{continuity['gaps']} gaps, {continuity['resyncs']} resyncs | device buffer "
+                        f"{'n/a' if buffer_level is None else buffer_level} (max {continuity['buffer_max']})")
+        self.summary_label.setText(summary)
+
+        phases = receiver['phases']
+        self.table.setRowCount(len(phases))
+        self.table.setVerticalHeaderLabels(list(phases))
+        for row, stats in enumerate(phases.values()):
+            values = (f"{stats['count']}", f"{stats['mean_ms']:.3f}", f"{stats['p50_ms']:.3f}",
+                      f"{stats['p95_ms']:.3f}", f"{stats['p99_ms']:.3f}", f"{stats['max_ms']:.3f}")
+            for col, text in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(text)
+                item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
@@ -5,18 +5,22 @@ This shows how to refactor existing tabs to follow the standardized structure.
 from PyQt5 import QtWidgets
 import pyqtgraph as pg
 import numpy as np
+from app.core.config import Config
+from app.core.electrode_grid import get_layout
 from app.ui.tabs.base_tab import BaseTab
 
 
 class HeatmapTab(BaseTab):
     """
     Heatmap tab implementation following the BaseTab interface.
-    Displays an 8x8 HD-EMG array heatmap normalized to MVC.
+    Displays an HD-EMG array heatmap normalized to MVC, laid out by an
+    electrode grid from the layout registry (Config.ELECTRODE_LAYOUT by default).
     """
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, layout=None):
         # Initialize any state variables before calling super().__init__()
-        self.heatmap_data = np.zeros((8, 8))
+        self.grid = get_layout(layout or Config.ELECTRODE_LAYOUT)
+        self.heatmap_data = np.zeros(self.grid.shape)
         self.heatmap_labels = []
         super().__init__(parent)
     
@@ -30,7 +34,7 @@ class HeatmapTab(BaseTab):
         self.heatmap_plot.hideAxis('left')
         self.heatmap_plot.setTitle("HD-EMG Array Heatmap (Normalized to MVC)")
         
-        # Create 8x8 ImageItem for heatmap
+        # Create ImageItem for heatmap (one pixel per grid position)
         self.heatmap_img = pg.ImageItem()
         self.heatmap_plot.addItem(self.heatmap_img)
         
@@ -46,10 +50,13 @@ class HeatmapTab(BaseTab):
         colorbar.setImageItem(self.heatmap_img)
         
         # Add text labels for channel numbers
-        for row in range(8):
-            for col in range(8):
+        channel_numbers = self.grid.channel_numbers()
+        for row in range(self.grid.rows):
+            for col in range(self.grid.cols):
                 # Channel number: bottom-left is 1, going up by column
-                channel_num = col * 8 + (7 - row) + 1
+                channel_num = channel_numbers[row, col]
+                if not channel_num:
+                    continue  # no electrode at this position
                 text = pg.TextItem(str(channel_num), color='w', anchor=(0.5, 0.5))
                 text.setPos(col + 0.5, row + 0.5)
                 self.heatmap_plot.addItem(text)
@@ -74,15 +81,11 @@ class HeatmapTab(BaseTab):
         Update the heatmap with new data.
         
         Args:
-            normalized_rms: Array of 64 values normalized to [0, 1]
+            normalized_rms: Array of per-channel values normalized to [0, 1]
         """
-        if len(normalized_rms) >= 64:
-            # Reshape to 8x8 grid
-            for col in range(8):
-                for row in range(8):
-                    channel_idx = col * 8 + (7 - row)
-                    if channel_idx < len(normalized_rms):
-                        self.heatmap_data[row, col] = normalized_rms[channel_idx]
+        if len(normalized_rms) >= self.grid.num_channels:
+            # Arrange on the grid with the precomputed index map
+            self.grid.to_grid(normalized_rms, out=self.heatmap_data)
             
             # Update the image
             self.heatmap_img.setImage(self.heatmap_data.T, levels=(0, 1))
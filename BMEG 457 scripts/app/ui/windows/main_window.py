@@ -5,10 +5,13 @@ import numpy as np
 import pyqtgraph as pg
 
 from app.core.config import Config
+from app.core.electrode_grid import get_layout
 from app.data.data_receiver import DataReceiverThread
 from app.processing import filters, features, transforms
+from app.processing.bad_channels import BadChannelInterpolator
 from app.processing.pipeline import get_pipeline
-from app.ui.dialogs.dialogs import CalibrationDialog, ChannelSelectorDialog, TrackVisibilityDialog
+from app.processing.spatial import SPATIAL_FILTER_LABELS, SpatialFilter
+from app.ui.dialogs.dialogs import CalibrationDialog, ChannelSelectorDialog, StatsDialog, TrackVisibilityDialog
 from app.managers.recording_manager import RecordingManager
 from app.managers.streaming_controller import StreamingController
 from app.managers.track_manager import TrackManager
@@ -29,6 +32,19 @@ class SoundtrackWindow(QtWidgets.QWidget):
         self.threshold = None
         self.mvc_rms = None
 
+        # Render loop statistics: timer ticks, and ticks where nothing needed redrawing
+        self.render_frames = 0
+        self.render_frames_skipped = 0
+        self.render_draws = 0
+        self.render_draws_skipped = 0
+        self._heatmap_generation = None
+
+        # Heatmap signal: None = monopolar RMS normalized to MVC, or a spatial filter kind
+        self.heatmap_mode = None
+        self.spatial_rms = None  # RMS of each spatial filter output over the latest packet
+        self._spatial_generation = 0
+        self._spatial_subscribed = False
+
         self.setWindowTitle("Sessantaquattro+ Viewer")
         self.setGeometry(100, 100, *Config.WINDOW_SIZE)
 
@@ -97,6 +113,12 @@ class SoundtrackWindow(QtWidgets.QWidget):
         self.pause_button.toggled.connect(self.toggle_pause)
         top_bar_layout.addWidget(self.pause_button)
 
+        # Stats button (live timing of the receive/processing loop)
+        self.stats_button = QtWidgets.QPushButton("Stats")
+        self.stats_button.clicked.connect(self.open_stats_panel)
+        top_bar_layout.addWidget(self.stats_button)
+        self.stats_dialog = None
+
         # Status label
         self.status_label = QtWidgets.QLabel("Ready")
         top_bar_layout.addWidget(self.status_label)
@@ -133,6 +155,7 @@ class SoundtrackWindow(QtWidgets.QWidget):
         ctrl_layout.addStretch()
         all_tracks_layout.addWidget(control_panel, stretch=0)
         
+        self.all_tracks_tab = all_tracks_content
         self.tabs.addTab(all_tracks_content, "All Tracks")
 
         # Tab 2: HDsEMG
@@ -167,6 +190,7 @@ class SoundtrackWindow(QtWidgets.QWidget):
         hdsemg_ctrl_layout.addStretch()
         hdsemg_layout.addWidget(hdsemg_control_panel, stretch=0)
         
+        self.hdsemg_tab = hdsemg_content
         self.tabs.addTab(hdsemg_content, "HDsEMG")
 
     def _create_features_tab(self):
@@ -194,6 +218,8 @@ class SoundtrackWindow(QtWidgets.QWidget):
         
         self.tabs.addTab(feature_content, "Features")
 
+    HEATMAP_TITLE = "HD-EMG Array Heatmap (Normalized to MVC)"
+
     def _create_heatmap_tab(self):
         """Create the Heatmap tab."""
         heatmap_content = QtWidgets.QWidget()
@@ -205,14 +231,15 @@ class SoundtrackWindow(QtWidgets.QWidget):
         self.heatmap_plot.setAspectLocked(True)
         self.heatmap_plot.hideAxis('bottom')
         self.heatmap_plot.hideAxis('left')
-        self.heatmap_plot.setTitle("HD-EMG Array Heatmap (Normalized to MVC)")
+        self.heatmap_plot.setTitle(self.HEATMAP_TITLE)
         
-        # Create 8x8 ImageItem for heatmap
+        # Create ImageItem for heatmap (one pixel per grid position)
         self.heatmap_img = pg.ImageItem()
         self.heatmap_plot.addItem(self.heatmap_img)
         
         # Initialize with zeros
-        self.heatmap_data = np.zeros((8, 8))
+        self.heatmap_grid = get_layout(Config.ELECTRODE_LAYOUT)
+        self.heatmap_data = np.zeros(self.heatmap_grid.shape)
         self.heatmap_img.setImage(self.heatmap_data.T, levels=(0, 1))
         
         # Set colormap
@@ -225,9 +252,12 @@ class SoundtrackWindow(QtWidgets.QWidget):
         
         # Add text labels for channel numbers
         self.heatmap_labels = []
-        for row in range(8):
-            for col in range(8):
-                channel_num = col * 8 + (7 - row) + 1
+        channel_numbers = self.heatmap_grid.channel_numbers()
+        for row in range(self.heatmap_grid.rows):
+            for col in range(self.heatmap_grid.cols):
+                channel_num = channel_numbers[row, col]
+                if not channel_num:
+                    continue  # no electrode at this position
                 text = pg.TextItem(str(channel_num), color='w', anchor=(0.5, 0.5))
                 text.setPos(col + 0.5, row + 0.5)
                 self.heatmap_plot.addItem(text)
@@ -238,9 +268,17 @@ class SoundtrackWindow(QtWidgets.QWidget):
         # Right-side control panel
         heatmap_control_panel = QtWidgets.QWidget()
         heatmap_ctrl_layout = QtWidgets.QVBoxLayout(heatmap_control_panel)
+        heatmap_ctrl_layout.addWidget(QtWidgets.QLabel("Signal:"))
+        self.heatmap_mode_selector = QtWidgets.QComboBox()
+        self.heatmap_mode_selector.addItem("Monopolar", None)
+        for kind, label in SPATIAL_FILTER_LABELS.items():
+            self.heatmap_mode_selector.addItem(label, kind)
+        self.heatmap_mode_selector.currentIndexChanged.connect(self.change_heatmap_mode)
+        heatmap_ctrl_layout.addWidget(self.heatmap_mode_selector)
         heatmap_ctrl_layout.addStretch()
         heatmap_layout.addWidget(heatmap_control_panel, stretch=0)
         
+        self.heatmap_tab = heatmap_content
         self.tabs.addTab(heatmap_content, "Heatmap")
 
     def _initialize_managers(self):
@@ -267,7 +305,8 @@ class SoundtrackWindow(QtWidgets.QWidget):
         self.hd_average_channels = self.track_manager.hd_average_channels
 
         # Recording Manager
-        self.recording_manager = RecordingManager(max_samples=1000000)
+        self.recording_manager = RecordingManager(max_samples=1000000, backend=Config.RECORDING_BACKEND,
+                                                  file_format=Config.RECORDING_FORMAT)
         self.recording_manager.overflow_stop_requested.connect(self.handle_recording_overflow)
         self.recording_manager.status_update.connect(self.update_status)
 
@@ -283,18 +322,35 @@ class SoundtrackWindow(QtWidgets.QWidget):
         self.select_channels_button.clicked.connect(self.open_channel_selector)
         self.select_tracks_button.clicked.connect(self.open_track_selector)
         self.hd_average_select_button.clicked.connect(self.open_hd_average_selector)
+        self.tabs.currentChanged.connect(self._update_spatial_subscription)
 
     def _configure_pipelines(self):
         """Configure processing pipelines."""
         # FFT pipeline
         get_pipeline('fft').add_stage(transforms.fft_transform)
         
-        # Filtered pipeline - use lambda to provide required parameters
-        get_pipeline('filtered').add_stage(lambda data: filters.butter_bandpass(data, low=20, high=450, fs=self.device.frequency))
-        get_pipeline('filtered').add_stage(lambda data: filters.notch(data, freq=60, fs=self.device.frequency))
+        # Bad channel interpolation - repairs the electrodes found dead during calibration
+        # in the live signal ('raw', and so recordings of it, are left untouched)
+        self.bad_channel_interpolator = BadChannelInterpolator(get_layout(Config.ELECTRODE_LAYOUT))
+        get_pipeline('final').add_stage(self.bad_channel_interpolator.process)
+        get_pipeline('filtered').add_stage(self.bad_channel_interpolator.process)
+        
+        # Filtered pipeline - streaming filters keep their state across packets,
+        # lambdas provide the sampling frequency (only known once the device is configured)
+        self.bandpass_filter = filters.StreamingBandpass(low=20, high=450)
+        self.notch_filter = filters.StreamingNotch(freq=60)
+        get_pipeline('filtered').add_stage(lambda data: self.bandpass_filter.process(data, fs=self.device.frequency))
+        get_pipeline('filtered').add_stage(lambda data: self.notch_filter.process(data, fs=self.device.frequency))
+        get_pipeline('filtered').add_reset_hook(self.bandpass_filter.reset)
+        get_pipeline('filtered').add_reset_hook(self.notch_filter.reset)
         
         # Rectified pipeline
         get_pipeline('rectified').add_stage(filters.rectify)
+        
+        # Spatial pipeline - single/double differential or Laplacian of the filtered grid channels,
+        # shown on the heatmap; the lambda picks up the filter chosen there
+        self.spatial_filter = SpatialFilter(get_layout(Config.ELECTRODE_LAYOUT), Config.SPATIAL_FILTER)
+        get_pipeline('spatial').add_stage(lambda data: self.spatial_filter.process(data))
 
     def change_plot_time(self, text):
         """Change plot time window."""
@@ -322,59 +378,159 @@ class SoundtrackWindow(QtWidgets.QWidget):
         """Display error message dialog."""
         QtWidgets.QMessageBox.critical(self, "Error", message)
     
+    def change_heatmap_mode(self, index):
+        """Switch the heatmap between monopolar RMS and a spatially filtered signal."""
+        kind = self.heatmap_mode_selector.itemData(index)
+        if kind is not None and kind != self.spatial_filter.kind:
+            self.spatial_filter = SpatialFilter(self.spatial_filter.grid, kind)
+        self.heatmap_mode = kind
+        self.spatial_rms = None
+        self._heatmap_generation = None
+        self.heatmap_data[:] = 0  # positions without a spatial output stay blank
+        self.heatmap_img.setImage(self.heatmap_data.T, levels=(0, 1))
+        if kind is None:
+            self.heatmap_plot.setTitle(self.HEATMAP_TITLE)
+        else:
+            self.heatmap_plot.setTitle(f"{SPATIAL_FILTER_LABELS[kind]} RMS (Normalized to Max)")
+        self._update_spatial_subscription()
+
+    def _update_spatial_subscription(self, *args):
+        """Subscribe to the 'spatial' stage only while the spatial heatmap is on screen."""
+        wanted = (self.receiver_thread is not None and self.heatmap_mode is not None
+                  and self.tabs.currentWidget() is self.heatmap_tab)
+        if wanted == self._spatial_subscribed:
+            return
+        if wanted:
+            self.receiver_thread.subscribe_stage('spatial')
+        else:
+            self.receiver_thread.unsubscribe_stage('spatial')
+        self._spatial_subscribed = wanted
+
+    @QtCore.pyqtSlot(str, np.ndarray)
+    def on_stage_output(self, stage_name, data):
+        """Keep the RMS of every spatial filter output over the latest packet."""
+        # Packets filtered before a filter change have a different number of outputs
+        if stage_name != 'spatial' or data.shape[0] != self.spatial_filter.num_outputs:
+            return
+        self.spatial_rms = np.sqrt(np.mean(np.square(data), axis=1))
+        self._spatial_generation += 1
+
     def update_heatmap(self):
-        """Update the 8x8 heatmap with current RMS values normalized to MVC."""
+        """Update the electrode-grid heatmap with current RMS values normalized to MVC.
+
+        With a spatial filter selected, the RMS of the spatially filtered
+        channels is shown instead, normalized to the strongest output.
+
+        Returns:
+            bool: True if the heatmap was recomputed (False if not calibrated or no new HDsEMG data)
+        """
+        if self.heatmap_mode is not None:
+            return self._update_spatial_heatmap()
         if not self.is_calibrated or self.mvc_rms is None or self.hdsemg_track is None:
-            return
+            return False
+        if self.hdsemg_track.generation == self._heatmap_generation:
+            return False
+        self._heatmap_generation = self.hdsemg_track.generation
         
         try:
-            buf = self.hdsemg_track.buffer
-            window_size = min(100, buf.shape[1])
-            recent_data = buf[:, -window_size:]
+            # Newest samples of the HDsEMG track (a view, no copy)
+            recent_data = self.hdsemg_track.ring.latest(100)
             
-            # Filter out saturated values before computing RMS
-            saturation_threshold_low = -32760  # Close to -32768 (int16 min)
-            saturation_threshold_high = 32760   # Close to 32767 (int16 max)
+            # RMS per channel over non-saturated samples
+            current_rms = features.masked_rms(recent_data)
             
-            # Compute RMS per channel with saturation filtering
-            current_rms = np.zeros(recent_data.shape[0])
-            for ch_idx in range(recent_data.shape[0]):
-                channel_data = recent_data[ch_idx]
-                # Filter out saturated values
-                non_saturated = channel_data[
-                    (channel_data > saturation_threshold_low) & 
-                    (channel_data < saturation_threshold_high)
-                ]
-                
-                if len(non_saturated) > 0:
-                    current_rms[ch_idx] = np.sqrt(np.mean(non_saturated**2))
-                else:
-                    # All samples saturated - use 0
-                    current_rms[ch_idx] = 0.0
-            
-            if len(current_rms) >= 64 and len(self.mvc_rms) >= 64:
-                normalized_rms = current_rms[:64] / (self.mvc_rms[:64] + 1e-10)
-                normalized_rms = np.clip(normalized_rms, 0, 1)
-                
-                for col in range(8):
-                    for row in range(8):
-                        channel_idx = col * 8 + (7 - row)
-                        if channel_idx < len(normalized_rms):
-                            self.heatmap_data[row, col] = normalized_rms[channel_idx]
+            n = self.heatmap_grid.num_channels
+            if len(current_rms) >= n and len(self.mvc_rms) >= n:
+                normalized_rms = current_rms[:n] / (self.mvc_rms[:n] + 1e-10)
+                np.clip(normalized_rms, 0, 1, out=normalized_rms)
+                self.heatmap_grid.to_grid(normalized_rms, out=self.heatmap_data)
                 
                 self.heatmap_img.setImage(self.heatmap_data.T, levels=(0, 1))
         except Exception:
             pass
+        return True
+
+    def _update_spatial_heatmap(self):
+        if self.spatial_rms is None or self._spatial_generation == self._heatmap_generation:
+            return False
+        self._heatmap_generation = self._spatial_generation
+        rms = self.spatial_rms
+        peak = rms.max()
+        normalized = rms / peak if peak > 0 else rms
+        self.spatial_filter.output_grid.to_grid(normalized, out=self.heatmap_data)
+        self.heatmap_img.setImage(self.heatmap_data.T, levels=(0, 1))
+        return True
 
     def update_plot(self):
-        """Main plot update loop - draws whenever timer is running."""
-        # Simplified logic: if timer is running, draw plots
+        """Main plot update loop - redraws what changed on the visible tab."""
         # Timer is controlled by streaming_controller, so this implicitly respects streaming state
-        if not self.is_paused:  # Only respect manual pause button
-            self.track_manager.draw_all_tracks()
-            self.track_manager.update_hd_channel_tracks()
-            self.track_manager.update_hd_average()
-            self.update_heatmap()
+        if self.is_paused:  # Only respect manual pause button
+            return
+
+        drawn = skipped = 0
+        current_tab = self.tabs.currentWidget()
+        if current_tab is self.all_tracks_tab:
+            drawn, skipped = self.track_manager.draw_dirty_tracks()
+        elif current_tab is self.hdsemg_tab:
+            for updated in (self.track_manager.update_hd_channel_tracks(),
+                            self.track_manager.update_hd_average()):
+                drawn += updated
+                skipped += not updated
+        elif current_tab is self.heatmap_tab:
+            if self.update_heatmap():
+                drawn = 1
+            else:
+                skipped = 1
+
+        self.render_frames += 1
+        self.render_draws += drawn
+        self.render_draws_skipped += skipped
+        if drawn == 0:
+            self.render_frames_skipped += 1
+        if self.render_frames % 500 == 0:
+            stats = self.get_render_stats()
+            print(f"[RENDER] {stats['frames']} frames, {stats['skipped_frame_ratio']:.1%} skipped, "
+                  f"{stats['skipped_draw_ratio']:.1%} of plot draws skipped")
+
+    def get_render_stats(self):
+        """Get render loop statistics.
+
+        Returns:
+            dict: frames, skipped_frames, skipped_frame_ratio, draws, skipped_draws, skipped_draw_ratio
+        """
+        considered = self.render_draws + self.render_draws_skipped
+        return {
+            'frames': self.render_frames,
+            'skipped_frames': self.render_frames_skipped,
+            'skipped_frame_ratio': self.render_frames_skipped / self.render_frames if self.render_frames else 0.0,
+            'draws': self.render_draws,
+            'skipped_draws': self.render_draws_skipped,
+            'skipped_draw_ratio': self.render_draws_skipped / considered if considered else 0.0,
+        }
+
+    def get_metrics(self):
+        """Get receive/processing timing metrics and render loop statistics.
+
+        Returns:
+            dict: receiver (DataReceiverThread.get_metrics(), None before the device is connected),
+                render (get_render_stats())
+        """
+        return {
+            'receiver': self.receiver_thread.get_metrics() if self.receiver_thread is not None else None,
+            'render': self.get_render_stats(),
+        }
+
+    def reset_metrics(self):
+        """Clear the receiver timing histograms."""
+        if self.receiver_thread is not None:
+            self.receiver_thread.reset_metrics()
+
+    def open_stats_panel(self):
+        """Show the live stats panel (one instance, non-modal)."""
+        if self.stats_dialog is None:
+            self.stats_dialog = StatsDialog(self, self.get_metrics, self.reset_metrics)
+        self.stats_dialog.show()
+        self.stats_dialog.raise_()
 
     def toggle_streaming(self):
         """Toggle streaming on/off."""
@@ -401,7 +557,17 @@ class SoundtrackWindow(QtWidgets.QWidget):
     def start_recording(self):
         """Start recording data."""
         print("[MAIN] start_recording() called")
+        calibration = None
+        if self.is_calibrated:
+            calibration = {
+                'baseline_rms': np.asarray(self.baseline_rms).tolist(),
+                'threshold': np.asarray(self.threshold).tolist(),
+                'mvc_rms': np.asarray(self.mvc_rms).tolist(),
+            }
+        self.recording_manager.set_metadata(tracks=self.track_manager.get_track_layout(), calibration=calibration)
         self.recording_manager.start_recording()
+        # Recording consumes the 'raw' stage output
+        self.receiver_thread.subscribe_stage('raw')
         self.record_button.setText("Stop Recording")
         self.update_status("Recording...")
         
@@ -415,9 +581,11 @@ class SoundtrackWindow(QtWidgets.QWidget):
     def stop_recording(self):
         """Stop recording and save data."""
         self.recording_manager.stop_recording()
+        if self.receiver_thread is not None:
+            self.receiver_thread.unsubscribe_stage('raw')
         
-        # Save to CSV
-        success, message, filename = self.recording_manager.save_recording_to_csv()
+        # Save in the configured format (already on disk for the streaming backend)
+        success, message, filename = self.recording_manager.save_recording()
         self.update_status(message)
         
         if not success and filename is None:
@@ -440,6 +608,9 @@ class SoundtrackWindow(QtWidgets.QWidget):
             self.streaming_controller.stop_streaming()
         if self.recording_manager.is_recording:
             self.stop_recording()
+        # Let a streaming recording finish flushing to disk
+        if not self.recording_manager.wait_for_writer(timeout=10):
+            print("WARNING: Recording writer did not finish flushing before exit")
         
         # Stop receiver thread
         if self.receiver_thread is not None:
@@ -465,6 +636,16 @@ class SoundtrackWindow(QtWidgets.QWidget):
         
         event.accept()
 
+    @QtCore.pyqtSlot(int, int)
+    def on_sample_loss(self, lost, total):
+        """Report samples missing from the device stream (gap in the Ramp counter)."""
+        self.update_status(f"WARNING: {lost} samples lost ({total} total) - processing or link too slow")
+
+    @QtCore.pyqtSlot(int)
+    def on_device_buffer_warning(self, level):
+        """Report a filling device transmit buffer (samples are about to be lost)."""
+        self.update_status(f"WARNING: device buffer level {level} - data is not read fast enough")
+
     def set_client_socket(self, socket):
         """Set the client socket."""
         self.client_socket = socket
@@ -477,10 +658,16 @@ class SoundtrackWindow(QtWidgets.QWidget):
             self.client_socket,
             self.tracks
         )
+        self.recording_manager.sampling_frequency = self.device.frequency
         self.receiver_thread.status_update.connect(self.update_status)
         self.receiver_thread.error_signal.connect(self.show_error)
+        self.receiver_thread.sample_loss.connect(self.on_sample_loss)
+        self.receiver_thread.device_buffer_warning.connect(self.on_device_buffer_warning)
         self.receiver_thread.stage_output.connect(self.recording_manager.on_data_for_recording)
         print("[INIT] stage_output signal connected to recording_manager.on_data_for_recording")
+        self.receiver_thread.stage_output.connect(self.on_stage_output)
+        self._spatial_subscribed = False  # new receiver, no subscriptions yet
+        self._update_spatial_subscription()
         # DON'T start thread here - let streaming controller manage it
         print("[INIT] Receiver thread created but not started yet")
 
@@ -528,9 +715,17 @@ class SoundtrackWindow(QtWidgets.QWidget):
                                          "Device not connected. Please connect device first.")
             return
         
+        # Calibration reads 'filtered', which includes the bad channel repair: lift the
+        # repair so dead electrodes are measured as they are (restored if cancelled)
+        previous_bad_channels = self.bad_channel_interpolator.bad_channels
+        self.bad_channel_interpolator.set_bad_channels([])
+
         dlg = CalibrationDialog(self, self.receiver_thread, rest_duration=3, contraction_duration=3)
         dlg.calibration_complete.connect(self.on_calibration_complete)
-        dlg.exec_()
+        if dlg.exec_() == QtWidgets.QDialog.Accepted:
+            self.bad_channel_interpolator.set_bad_channels(dlg.low_channels)
+        else:
+            self.bad_channel_interpolator.set_bad_channels(previous_bad_channels)
     
     def on_calibration_complete(self, baseline_rms, threshold, mvc_rms):
         """Handle successful calibration."""
@@ -0,0 +1,62 @@
+"""Benchmark the packet decoder used by DataReceiverThread.
+
+Compares the original struct.unpack based decoder against the zero-copy
+`decode_packet` view for every channel count / sampling frequency the
+Sessantaquattro+ can be configured for via `create_command`.
+
+Run from the "BMEG 457 scripts" directory:
+    python -m benchmarks.bench_decode
+"""
+
+import struct
+import timeit
+
+import numpy as np
+
+from app.core.device import SessantaquattroPlus
+from app.data.data_receiver import decode_packet
+
+
+def decode_packet_struct(data, nchannels):
+    """Original decoder: struct.unpack into a tuple, then np.array + reshape."""
+    unpacked_data = struct.unpack(f'>{len(data) // 2}h', data)
+    return np.array(unpacked_data).reshape((-1, nchannels)).T
+
+
+def device_configurations():
+    """Yield the distinct (NCH, FSAMP, MODE, nchannels, frequency) combinations."""
+    device = SessantaquattroPlus()
+    seen = set()
+    # MODE only changes the channel/frequency tables for 1 (bipolar) and 3
+    for MODE in (0, 1, 3):
+        for NCH in range(4):
+            for FSAMP in range(4):
+                nchannels = device.get_num_channels(NCH, MODE)
+                frequency = device.get_sampling_frequency(FSAMP, MODE)
+                if (nchannels, frequency) in seen:
+                    continue
+                seen.add((nchannels, frequency))
+                yield NCH, FSAMP, MODE, nchannels, frequency
+
+
+def main(number=2000):
+    rng = np.random.default_rng(0)
+    print(f"{'NCH':>3} {'FSAMP':>5} {'MODE':>4} {'chans':>5} {'fs':>6} {'bytes':>6} "
+          f"{'struct us':>10} {'view us':>8} {'speedup':>8}")
+
+    for NCH, FSAMP, MODE, nchannels, frequency in device_configurations():
+        samples = frequency // 16
+        values = rng.integers(-32768, 32767, size=(samples, nchannels), dtype=np.int16)
+        data = values.astype('>i2').tobytes()
+
+        # Both decoders must agree before timing them
+        assert np.array_equal(decode_packet_struct(data, nchannels), decode_packet(data, nchannels))
+
+        old = timeit.timeit(lambda: decode_packet_struct(data, nchannels), number=number) / number
+        new = timeit.timeit(lambda: decode_packet(data, nchannels), number=number) / number
+        print(f"{NCH:>3} {FSAMP:>5} {MODE:>4} {nchannels:>5} {frequency:>6} {len(data):>6} "
+              f"{old * 1e6:>10.1f} {new * 1e6:>8.2f} {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
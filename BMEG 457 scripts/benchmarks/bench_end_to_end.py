@@ -0,0 +1,315 @@
+"""Headless end-to-end throughput benchmark of the live acquisition path.
+
+For every device configuration, a device simulator process
+(app.data.device_simulator) streams synthetic EMG into a hidden
+SoundtrackWindow on the Qt offscreen platform; with --replay, a recorded
+session (app.data.replay) is streamed instead. The window runs its normal
+DataReceiverThread, named pipelines, RecordingManager (streaming to a
+temporary directory) and TrackManager plot timer. Each configuration runs
+in its own process so peak RSS is per configuration.
+
+Reported per configuration: sustained packets/s (and the multiple of the
+device's 16 packets/s), per-stage latency percentiles, CPU% of the app
+process and peak RSS. --json writes the results with the commit and
+platform so runs can be compared with --compare.
+
+Run from the "BMEG 457 scripts" directory:
+    python -m benchmarks.bench_end_to_end
+    python -m benchmarks.bench_end_to_end --seconds 20 --json results.json
+    python -m benchmarks.bench_end_to_end --speed 1 --configs 72@2000 72@16000
+    python -m benchmarks.bench_end_to_end --compare before.json --json after.json
+    python -m benchmarks.bench_end_to_end --replay recordings/recording_20250101_120000.bin
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# label -> (NCH, FSAMP, MODE) as passed to SessantaquattroPlus.create_command
+CONFIGURATIONS = {
+    '72@2000': (3, 2, 0),
+    '72@4000': (3, 3, 0),
+    '40@2000': (2, 2, 0),
+    '72@16000': (3, 3, 3),
+}
+DEFAULT_SUBSCRIBE = ('filtered', 'rectified', 'spatial')
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """Collects wall-clock durations of wrapped callables, by name."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def wrap(self, name, func):
+        samples = self.samples.setdefault(name, [])
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter_ns() - start)
+        return timed
+
+    def summary(self):
+        """Latency statistics in milliseconds per name."""
+        out = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            ms = np.asarray(samples) / 1e6
+            stats = {'count': int(ms.size), 'mean_ms': float(ms.mean()), 'max_ms': float(ms.max())}
+            for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                stats[f'p{p}_ms'] = float(value)
+            out[name] = stats
+        return out
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_configuration(label, seconds, speed, subscribe, timeout, replay=None):
+    """Run one configuration (or replay one recording) in this process and return its result dict."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtCore, QtWidgets
+
+    from app.core.device import SessantaquattroPlus
+    from app.data.replay import ReplayDevice
+    from app.processing.pipeline import get_pipeline
+    from app.ui.windows.main_window import SoundtrackWindow
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    simulator = None
+    if replay:
+        device = ReplayDevice(replay, speed=speed)
+        command = device.create_command(GO=1)
+    else:
+        NCH, FSAMP, MODE = CONFIGURATIONS[label]
+        port = free_port()
+        device = SessantaquattroPlus(host="127.0.0.1", port=port, check_network=False)
+        command = device.create_command(FSAMP=FSAMP, NCH=NCH, MODE=MODE, HRES=0, HPF=1, EXTEN=0, TRIG=0, REC=0, GO=1)
+        simulator = subprocess.Popen(
+            [sys.executable, '-m', 'app.data.device_simulator', '--port', str(port),
+             '--speed', str(speed), '--duration', str(seconds)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    window = SoundtrackWindow(device)  # never shown
+    timer = StageTimer()
+    errors = []
+
+    recordings_dir = tempfile.TemporaryDirectory(prefix="bench_e2e_")
+    try:
+        device.start_server()
+        device.send_command(command)
+        window.set_client_socket(device.client_socket)
+
+        # Time the recording slot and plot timer as connected by the window
+        window.recording_manager.recordings_dir = recordings_dir.name
+        window.recording_manager.on_data_for_recording = timer.wrap(
+            'recording', window.recording_manager.on_data_for_recording)
+        window.timer.timeout.disconnect()
+        window.timer.timeout.connect(timer.wrap('plot_update', window.update_plot))
+        window.initialize_receiver()
+
+        receiver = window.receiver_thread
+        receiver.error_signal.disconnect(window.show_error)  # no modal dialogs when the stream ends
+        receiver.error_signal.connect(errors.append)
+        receiver._process_packet = timer.wrap('packet', receiver._process_packet)
+        for name in receiver.graph.stage_names()[1:]:
+            pipeline = get_pipeline(name)
+            pipeline.run = timer.wrap(f'stage:{name}', pipeline.run)
+        for name in subscribe:
+            receiver.subscribe_stage(name)
+
+        window.start_recording()  # also starts streaming
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+
+        loop = QtCore.QEventLoop()
+        poll = QtCore.QTimer()
+        poll.timeout.connect(lambda: loop.quit() if receiver.isFinished()
+                             or time.perf_counter() - start_wall > timeout else None)
+        poll.start(50)
+        loop.exec_()
+        poll.stop()
+
+        # From start of streaming until the receiver drained the closed stream
+        wall = time.perf_counter() - start_wall
+        cpu = time.process_time() - start_cpu
+        window.stop_recording()
+        window.recording_manager.wait_for_writer(timeout=30)
+        app.processEvents()
+
+        packets = receiver.packet_count
+        packet_times = timer.samples.get('packet', [])
+        queue = receiver.block_queue.get_stats() if receiver.block_queue is not None else {}
+        return {
+            'config': label,
+            'nchannels': device.nchannels,
+            'frequency': device.frequency,
+            'speed': speed,
+            'subscribed': list(subscribe),
+            'packets': packets,
+            'seconds': wall,
+            'packets_per_s': packets / wall if wall > 0 else 0.0,
+            'realtime_factor': packets / wall / 16 if wall > 0 else 0.0,
+            'budget_ms': 1000 / 16,
+            'busy_fraction': (sum(packet_times) / 1e9) / wall if wall > 0 else 0.0,
+            'cpu_percent': 100 * cpu / wall if wall > 0 else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+            'recorded_samples': window.recording_manager.num_samples,
+            'queue': queue,
+            'render': window.get_render_stats(),
+            'stages': timer.summary(),
+            'receiver_metrics': receiver.get_metrics(),  # the receiver's built-in phase histograms
+            'stage_failures': dict(receiver.graph.failures),  # runs that fell back (e.g. too few channels for the layout)
+            'errors': [e for e in errors if e != "Connection closed by device"],
+        }
+    finally:
+        if simulator is not None:
+            simulator.kill()
+            simulator.wait()
+        if window.receiver_thread is not None:
+            window.receiver_thread.stop()
+            window.receiver_thread.wait(2000)
+        device.stop_server()
+        recordings_dir.cleanup()
+
+
+def run_isolated(label, args):
+    """Run one configuration in a fresh interpreter; returns its result dict."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_file = os.path.join(tmp, 'result.json')
+        cmd = [sys.executable, '-m', 'benchmarks.bench_end_to_end', '--run', label, '--result-file', result_file,
+               '--seconds', str(args.seconds), '--speed', str(args.speed), '--timeout', str(args.timeout),
+               '--subscribe', *args.subscribe] + (['--replay', args.replay] if args.replay else [])
+        env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+        output = None if args.verbose else subprocess.DEVNULL
+        proc = subprocess.run(cmd, env=env, stdout=output, stderr=output)
+        if proc.returncode != 0 or not os.path.exists(result_file):
+            return {'config': label, 'error': f"benchmark process exited with code {proc.returncode}"}
+        with open(result_file) as f:
+            return json.load(f)
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def print_results(results, baseline=None):
+    previous = {r['config']: r for r in (baseline or {}).get('results', []) if 'error' not in r}
+    print(f"{'config':>9} {'packets/s':>10} {'x RT':>6} {'CPU%':>6} {'RSS MB':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}" + (f" {'vs base':>8}" if previous else ""))
+    for r in results:
+        if 'error' in r:
+            print(f"{r['config']:>9} ERROR: {r['error']}")
+            continue
+        packet = r['stages'].get('packet', {})
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else "n/a"
+        line = (f"{r['config']:>9} {r['packets_per_s']:>10.1f} {r['realtime_factor']:>6.1f} "
+                f"{r['cpu_percent']:>6.0f} {rss:>7} {packet.get('p50_ms', 0):>7.2f} "
+                f"{packet.get('p95_ms', 0):>7.2f} {packet.get('p99_ms', 0):>7.2f}")
+        if r['config'] in previous:
+            line += f" {r['packets_per_s'] / previous[r['config']]['packets_per_s']:>7.2f}x"
+        print(line)
+
+    for r in results:
+        if 'error' in r:
+            continue
+        print(f"\n{r['config']} ({r['nchannels']} ch @ {r['frequency']} Hz): {r['packets']} packets, "
+              f"{r['recorded_samples']} samples recorded, queue {r['queue']}")
+        print(f"  {'stage':<18} {'count':>7} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+        for name, s in sorted(r['stages'].items()):
+            print(f"  {name:<18} {s['count']:>7} {s['mean_ms']:>8.3f} {s['p50_ms']:>8.3f} "
+                  f"{s['p95_ms']:>8.3f} {s['p99_ms']:>8.3f} {s['max_ms']:>8.3f}")
+        if r['stage_failures']:
+            print(f"  stage failures (fallback used): {r['stage_failures']}")
+        if r['errors']:
+            print(f"  errors: {r['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGURATIONS), choices=list(CONFIGURATIONS))
+    parser.add_argument('--seconds', type=float, default=10.0, help="seconds of device signal per configuration")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="simulator rate relative to real time (0 = as fast as the app accepts)")
+    parser.add_argument('--subscribe', nargs='*', default=list(DEFAULT_SUBSCRIBE),
+                        help="receiver stages to subscribe to besides 'final' and the recorded 'raw'")
+    parser.add_argument('--replay', help="replay this recording instead of running the simulated configurations")
+    parser.add_argument('--timeout', type=float, default=300.0, help="max wall time per configuration")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--compare', help="results JSON of a previous run to compare packets/s against")
+    parser.add_argument('--verbose', action='store_true', help="show the app's log output")
+    parser.add_argument('--run', help=argparse.SUPPRESS)          # internal: run one configuration
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)  # internal: where --run writes its result
+    args = parser.parse_args()
+
+    if args.run:
+        result = run_configuration(args.run, args.seconds, args.speed, args.subscribe, args.timeout, args.replay)
+        with open(args.result_file, 'w') as f:
+            json.dump(result, f)
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    info = environment_info()
+    print(f"commit {info['commit']} | {info['platform']} | {info['cpu_count']} CPUs")
+    speed = 'unthrottled' if not args.speed else f'{args.speed:g}x'
+    if args.replay:
+        print(f"Replaying {args.replay}, speed {speed}\n")
+        configs = ['replay']
+    else:
+        print(f"{args.seconds:g} s of signal per configuration, simulator speed {speed}\n")
+        configs = args.configs
+    results = [run_isolated(label, args) for label in configs]
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': info, 'settings': {'seconds': args.seconds, 'speed': args.speed,
+                                                        'subscribe': args.subscribe, 'replay': args.replay},
+                       'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
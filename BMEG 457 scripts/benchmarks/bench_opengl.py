@@ -0,0 +1,72 @@
+"""Benchmark frames per second for raster vs OpenGL track rendering.
+
+Streams synthetic packets into a 64-channel, 10 s track and reports frames
+per second (feed + draw + repaint) for each rendering backend. The OpenGL
+run uses the same fallback as the app: if no hardware GL context can be
+created (e.g. offscreen/CI, Mesa llvmpipe) it reports why and renders
+through raster instead.
+
+Run from the "BMEG 457 scripts" directory:
+    python -m benchmarks.bench_opengl
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_opengl
+"""
+
+import sys
+import time
+
+import numpy as np
+from PyQt5 import QtWidgets
+
+from app.core.rendering import opengl_status
+from app.core.track import Track
+
+FS = 2000
+NCHANNELS = 64
+PACKET = FS // 16
+PLOT_TIME = 10
+SECONDS = 3.0
+
+
+def measure_fps(app, use_opengl, decimate):
+    track = Track("HDsEMG 64 channels", FS, NCHANNELS, 1000, 1, PLOT_TIME,
+                  decimate=decimate, use_opengl=use_opengl)
+    track.plot_widget.resize(1000, 600)
+    track.plot_widget.show()
+    app.processEvents()
+
+    rng = np.random.default_rng(0)
+    packet = rng.integers(-2000, 2000, size=(NCHANNELS, PACKET)).astype(np.float64)
+    for _ in range(PLOT_TIME * FS // PACKET):
+        track.feed(packet)
+
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        track.feed(packet)
+        track.draw()
+        track.plot_widget.repaint()
+        app.processEvents()
+        frames += 1
+    fps = frames / (time.perf_counter() - start)
+    uses_opengl = track.uses_opengl
+    track.plot_widget.close()
+    return fps, uses_opengl
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    available, reason = opengl_status()
+    print(f"Platform: {app.platformName()} | OpenGL: {'available' if available else 'unavailable'} ({reason})")
+    print(f"{NCHANNELS} channels, {PLOT_TIME} s window at {FS} Hz")
+    print(f"{'backend':>8} {'decimate':>9} {'fps':>7}")
+    for use_opengl in (False, True):
+        for decimate in (False, True):
+            fps, used = measure_fps(app, use_opengl, decimate)
+            backend = 'opengl' if used else ('raster*' if use_opengl else 'raster')
+            print(f"{backend:>8} {str(decimate):>9} {fps:>7.1f}")
+    if not available:
+        print("* OpenGL requested, fell back to raster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark recording file formats: size ratio and write/read throughput.
+
+Writes the same synthetic 72-channel session with each RecordingManager
+sink (CSV, raw int16 binary, chunked compressed) and reports file size,
+compression ratio against CSV, write throughput, and read times for the
+whole session and for a single-channel 1 s window.
+
+Run from the "BMEG 457 scripts" directory:
+    python -m benchmarks.bench_recording_formats [seconds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy.signal import butter, sosfilt
+
+from app.data.binary_recording import BinaryRecording, BinarySink
+from app.data.chunked_recording import ChunkedRecording, ChunkedSink
+from app.data.recording_writer import CsvSink
+
+FS = 2000
+NCHANNELS = 72
+PACKET = FS // 16
+
+
+def synthetic_session(seconds, seed=0):
+    """Band-limited noise with contraction bursts on 64 EMG channels, slow aux channels."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * FS)
+    sos = butter(4, [20 / (FS / 2), 450 / (FS / 2)], btype='band', output='sos')
+    emg = sosfilt(sos, rng.standard_normal((64, n)), axis=-1)
+    t = np.arange(n) / FS
+    envelope = 40 + 400 * (np.sin(2 * np.pi * 0.25 * t) > 0.3)
+    data = np.zeros((NCHANNELS, n), dtype=np.int16)
+    data[:64] = np.clip(emg * envelope, -32768, 32767).astype(np.int16)
+    data[64:70] = (1000 * np.sin(2 * np.pi * 0.5 * t)).astype(np.int16)
+    data[70] = 0
+    data[71] = (np.arange(n) % 65536 - 32768).astype(np.int16)  # ramp counter
+    return data
+
+
+def write_with(sink_class, filename, data):
+    sink = sink_class(filename, data.shape[0], FS)
+    start = time.perf_counter()
+    for i in range(0, data.shape[1], PACKET):
+        sink.write(data[:, i:i + PACKET], i / FS)
+    sink.close()
+    return time.perf_counter() - start
+
+
+def main(seconds=60.0):
+    data = synthetic_session(seconds)
+    raw_mb = data.nbytes / 1e6
+    print(f"Session: {NCHANNELS} channels, {seconds:.0f} s at {FS} Hz ({raw_mb:.1f} MB as int16)")
+    print(f"{'format':>8} {'size MB':>8} {'vs CSV':>7} {'write s':>8} {'MB/s':>7} {'read all s':>10} {'1ch 1s ms':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        formats = [
+            ('csv', CsvSink, None),
+            ('binary', BinarySink, BinaryRecording),
+            ('chunked', ChunkedSink, ChunkedRecording),
+        ]
+        csv_size = None
+        for name, sink_class, reader_class in formats:
+            filename = os.path.join(tmp, 'session' + sink_class.extension)
+            write_s = write_with(sink_class, filename, data)
+            size = os.path.getsize(filename)
+            csv_size = csv_size or size
+
+            if reader_class is None:
+                start = time.perf_counter()
+                loaded = np.loadtxt(filename, delimiter=',', skiprows=1, dtype=np.float64)[:, 1:].T
+                read_all = time.perf_counter() - start
+                window_ms = float('nan')
+            else:
+                recording = reader_class(filename)
+                start = time.perf_counter()
+                loaded = recording.read()
+                read_all = time.perf_counter() - start
+                start = time.perf_counter()
+                recording.read(seconds / 2, seconds / 2 + 1, channels=[10])
+                window_ms = (time.perf_counter() - start) * 1e3
+            assert np.array_equal(loaded, data), f"{name} round trip is not lossless"
+
+            print(f"{name:>8} {size / 1e6:>8.2f} {csv_size / size:>6.1f}x {write_s:>8.2f} "
+                  f"{raw_mb / write_s:>7.1f} {read_all:>10.3f} {window_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 60.0)
@@ -0,0 +1,65 @@
+"""Benchmark Track.draw rendering modes.
+
+Feeds a 64-channel track at 2 kHz and measures the time to draw and paint
+one frame offscreen for each plot time window the GUI offers, with:
+    curves   one PlotDataItem per channel, full buffer
+    single   one MultiChannelCurve for all channels, full buffer
+    decim    one MultiChannelCurve, min/max decimated envelope
+
+Run from the "BMEG 457 scripts" directory:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_track_draw
+"""
+
+import sys
+import time
+
+import numpy as np
+from PyQt5 import QtWidgets
+
+from app.core.track import Track
+
+FS = 2000
+NCHANNELS = 64
+PACKET = FS // 16
+PLOT_TIMES = (0.1, 0.25, 0.5, 1, 5, 10)
+FRAMES = 10
+WIDTH = 1000
+
+
+def frame_time(app, track, packet):
+    """Mean seconds per frame of feed + draw + repaint."""
+    times = []
+    for _ in range(FRAMES):
+        track.feed(packet)
+        start = time.perf_counter()
+        track.draw()
+        track.plot_widget.repaint()
+        app.processEvents()
+        times.append(time.perf_counter() - start)
+    return float(np.mean(times[1:]))  # first frame includes the decimator rebuild
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    rng = np.random.default_rng(0)
+    packet = rng.integers(-2000, 2000, size=(NCHANNELS, PACKET)).astype(np.float64)
+
+    print(f"{NCHANNELS} channels at {FS} Hz, plot {WIDTH} px wide")
+    modes = [('curves', False, False), ('single', False, True), ('decim', True, True)]
+    print(f"{'plot s':>7} {'samples':>8}" + "".join(f" {name + ' ms':>10}" for name, _, _ in modes))
+    for plot_time in PLOT_TIMES:
+        results = []
+        for _, decimate, single_item in modes:
+            track = Track("HDsEMG 64 channels", FS, NCHANNELS, 1000, 1, plot_time,
+                          decimate=decimate, single_item=single_item)
+            track.plot_widget.resize(WIDTH, 600)
+            track.plot_widget.show()
+            app.processEvents()
+            for _ in range(0, track.buffer.shape[1], PACKET):
+                track.feed(packet)
+            results.append(frame_time(app, track, packet))
+            track.plot_widget.close()
+        print(f"{plot_time:>7} {int(plot_time * FS):>8}" + "".join(f" {r * 1e3:>10.1f}" for r in results))
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
+import argparse
+import os
+import threading
+
 from PyQt5 import QtWidgets, QtCore
 import pyqtgraph as pg
 
 from app.core.device import SessantaquattroPlus
+from app.data.device_simulator import DeviceSimulator
+from app.data.replay import ReplayDevice
+from app.processing.pipeline import clear_pipelines
 from app.ui.windows.main_window import SoundtrackWindow
 # control window not used; using built-in controls in SoundtrackWindow
 
@@ -26,11 +33,16 @@ class SelectionWindow(QtWidgets.QWidget):
         self.live_data_button.setMinimumHeight(60)
         self.live_data_button.setStyleSheet("font-size: 16px;")
         
+        self.replay_button = QtWidgets.QPushButton("Replay Recording")
+        self.replay_button.setMinimumHeight(60)
+        self.replay_button.setStyleSheet("font-size: 16px;")
+        
         self.data_analysis_button = QtWidgets.QPushButton("Data Analysis")
         self.data_analysis_button.setMinimumHeight(60)
         self.data_analysis_button.setStyleSheet("font-size: 16px;")
         
         layout.addWidget(self.live_data_button)
+        layout.addWidget(self.replay_button)
         layout.addWidget(self.data_analysis_button)
         layout.addStretch()
 
@@ -60,16 +72,35 @@ class DataAnalysisWindow(QtWidgets.QWidget):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="OTB-Python-App")
+    parser.add_argument('--simulate', action='store_true',
+                        help="stream from the built-in device simulator instead of the Sessantaquattro+")
+    parser.add_argument('--simulate-speed', type=float, default=1.0,
+                        help="simulator rate relative to real time (0 = as fast as possible)")
+    args, _ = parser.parse_known_args()
+
     app = QtWidgets.QApplication([])
     pg.setConfigOptions(antialias=True)
 
     # Create device object, but DO NOT connect yet
-    device = SessantaquattroPlus()
+    if args.simulate:
+        live_device = SessantaquattroPlus(host="127.0.0.1", check_network=False)
+    else:
+        live_device = SessantaquattroPlus()
+    # Device of the current live window: live_device, or a ReplayDevice when replaying a recording
+    device = live_device
 
-    # Create windows
+    def connect_device():
+        """Start the TCP server and wait for the device (or simulator) to connect."""
+        if args.simulate and device is live_device:
+            simulator = DeviceSimulator(port=device.port, speed=args.simulate_speed)
+            threading.Thread(target=simulator.run, name="DeviceSimulator", daemon=True).start()
+        device.start_server()
+
+    # Create windows (the live data window is created for its device when opened)
     selection_window = SelectionWindow()
     data_analysis_window = DataAnalysisWindow()
-    live_data_window = SoundtrackWindow(device)  # Renamed for clarity
+    live_data_window = None
     
     # Show selection window first
     selection_window.show()
@@ -89,7 +120,7 @@ def main():
                                                TRIG=0, REC=0, GO=1)
                 
                 print("\nStarting TCP server...")
-                device.start_server()   # <-- Connect here
+                connect_device()   # <-- Connect here
                 
                 print("\nSending start command...")
                 device.send_command(command)
@@ -121,7 +152,7 @@ def main():
                                                TRIG=0, REC=0, GO=1)
                 
                 print("\nStarting TCP server...")
-                device.start_server()   # <-- Connect here
+                connect_device()   # <-- Connect here
                 
                 print("\nSending start command...")
                 device.send_command(command)
@@ -153,7 +184,7 @@ def main():
                                                TRIG=0, REC=0, GO=1)
                 
                 print("\nStarting TCP server...")
-                device.start_server()   # <-- Connect here
+                connect_device()   # <-- Connect here
                 
                 print("\nSending start command...")
                 device.send_command(command)
@@ -170,15 +201,53 @@ def main():
         except Exception as e:
             QtWidgets.QMessageBox.critical(None, "Connection Error", str(e))
 
-    # Wire the live data window buttons
-    live_data_window.calibrate_button.clicked.connect(handle_calibration)
-    live_data_window.stream_button.clicked.connect(handle_stream_toggle)
-    live_data_window.record_button.clicked.connect(handle_record_toggle)
+    def open_live_window(new_device):
+        """Show the live data window for `new_device`, replacing a window opened for another device."""
+        nonlocal device, live_data_window
+        if live_data_window is not None and device is new_device:
+            live_data_window.show()
+            return
+        if live_data_window is not None:
+            # Stops streaming/recording, the receiver thread and the device server
+            live_data_window.close()
+            live_data_window.deleteLater()
+        # Named pipelines are shared; the new window configures them from scratch
+        clear_pipelines()
+        device = new_device
+        live_data_window = SoundtrackWindow(device)
+        
+        # Wire the live data window buttons
+        live_data_window.calibrate_button.clicked.connect(handle_calibration)
+        live_data_window.stream_button.clicked.connect(handle_stream_toggle)
+        live_data_window.record_button.clicked.connect(handle_record_toggle)
+        live_data_window.back_button.clicked.connect(back_to_selection_from_live)
+        live_data_window.show()
     
     # Navigation handlers
     def show_live_data():
         selection_window.hide()
-        live_data_window.show()
+        open_live_window(live_device)
+    
+    def show_replay():
+        """Pick a recording and a speed, then open the live window streaming from it."""
+        filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+            selection_window, "Replay Recording", "recordings",
+            "Recordings (*.csv *.bin *.otbc *.otb+ *.otb4);;All files (*)")
+        if not filename:
+            return
+        speeds = {"1x (real time)": 1.0, "2x": 2.0, "5x": 5.0, "10x": 10.0, "Unthrottled": 0.0}
+        choice, ok = QtWidgets.QInputDialog.getItem(selection_window, "Replay Speed", "Replay speed:",
+                                                    list(speeds), 0, False)
+        if not ok:
+            return
+        try:
+            replay_device = ReplayDevice(filename, speed=speeds[choice])
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(selection_window, "Replay Error", f"Could not read {filename}:\n{e}")
+            return
+        selection_window.hide()
+        open_live_window(replay_device)
+        live_data_window.setWindowTitle(f"Replay - {os.path.basename(filename)} ({choice})")
     
     def show_data_analysis():
         selection_window.hide()
@@ -200,10 +269,10 @@ def main():
     
     # Wire selection window buttons
     selection_window.live_data_button.clicked.connect(show_live_data)
+    selection_window.replay_button.clicked.connect(show_replay)
     selection_window.data_analysis_button.clicked.connect(show_data_analysis)
     
-    # Wire back buttons
-    live_data_window.back_button.clicked.connect(back_to_selection_from_live)
+    # Wire back buttons (the live window's is wired in open_live_window)
     data_analysis_window.back_button.clicked.connect(back_to_selection_from_analysis)
 
     import sys
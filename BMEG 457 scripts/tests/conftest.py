@@ -0,0 +1,44 @@
+"""Shared fixtures: a hidden SoundtrackWindow on the Qt offscreen platform."""
+
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+class FakeReceiver:
+    """Stands in for DataReceiverThread where only subscriptions matter."""
+
+    def __init__(self):
+        self.subscriptions = {}
+
+    def subscribe_stage(self, stage_name):
+        self.subscriptions[stage_name] = self.subscriptions.get(stage_name, 0) + 1
+
+    def unsubscribe_stage(self, stage_name):
+        self.subscriptions[stage_name] -= 1
+
+    def stop(self):
+        pass
+
+    def wait(self, timeout=None):
+        return True
+
+
+@pytest.fixture
+def window():
+    """SoundtrackWindow with freshly configured pipelines and a FakeReceiver (never shown)."""
+    QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+    from app.core.device import SessantaquattroPlus
+    from app.processing.pipeline import clear_pipelines
+    from app.ui.windows.main_window import SoundtrackWindow
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    clear_pipelines()
+    window = SoundtrackWindow(SessantaquattroPlus(check_network=False))
+    window.receiver_thread = FakeReceiver()
+    yield window
+    window.close()
+    clear_pipelines()
+    app.processEvents()
@@ -0,0 +1,18 @@
+"""Test data shared by several test modules."""
+
+import numpy as np
+
+FS = 2000
+PACKET = FS // 16  # 62.5 ms of samples
+
+
+def bursty_packets(num_packets=12, nchannels=3, seed=0):
+    """Packets with GUI-thread arrival anchors: queued packets arrive a few ms apart.
+
+    Returns:
+        tuple: (list of (nchannels, PACKET) int16 arrays, array of anchor times in s)
+    """
+    rng = np.random.default_rng(seed)
+    anchors = 0.5 + np.cumsum(np.where(np.arange(num_packets) % 4 == 0, 0.25, 0.002))
+    data = [rng.integers(-1000, 1000, (nchannels, PACKET), dtype=np.int16) for _ in range(num_packets)]
+    return data, anchors
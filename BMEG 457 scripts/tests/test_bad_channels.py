@@ -0,0 +1,93 @@
+"""Tests for app.processing.bad_channels.BadChannelInterpolator."""
+
+import numpy as np
+
+from app.core.electrode_grid import get_layout
+from app.processing.bad_channels import BadChannelInterpolator
+
+
+def brute_force_repair(grid, values, bad_channels, fill_value=0.0):
+    """Fill bad channels pass by pass with the mean of their already-filled neighbors."""
+    out = np.array(values, dtype=np.float64)
+    filled = np.ones(grid.num_channels, dtype=bool)
+    filled[list(bad_channels)] = False
+    while True:
+        updates = {}
+        for channel in np.flatnonzero(~filled):
+            good = [n for n in grid.neighbors[channel] if filled[n]]
+            if good:
+                updates[channel] = np.mean([out[n] for n in good], axis=0)
+        if not updates:
+            break
+        for channel, value in updates.items():
+            out[channel] = value
+            filled[channel] = True
+    out[np.flatnonzero(~filled)] = fill_value
+    return out
+
+
+def test_isolated_bad_channels_match_brute_force():
+    grid = get_layout('8x8')
+    values = np.random.default_rng(0).normal(size=(grid.num_channels, 50))
+    bad = [0, 27, 39, 63]  # corner, interior, edge, corner
+    interpolator = BadChannelInterpolator(grid, bad)
+    assert interpolator.passes == 1
+    np.testing.assert_allclose(interpolator.repair(values), brute_force_repair(grid, values, bad))
+
+    # Corner channel 0 is the mean of its 3 neighbors
+    np.testing.assert_allclose(interpolator.repair(values)[0], values[[1, 8, 9]].mean(axis=0))
+
+
+def test_cluster_of_adjacent_bad_channels():
+    grid = get_layout('8x8')
+    values = np.random.default_rng(1).normal(size=grid.num_channels)
+    # 3x3 block around channel 27: the center has no good neighbor in the first pass
+    bad = [27] + list(grid.neighbors[27])
+    interpolator = BadChannelInterpolator(grid, bad)
+    assert interpolator.passes == 2
+    assert interpolator.fill_pass[27] == 2
+    assert np.all(interpolator.fill_pass[grid.neighbors[27]] == 1)
+    assert interpolator.unreachable_channels.size == 0
+
+    repaired = interpolator.repair(values)
+    np.testing.assert_allclose(repaired, brute_force_repair(grid, values, bad))
+    np.testing.assert_array_equal(repaired[np.setdiff1d(np.arange(64), bad)],
+                                  values[np.setdiff1d(np.arange(64), bad)])  # good channels untouched
+
+
+def test_channels_with_no_good_neighbor_get_fill_value():
+    grid = get_layout('2x(4x8)')
+    values = np.random.default_rng(2).normal(size=(grid.num_channels, 20))
+    bad = list(range(32, 64)) + [5]  # the whole second array is dead
+    interpolator = BadChannelInterpolator(grid, bad)
+    np.testing.assert_array_equal(interpolator.unreachable_channels, np.arange(32, 64))
+
+    repaired = interpolator.repair(values, fill_value=-1.0)
+    assert np.all(repaired[32:] == -1.0)
+    np.testing.assert_allclose(repaired, brute_force_repair(grid, values, bad, fill_value=-1.0))
+
+
+def test_13x5_and_extra_rows():
+    grid = get_layout('13x5')
+    values = np.random.default_rng(3).normal(size=(grid.num_channels + 2, 10))  # + Buffer/Ramp rows
+    bad = [11, 24, 23, 12]  # around the unused corner slot
+    interpolator = BadChannelInterpolator(grid, bad)
+    repaired = interpolator.repair(values)
+    np.testing.assert_allclose(repaired[:64], brute_force_repair(grid, values[:64], bad))
+    np.testing.assert_array_equal(repaired[64:], values[64:])
+
+
+def test_four_connected():
+    grid = get_layout('8x8')
+    values = np.random.default_rng(4).normal(size=grid.num_channels)
+    interpolator = BadChannelInterpolator(grid, [27], connectivity=4)
+    np.testing.assert_allclose(interpolator.repair(values)[27], values[[28, 26, 19, 35]].mean())
+
+
+def test_no_bad_channels_passes_through():
+    grid = get_layout('8x8')
+    interpolator = BadChannelInterpolator(grid)
+    block = np.ones((66, 4), dtype=np.int16)
+    assert interpolator.process(block) is block
+    interpolator.set_bad_channels([3, 99])  # out-of-range indices are ignored
+    np.testing.assert_array_equal(interpolator.bad_channels, [3])
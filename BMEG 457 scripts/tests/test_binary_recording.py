@@ -0,0 +1,113 @@
+"""Tests for the binary int16 recording format (app.data.binary_recording)."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.data.binary_recording import BinaryRecording, BinarySink, sidecar_path
+
+FS = 2000
+NCH = 6
+TRACKS = [
+    {'title': 'HDsEMG', 'num_channels': 4, 'first_channel': 0, 'offset': 0, 'conv_fact': 0.5},
+    {'title': 'AUX', 'num_channels': 1, 'first_channel': 4, 'offset': 0, 'conv_fact': 2.0},
+]  # channel 5 has no track: factor 1
+
+
+def write_recording(filename, num_samples=1000, packet=125, byteorder='<', close=True):
+    rng = np.random.default_rng(0)
+    data = rng.integers(-32768, 32768, (NCH, num_samples), dtype=np.int16)
+    sink = BinarySink(filename, NCH, FS, metadata={'start_time': 100.0, 'tracks': TRACKS,
+                                                   'calibration': {'mvc_rms': [1.0] * NCH}},
+                      byteorder=byteorder)
+    for start in range(0, num_samples, packet):
+        sink.write(data[:, start:start + packet], 0.25)
+    if close:
+        sink.close()
+    return data, sink
+
+
+@pytest.mark.parametrize('byteorder', ['<', '>'])
+def test_round_trip(tmp_path, byteorder):
+    filename = str(tmp_path / 'rec.bin')
+    data, _ = write_recording(filename, byteorder=byteorder)
+
+    recording = BinaryRecording(filename)
+    assert recording.num_samples == 1000
+    assert recording.nchannels == NCH
+    assert recording.sampling_frequency == FS
+    assert recording.dtype == np.dtype(byteorder + 'i2')
+    assert recording.duration == 0.5
+    assert recording.start_time == 100.0
+    assert recording.header['first_sample_offset'] == 0.25
+    assert recording.calibration == {'mvc_rms': [1.0] * NCH}
+    np.testing.assert_array_equal(recording.read(), data)
+
+    raw = np.fromfile(filename, dtype=byteorder + 'i2').reshape(-1, NCH)
+    np.testing.assert_array_equal(raw.T, data)  # frames: channels interleaved per sample
+
+    # The sidecar path opens the same recording
+    np.testing.assert_array_equal(BinaryRecording(sidecar_path(filename)).read(), data)
+
+
+def test_windowed_reads(tmp_path):
+    filename = str(tmp_path / 'rec.bin')
+    data, _ = write_recording(filename)
+    recording = BinaryRecording(filename)
+
+    np.testing.assert_array_equal(recording.read(0.1, 0.2), data[:, 200:400])
+    np.testing.assert_array_equal(recording.read(0.1, 0.2, channels=[5, 0]), data[[5, 0], 200:400])
+    np.testing.assert_array_equal(recording.read(channels=slice(1, 3)), data[1:3])
+    np.testing.assert_array_equal(recording.read(stop_time=0.01), data[:, :20])
+    np.testing.assert_array_equal(recording.read(0.4, 9.0), data[:, 800:])  # clipped at the end
+    assert recording.read(0.3, 0.3).shape == (NCH, 0)
+    assert recording.read().dtype == np.int16
+
+    np.testing.assert_allclose(recording.times(0.1, 0.2), np.arange(200, 400) / FS)
+    assert recording.times().shape == (1000,)
+
+
+def test_read_scaled(tmp_path):
+    filename = str(tmp_path / 'rec.bin')
+    data, _ = write_recording(filename)
+    recording = BinaryRecording(filename)
+
+    factors = np.array([0.5, 0.5, 0.5, 0.5, 2.0, 1.0])
+    np.testing.assert_array_equal(recording.conversion_factors(), factors)
+    np.testing.assert_allclose(recording.read_scaled(0.1, 0.2), data[:, 200:400] * factors[:, None])
+    np.testing.assert_allclose(recording.read_scaled(channels=[4, 5]), data[[4, 5]] * factors[[4, 5], None])
+
+
+def test_interrupted_recording_opens_from_file_size(tmp_path):
+    filename = str(tmp_path / 'rec.bin')
+    data, sink = write_recording(filename, num_samples=500, close=False)
+    sink._file.flush()  # what reached the disk before the crash
+    with open(sidecar_path(filename)) as f:
+        assert json.load(f)['num_samples'] == 0  # sidecar from the start of the recording
+
+    recording = BinaryRecording(filename)
+    assert recording.num_samples == 500
+    np.testing.assert_array_equal(recording.read(), data)
+    sink.close()
+
+
+def test_partial_last_frame_is_ignored(tmp_path):
+    filename = str(tmp_path / 'rec.bin')
+    data, _ = write_recording(filename, num_samples=250)
+    with open(filename, 'ab') as f:
+        f.write(b'\x01\x02\x03')  # torn write
+    np.testing.assert_array_equal(BinaryRecording(filename).read(), data)
+
+
+def test_empty_recording(tmp_path):
+    filename = str(tmp_path / 'rec.bin')
+    BinarySink(filename, NCH, FS).close()
+    recording = BinaryRecording(filename)
+    assert recording.num_samples == 0
+    assert recording.read().shape == (NCH, 0)
+
+
+def test_invalid_byteorder(tmp_path):
+    with pytest.raises(ValueError):
+        BinarySink(str(tmp_path / 'rec.bin'), NCH, FS, byteorder='=')
@@ -0,0 +1,123 @@
+"""Tests for app.data.block_queue.BlockQueue."""
+
+import threading
+import time
+
+import pytest
+
+from app.data.block_queue import BlockQueue
+
+
+def block(i, size=4):
+    return bytes([i % 256]) * size
+
+
+def start_producer(queue, data):
+    """put() `data` from another thread; returns (thread, result list)."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(queue.put(data, poll_interval=0.05)), daemon=True)
+    thread.start()
+    return thread, result
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_fifo_order_across_wraparound():
+    queue = BlockQueue(block_size=4, capacity=3)
+    received = []
+    for i in range(10):  # interleaved so head and tail wrap several times
+        assert queue.put(block(i))
+        if i % 2:
+            for _ in range(2):
+                received.append(bytes(queue.get(timeout=0)))
+                queue.release()
+    while len(queue):
+        received.append(bytes(queue.get(timeout=0)))
+        queue.release()
+
+    assert received == [block(i) for i in range(10)]
+    assert queue.pushed == 10
+    assert queue.max_depth == 2
+
+
+def test_drop_policy_counts_dropped_blocks():
+    queue = BlockQueue(block_size=4, capacity=2, policy='drop')
+    assert queue.put(block(0))
+    assert queue.put(block(1))
+    assert not queue.put(block(2))
+    assert not queue.put(block(3))
+    assert queue.get_stats()['dropped'] == 2
+    assert len(queue) == 2
+
+    assert bytes(queue.get(timeout=0)) == block(0)  # oldest blocks are kept
+    queue.release()
+    assert queue.put(block(4))
+    assert bytes(queue.get(timeout=0)) == block(1)
+
+
+def test_blocked_producer_is_released_by_release():
+    queue = BlockQueue(block_size=4, capacity=1, policy='block')
+    assert queue.put(block(0))
+    thread, result = start_producer(queue, block(1))
+
+    assert wait_until(lambda: queue.blocked == 1)
+    time.sleep(0.05)
+    assert thread.is_alive() and not result
+
+    assert bytes(queue.get(timeout=0)) == block(0)
+    queue.release()
+    thread.join(timeout=2)
+    assert result == [True]
+    assert bytes(queue.get(timeout=0)) == block(1)
+
+
+def test_blocked_producer_is_released_by_close():
+    queue = BlockQueue(block_size=4, capacity=1, policy='block')
+    assert queue.put(block(0))
+    thread, result = start_producer(queue, block(1))
+    assert wait_until(lambda: queue.blocked == 1)
+
+    queue.close()
+    thread.join(timeout=2)
+    assert result == [False]
+    assert queue.pushed == 1
+
+
+def test_drain_after_close():
+    queue = BlockQueue(block_size=4, capacity=4)
+    for i in range(3):
+        queue.put(block(i))
+    queue.close()
+    assert not queue.put(block(9))
+
+    drained = []
+    while True:
+        view = queue.get(timeout=0.1)
+        if view is None:
+            break
+        drained.append(bytes(view))
+        queue.release()
+    assert drained == [block(i) for i in range(3)]
+
+
+def test_close_wakes_waiting_consumer():
+    queue = BlockQueue(block_size=4, capacity=2)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(queue.get(timeout=5)), daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    queue.close()
+    thread.join(timeout=2)
+    assert result == [None]
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        BlockQueue(block_size=4, policy='latest')
@@ -0,0 +1,69 @@
+"""Calibration and bad channel repair through SoundtrackWindow's real pipelines (Qt offscreen)."""
+
+import numpy as np
+import pytest
+
+QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+
+from app.data.device_simulator import SyntheticEMG
+from app.processing.pipeline import get_pipeline
+from app.ui.dialogs.dialogs import CalibrationDialog
+from app.ui.windows import main_window
+
+DEAD_CHANNEL = 5
+
+
+class ScriptedCalibration(CalibrationDialog):
+    """CalibrationDialog whose exec_() runs both phases on synthetic packets instead of waiting on the user."""
+
+    packets = []
+    accept_dialog = True
+
+    def exec_(self):
+        if not self.accept_dialog:
+            return QtWidgets.QDialog.Rejected
+        for phase in ('rest', 'contraction'):
+            self.current_phase = phase
+            self.countdown_timer.start(1000)
+            for packet in self.packets:
+                # What the receiver emits for the 'filtered' stage
+                self.on_stage_output('filtered', get_pipeline('filtered').run(packet))
+        self.countdown_timer.stop()
+        self.compute_threshold_and_close()
+        return self.result()
+
+
+@pytest.fixture(autouse=True)
+def scripted_calibration(window, monkeypatch):
+    device = window.device
+    signal = SyntheticEMG(device.nchannels, device.frequency, seed=0, dead_channels=(DEAD_CHANNEL,),
+                          saturated_channels=())
+    ScriptedCalibration.packets = [signal.next_block(device.frequency // 16) for _ in range(24)]
+    ScriptedCalibration.accept_dialog = True
+    monkeypatch.setattr(main_window, 'CalibrationDialog', ScriptedCalibration)
+    monkeypatch.setattr(QtWidgets.QMessageBox, 'information', lambda *args, **kwargs: None)
+
+
+def live_signal(window):
+    """Live ('final') output for the last synthetic packet."""
+    return get_pipeline('final').run(ScriptedCalibration.packets[-1].astype(np.float64))
+
+
+def test_dead_channel_stays_repaired_after_recalibrating(window):
+    for _ in range(2):
+        window.open_calibration_dialog()
+        assert window.is_calibrated
+        assert list(window.bad_channel_interpolator.bad_channels) == [DEAD_CHANNEL]
+
+        out = live_signal(window)
+        neighbors = window.bad_channel_interpolator.grid.neighbor_table[DEAD_CHANNEL]
+        neighbors = neighbors[neighbors >= 0]  # 8-connected, as used by the interpolator
+        np.testing.assert_allclose(out[DEAD_CHANNEL], out[neighbors].mean(axis=0))
+        assert out[DEAD_CHANNEL].std() > 0
+
+
+def test_cancelled_calibration_keeps_the_repair(window):
+    window.open_calibration_dialog()
+    ScriptedCalibration.accept_dialog = False
+    window.open_calibration_dialog()
+    assert list(window.bad_channel_interpolator.bad_channels) == [DEAD_CHANNEL]
@@ -0,0 +1,96 @@
+"""Tests for the chunked, compressed recording format (app.data.chunked_recording)."""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.data.chunked_recording import ChunkedRecording, ChunkedSink, decode_block, encode_block
+
+FS = 2000
+NCH = 5
+CHUNK = 300
+
+
+def write_recording(filename, num_samples=1000, packet=125, seed=0, chunk_samples=CHUNK):
+    """Write random int16 packets through ChunkedSink; returns the samples written."""
+    rng = np.random.default_rng(seed)
+    data = rng.integers(-32768, 32768, (NCH, num_samples), dtype=np.int16)
+    data[1] = np.cumsum(rng.integers(-50, 50, num_samples)).astype(np.int16)  # EMG-like slow channel
+    sink = ChunkedSink(filename, NCH, FS, metadata={'start_time': 123.0, 'calibration': {'threshold': [1, 2]}},
+                       chunk_samples=chunk_samples)
+    for start in range(0, num_samples, packet):
+        sink.write(data[:, start:start + packet], 0.01)
+    sink.close()
+    return data
+
+
+def test_block_codec_round_trip():
+    rng = np.random.default_rng(1)
+    for x in (rng.integers(-32768, 32768, 1000, dtype=np.int16),
+              np.array([32767, -32768, 32767, 0, -1, -32768], dtype=np.int16),  # delta wraparound
+              np.zeros(1, dtype=np.int16)):
+        np.testing.assert_array_equal(decode_block(encode_block(x), len(x)), x)
+
+
+def test_sink_round_trip_with_partial_final_chunk(tmp_path):
+    filename = str(tmp_path / 'rec.otbc')
+    data = write_recording(filename, num_samples=1000)  # 3 full chunks + 100 samples
+
+    recording = ChunkedRecording(filename)
+    assert not recording.recovered
+    assert recording.num_samples == 1000
+    assert [c['length'] for c in recording.chunks] == [CHUNK, CHUNK, CHUNK, 100]
+    assert recording.sampling_frequency == FS
+    assert recording.calibration == {'threshold': [1, 2]}
+    np.testing.assert_array_equal(recording.read(), data)
+
+
+def test_block_level_reads(tmp_path):
+    filename = str(tmp_path / 'rec.otbc')
+    data = write_recording(filename, num_samples=1000)
+    recording = ChunkedRecording(filename)
+
+    for start, stop in [(0, 1), (250, 650), (299, 301), (900, 1000), (500, 500)]:
+        np.testing.assert_array_equal(recording.read_samples(start, stop), data[:, start:stop])
+    np.testing.assert_array_equal(recording.read_samples(280, 920, channels=[4, 1]), data[[4, 1], 280:920])
+    np.testing.assert_array_equal(recording.read_samples(0, 1000, channels=2), data[2:3])
+    np.testing.assert_array_equal(recording.read(0.1, 0.2), data[:, 200:400])
+    np.testing.assert_allclose(recording.times(0.1, 0.2), np.arange(200, 400) / FS)
+
+
+@pytest.mark.parametrize('cut', ['footer', 'footer length', 'mid block'])
+def test_truncated_recording_is_recovered(tmp_path, cut):
+    filename = str(tmp_path / 'rec.otbc')
+    data = write_recording(filename, num_samples=1000)
+    complete = ChunkedRecording(filename)
+    end_of_blocks = max(offset + nbytes for chunk in complete.chunks for offset, nbytes in chunk['blocks'])
+    last_chunk_start = complete.chunks[-1]['blocks'][0][0]
+
+    size = {'footer': end_of_blocks,
+            'footer length': os.path.getsize(filename) - 3,
+            'mid block': last_chunk_start + 5}[cut]
+    with open(filename, 'r+b') as f:
+        f.truncate(size)
+
+    recording = ChunkedRecording(filename)
+    assert recording.recovered
+    expected = 1000 if cut != 'mid block' else 3 * CHUNK  # the cut chunk is dropped
+    assert recording.num_samples == expected
+    assert recording.sampling_frequency == FS
+    assert recording.calibration == {'threshold': [1, 2]}
+    np.testing.assert_array_equal(recording.read(), data[:, :expected])
+
+
+def test_not_a_chunked_recording(tmp_path):
+    filename = tmp_path / 'rec.otbc'
+    filename.write_bytes(b'not a recording')
+    with pytest.raises(ValueError):
+        ChunkedRecording(str(filename))
+
+
+def test_first_format_version_is_rejected(tmp_path):
+    filename = tmp_path / 'rec.otbc'
+    filename.write_bytes(b'OTBCHNK1' + bytes(64))
+    with pytest.raises(ValueError):
+        ChunkedRecording(str(filename))
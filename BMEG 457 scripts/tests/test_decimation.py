@@ -0,0 +1,73 @@
+"""Tests for app.core.decimation.MinMaxDecimator against a direct min/max over the same bins."""
+
+import numpy as np
+import pytest
+
+from app.core.decimation import MinMaxDecimator
+from app.core.ring_buffer import RingBuffer
+
+NCH = 2
+DT = 1 / 2000
+
+
+def expected_envelope(history, decimator):
+    """Brute-force (x, y) for the bins of the current window."""
+    bs = decimator.bin_size
+    total = history.shape[1]
+    last_bin = (total - 1) // bs
+    first_bin = last_bin - decimator.num_bins + 1
+    y = np.zeros((history.shape[0], 2 * decimator.num_bins))
+    x = np.empty(2 * decimator.num_bins)
+    for i, b in enumerate(range(first_bin, last_bin + 1)):
+        if b >= 0:  # bins before the first sample hold the ring's fill value
+            samples = history[:, b * bs:min((b + 1) * bs, total)]
+            y[:, 2 * i] = samples.min(axis=1)
+            y[:, 2 * i + 1] = samples.max(axis=1)
+        start = b * bs - (total - decimator.length)  # first sample of the bin, within the window
+        x[2 * i] = start * DT
+        x[2 * i + 1] = (start + bs - 1) * DT
+    x[-1] = (decimator.length - 1) * DT
+    return x, y
+
+
+@pytest.mark.parametrize('length, num_bins', [(400, 50), (400, 37), (1000, 1000), (300, 7)])
+def test_envelope_matches_direct_min_max(length, num_bins):
+    ring = RingBuffer(NCH, length)
+    decimator = MinMaxDecimator(NCH, length, num_bins, DT)
+    rng = np.random.default_rng(length + num_bins)
+    history = np.empty((NCH, 0))
+    # Packets of varying size, some longer than a bin or the whole window
+    for n in [1, 5, 125, 3, 64, 250, length + 33, 17, 125, 125, 2 * length, 9]:
+        block = rng.standard_normal((NCH, n))
+        ring.append_block(block)
+        history = np.concatenate([history, block], axis=1)
+        decimator.update(ring)
+
+        x, y = decimator.envelope()
+        expected_x, expected_y = expected_envelope(history, decimator)
+        np.testing.assert_array_equal(y, expected_y)
+        np.testing.assert_allclose(x, expected_x)
+
+
+def test_rebuild_matches_incremental_updates():
+    length, num_bins = 500, 40
+    ring = RingBuffer(NCH, length)
+    incremental = MinMaxDecimator(NCH, length, num_bins, DT)
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        ring.append_block(rng.standard_normal((NCH, 77)))
+        incremental.update(ring)
+
+    rebuilt = MinMaxDecimator(NCH, length, num_bins, DT)
+    rebuilt.rebuild(ring)
+    np.testing.assert_array_equal(rebuilt.envelope()[1], incremental.envelope()[1])
+
+
+def test_update_without_new_samples_is_a_no_op():
+    ring = RingBuffer(NCH, 100)
+    decimator = MinMaxDecimator(NCH, 100, 10, DT)
+    ring.append_block(np.arange(2 * 30, dtype=float).reshape(NCH, 30))
+    decimator.update(ring)
+    before = decimator.envelope()[1].copy()
+    decimator.update(ring)
+    np.testing.assert_array_equal(decimator.envelope()[1], before)
@@ -0,0 +1,47 @@
+"""Tests for the zero-copy device packet decode (app.data.data_receiver.decode_packet)."""
+
+import struct
+
+import numpy as np
+
+from app.data.data_receiver import decode_packet
+
+
+def struct_decode(data, nchannels):
+    """The original per-sample decode: struct.unpack into a (channels, samples) array."""
+    unpacked = struct.unpack(f'>{len(data) // 2}h', data)
+    return np.array(unpacked).reshape((-1, nchannels)).T
+
+
+def test_known_big_endian_buffer():
+    # 2 channels x 3 samples, interleaved by channel: (ch0, ch1) per sample
+    data = bytes.fromhex('0001 ffff'   # 1, -1
+                         '7fff 8000'   # 32767, -32768
+                         'fffe 0100')  # -2, 256
+    out = decode_packet(data, 2)
+    assert out.shape == (2, 3)
+    np.testing.assert_array_equal(out, [[1, 32767, -2], [-1, -32768, 256]])
+
+
+def test_values_that_wrap_int16():
+    # Unsigned 16-bit words above 0x7fff are negative int16 samples
+    words = [0x0000, 0x7fff, 0x8000, 0x8001, 0xffff, 0x1234]
+    data = b''.join(w.to_bytes(2, 'big') for w in words)
+    np.testing.assert_array_equal(decode_packet(data, 1)[0], [0, 32767, -32768, -32767, -1, 0x1234])
+
+
+def test_matches_struct_decode():
+    rng = np.random.default_rng(0)
+    for nchannels, samples in [(72, 125), (40, 250), (8, 1)]:
+        data = rng.integers(0, 256, 2 * nchannels * samples, dtype=np.uint8).tobytes()
+        out = decode_packet(data, nchannels)
+        assert out.shape == (nchannels, samples)
+        np.testing.assert_array_equal(out, struct_decode(data, nchannels))
+
+
+def test_decode_is_a_view_over_the_buffer():
+    buffer = bytearray((1).to_bytes(2, 'big') * 4)
+    out = decode_packet(memoryview(buffer), 2)
+    assert not out.flags.owndata
+    buffer[0:2] = (-5).to_bytes(2, 'big', signed=True)
+    assert out[0, 0] == -5
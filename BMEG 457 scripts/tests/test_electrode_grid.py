@@ -0,0 +1,113 @@
+"""Tests for the electrode layouts (app.core.electrode_grid)."""
+
+import numpy as np
+import pytest
+
+from app.core.electrode_grid import NEIGHBOR_OFFSETS_8, get_layout
+
+
+def expected_neighbors(grid, channel):
+    """Neighbor row for `channel` by walking NEIGHBOR_OFFSETS_8 on the index map."""
+    row, col = np.argwhere(grid.index_map == channel)[0]
+    out = []
+    for dr, dc in NEIGHBOR_OFFSETS_8:
+        r, c = row + dr, col + dc
+        out.append(grid.index_map[r, c] if 0 <= r < grid.rows and 0 <= c < grid.cols else -1)
+    return out
+
+
+def test_8x8_column_major_numbering():
+    grid = get_layout('8x8')
+    assert grid.shape == (8, 8)
+    assert grid.num_channels == 64 and grid.is_full
+    # Channel 0 at the bottom of column 0, numbered up each column
+    assert grid.index_map[7, 0] == 0
+    assert grid.index_map[0, 0] == 7
+    assert grid.index_map[7, 1] == 8
+    assert grid.index_map[0, 7] == 63
+
+
+def test_8x8_neighbors():
+    grid = get_layout('8x8')
+    # Order follows NEIGHBOR_OFFSETS_8: up, down, left, right, up-left, up-right, down-left, down-right
+    assert list(grid.neighbor_table[0]) == [1, -1, -1, 8, -1, 9, -1, -1]        # bottom-left corner
+    assert list(grid.neighbor_table[4]) == [5, 3, -1, 12, -1, 13, -1, 11]       # left edge
+    assert list(grid.neighbor_table[27]) == [28, 26, 19, 35, 20, 36, 18, 34]    # interior
+    assert list(grid.neighbor_table[63]) == [-1, 62, 55, -1, -1, -1, 54, -1]    # top-right corner
+    assert [len(n) for n in grid.neighbors[:3]] == [3, 5, 5]
+    for channel in range(grid.num_channels):
+        assert list(grid.neighbor_table[channel]) == expected_neighbors(grid, channel)
+
+
+def test_13x5_missing_corner():
+    grid = get_layout('13x5')
+    assert grid.shape == (13, 5)
+    assert grid.num_channels == 64 and not grid.is_full
+    assert grid.index_map[0, 0] == -1  # unused slot
+    assert grid.mask.sum() == 64
+    assert grid.index_map[12, 0] == 0
+    assert grid.index_map[1, 0] == 11   # column 0 holds 12 electrodes
+    assert grid.index_map[12, 1] == 12
+    assert grid.index_map[0, 1] == 24
+
+    # Neighbors of the unused slot are -1, never a channel
+    assert list(grid.neighbor_table[11]) == [-1, 10, -1, 23, -1, 24, -1, 22]
+    assert list(grid.neighbor_table[24]) == [-1, 23, -1, 37, -1, -1, 11, 36]
+    for channel in range(grid.num_channels):
+        assert list(grid.neighbor_table[channel]) == expected_neighbors(grid, channel)
+
+    grid_values = grid.to_grid(np.arange(64, dtype=float), fill=np.nan)
+    assert np.isnan(grid_values[0, 0])
+    assert np.isnan(grid_values).sum() == 1
+    assert grid.channel_numbers()[0, 0] == 0
+    np.testing.assert_array_equal(grid.to_channels(grid_values), np.arange(64))
+
+
+def test_4x8():
+    grid = get_layout('4x8')
+    assert grid.shape == (4, 8)
+    assert grid.num_channels == 32 and grid.is_full
+    assert grid.index_map[3, 0] == 0 and grid.index_map[0, 7] == 31
+    assert list(grid.neighbor_table[0]) == [1, -1, -1, 4, -1, 5, -1, -1]
+    assert list(grid.neighbor_table[3]) == [-1, 2, -1, 7, -1, -1, -1, 6]      # top-left corner
+
+
+def test_two_4x8_arrays_are_not_neighbors():
+    grid = get_layout('2x(4x8)')
+    single = get_layout('4x8')
+    assert grid.shape == (4, 17)  # 8 + gap column + 8
+    assert grid.num_channels == 64 and not grid.is_full
+    assert np.all(grid.index_map[:, 8] == -1)
+    np.testing.assert_array_equal(grid.index_map[:, :8], single.index_map)
+    np.testing.assert_array_equal(grid.index_map[:, 9:], single.index_map + 32)
+
+    # Right edge of the first array and left edge of the second face the gap
+    assert list(grid.neighbor_table[28]) == [29, -1, 24, -1, 25, -1, -1, -1]
+    assert list(grid.neighbor_table[32]) == [33, -1, -1, 36, -1, 37, -1, -1]
+    for channel in range(grid.num_channels):
+        assert np.all((grid.neighbors[channel] < 32) == (channel < 32))
+        # Same neighborhood as the channel in its own array
+        table = grid.neighbor_table[channel]
+        local = np.where(table >= 0, table % 32, -1)
+        np.testing.assert_array_equal(local, single.neighbor_table[channel % 32])
+
+
+@pytest.mark.parametrize('name', ['8x8', '13x5', '4x8', '2x(4x8)'])
+def test_to_grid_round_trip(name):
+    grid = get_layout(name)
+    values = np.arange(grid.num_channels) * 1.5
+    grid_values = grid.to_grid(values)
+    assert grid_values.shape == grid.shape
+    rows, cols = grid.channel_rows, grid.channel_cols
+    np.testing.assert_array_equal(grid_values[rows, cols], values)
+    np.testing.assert_array_equal(grid.to_channels(grid_values), values)
+    assert np.all(grid_values[~grid.mask] == 0.0)
+
+    # Extra channels (Buffer/Ramp after the grid) are ignored
+    padded = np.concatenate([values, [-1.0, -2.0]])
+    np.testing.assert_array_equal(grid.to_grid(padded), grid_values)
+
+
+def test_unknown_layout():
+    with pytest.raises(ValueError):
+        get_layout('3x3')
@@ -0,0 +1,63 @@
+"""Tests for the shared Butterworth design cache and the streaming filters."""
+
+import numpy as np
+import pytest
+
+from app.processing import filters
+
+FS = 2000
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    filters.clear_filter_cache()
+    yield
+    filters.clear_filter_cache()
+
+
+def packets(num_packets=6, nchannels=4, samples=FS // 16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.standard_normal((nchannels, samples)) for _ in range(num_packets)]
+
+
+def test_repeated_calls_hit_the_cache():
+    bandpass = filters.StreamingBandpass(low=20, high=450)
+    blocks = packets()
+    for block in blocks:  # as in the receiver loop: every packet at the same fs
+        filters.butter_bandpass(block, 20, 450, FS)
+        filters.notch(block, 60, FS)
+        bandpass.process(block, fs=FS)
+
+    info = filters.filter_cache_info()
+    # Three designs: (b, a) bandpass, (b, a) notch, SOS bandpass
+    assert info['misses'] == 3
+    assert info['size'] == 3
+    # butter_bandpass and notch look their design up on every call; the streaming
+    # filter designs once per fs and keeps the SOS array itself
+    assert info['hits'] == 2 * (len(blocks) - 1)
+
+
+def test_new_streaming_filters_reuse_cached_designs():
+    for block in packets(num_packets=3):
+        filters.StreamingNotch(freq=60).process(block, fs=FS)
+    info = filters.filter_cache_info()
+    assert info['misses'] == 1
+    assert info['hits'] == 2
+
+
+def test_new_sampling_frequency_is_a_new_design():
+    notch = filters.StreamingNotch(freq=60)
+    block = packets(num_packets=1)[0]
+    notch.process(block, fs=2000)
+    notch.process(block, fs=4000)
+    notch.process(block, fs=4000)
+    assert filters.filter_cache_info()['misses'] == 2
+
+
+def test_streaming_bandpass_matches_one_shot_filtering():
+    blocks = packets(num_packets=5, seed=1)
+    bandpass = filters.StreamingBandpass(low=20, high=450)
+    streamed = np.concatenate([bandpass.process(b, fs=FS) for b in blocks], axis=1)
+
+    whole = filters.StreamingBandpass(low=20, high=450).process(np.concatenate(blocks, axis=1), fs=FS)
+    np.testing.assert_allclose(streamed, whole, atol=1e-12)
@@ -0,0 +1,65 @@
+"""Spatially filtered heatmap on SoundtrackWindow's Heatmap tab (Qt offscreen)."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt5.QtWidgets')
+
+from app.data.device_simulator import SyntheticEMG
+from app.processing.pipeline import get_pipeline
+from app.processing.spatial import SpatialFilter
+
+
+def select_signal(window, kind):
+    window.heatmap_mode_selector.setCurrentIndex(window.heatmap_mode_selector.findData(kind))
+
+
+def spatial_packet(window, seed=0):
+    """What the receiver emits for the 'spatial' stage."""
+    device = window.device
+    raw = SyntheticEMG(device.nchannels, device.frequency, seed=seed).next_block(device.frequency // 16)
+    return get_pipeline('spatial').run(get_pipeline('filtered').run(raw))
+
+
+def test_spatial_stage_is_subscribed_only_while_shown(window):
+    subscriptions = window.receiver_thread.subscriptions
+    select_signal(window, 'ndd')
+    assert subscriptions.get('spatial', 0) == 0  # heatmap tab not visible yet
+
+    window.tabs.setCurrentWidget(window.heatmap_tab)
+    assert subscriptions['spatial'] == 1
+    window.tabs.setCurrentWidget(window.all_tracks_tab)
+    assert subscriptions['spatial'] == 0
+    window.tabs.setCurrentWidget(window.heatmap_tab)
+    select_signal(window, 'sd_long')
+    assert subscriptions['spatial'] == 1
+    select_signal(window, None)
+    assert subscriptions['spatial'] == 0
+
+
+@pytest.mark.parametrize('kind', ['ndd', 'sd_long', 'dd_trans'])
+def test_spatial_heatmap_shows_output_rms(window, kind):
+    window.tabs.setCurrentWidget(window.heatmap_tab)
+    select_signal(window, kind)
+    assert not window.update_heatmap()  # nothing received yet
+
+    packet = spatial_packet(window)
+    window.on_stage_output('spatial', packet)
+    assert window.update_heatmap()
+    assert not window.update_heatmap()  # no new packet since
+
+    assert packet.shape[0] == SpatialFilter(window.spatial_filter.grid, kind).num_outputs
+    rms = np.sqrt(np.mean(packet ** 2, axis=1))
+    output_grid = window.spatial_filter.output_grid
+    shown = window.heatmap_data[output_grid.mask]
+    np.testing.assert_allclose(shown, (rms / rms.max())[output_grid.index_map[output_grid.mask]])
+    assert (window.heatmap_data[~output_grid.mask] == 0).all()
+
+
+def test_packets_from_a_previous_filter_are_ignored(window):
+    window.tabs.setCurrentWidget(window.heatmap_tab)
+    select_signal(window, 'ndd')
+    stale = spatial_packet(window)
+    select_signal(window, 'sd_long')
+    window.on_stage_output('spatial', stale)
+    assert window.spatial_rms is None
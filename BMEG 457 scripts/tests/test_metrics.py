@@ -0,0 +1,112 @@
+"""Tests for the latency histograms (app.core.metrics) and the stats dialog that shows them."""
+
+import numpy as np
+import pytest
+
+from app.core.metrics import LatencyHistogram, LatencyMetrics, _bucket, _bucket_bounds
+
+
+def in_bucket_of(value_ns, estimate_ns):
+    """True if the estimate lies within the bucket holding `value_ns`."""
+    lower, upper = _bucket_bounds(_bucket(value_ns))
+    return lower <= estimate_ns <= upper
+
+
+def test_every_value_falls_inside_its_bucket():
+    values = sorted(set(range(0, 5000)) | {2 ** k + d for k in range(12, 40) for d in (-1, 0, 1)})
+    previous = -1
+    for ns in values:
+        bucket = _bucket(ns)
+        lower, upper = _bucket_bounds(bucket)
+        assert lower <= ns < upper
+        assert bucket >= previous  # buckets grow with the value
+        previous = bucket
+    # 4 buckets per power of two: relative bucket width at most 25%
+    lower, upper = _bucket_bounds(_bucket(10 ** 9))
+    assert (upper - lower) / lower <= 0.25
+
+
+def test_count_mean_max_and_percentiles():
+    histogram = LatencyHistogram()
+    values = np.arange(1, 1001) * 1000  # 1 us .. 1 ms
+    for ns in np.random.default_rng(0).permutation(values):
+        histogram.record(int(ns))
+
+    assert histogram.count == 1000
+    assert histogram.total_ns == values.sum()
+    assert histogram.max_ns == 1_000_000
+    for p, true_value in ((50, 500_000), (95, 950_000), (99, 990_000)):
+        assert in_bucket_of(true_value, histogram.percentile(p))
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 1000
+    assert snapshot['mean_ms'] == pytest.approx(values.mean() / 1e6)
+    assert snapshot['max_ms'] == 1.0
+    assert snapshot['total_ms'] == pytest.approx(values.sum() / 1e6)
+    assert in_bucket_of(500_000, snapshot['p50_ms'] * 1e6)
+    assert in_bucket_of(950_000, snapshot['p95_ms'] * 1e6)
+    assert in_bucket_of(990_000, snapshot['p99_ms'] * 1e6)
+    assert snapshot['p50_ms'] <= snapshot['p95_ms'] <= snapshot['p99_ms'] <= snapshot['max_ms']
+
+
+def test_outlier_and_max_cap():
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.record(2_000)
+    histogram.record(3_000_000)  # one slow packet
+    assert in_bucket_of(2_000, histogram.percentile(50))
+    assert in_bucket_of(2_000, histogram.percentile(99))
+    assert in_bucket_of(3_000_000, histogram.percentile(100))
+
+    single = LatencyHistogram()
+    single.record(1_024)  # bottom of the bucket [1024, 1280)
+    assert single.percentile(50) == 1_024  # bucket midpoint capped at the max
+
+
+def test_empty_and_reset():
+    histogram = LatencyHistogram()
+    assert histogram.snapshot() == {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0,
+                                    'p99_ms': 0.0, 'max_ms': 0.0, 'total_ms': 0.0}
+    histogram.record(5_000)
+    histogram.reset()
+    assert histogram.snapshot()['count'] == 0
+    assert histogram.max_ns == 0
+
+
+def test_latency_metrics_by_name():
+    metrics = LatencyMetrics()
+    metrics.record('decode', 1_000)
+    metrics.record('decode', 3_000)
+    metrics.record('filter', 10_000)
+    assert metrics.names() == ['decode', 'filter']
+
+    snapshot = metrics.snapshot()
+    assert snapshot['decode']['count'] == 2
+    assert snapshot['decode']['mean_ms'] == pytest.approx(0.002)
+    assert snapshot['filter']['max_ms'] == pytest.approx(0.01)
+
+    metrics.reset()
+    assert metrics.names() == ['decode', 'filter']
+    assert all(s['count'] == 0 for s in metrics.snapshot().values())
+
+
+def test_stats_dialog_refreshes_only_while_visible():
+    QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+    from app.ui.dialogs.dialogs import StatsDialog
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    calls = []
+    dialog = StatsDialog(None, lambda: calls.append(1) or {})
+    assert not dialog.timer.isActive()
+    assert not calls
+
+    dialog.show()
+    assert dialog.timer.isActive()
+    assert calls  # refreshed as soon as it is shown
+    dialog.hide()
+    assert not dialog.timer.isActive()
+    dialog.show()
+    assert dialog.timer.isActive()
+    dialog.close()
+    assert not dialog.timer.isActive()
+    app.processEvents()
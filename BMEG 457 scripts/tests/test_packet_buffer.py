@@ -0,0 +1,85 @@
+"""Tests for app.data.packet_buffer.PacketReassembler."""
+
+import itertools
+
+import pytest
+
+from app.data.packet_buffer import PacketReassembler
+
+
+class ChunkedSocket:
+    """Fake socket whose recv_into hands out a byte stream in fixed-pattern chunk sizes."""
+
+    def __init__(self, stream, chunk_sizes):
+        self.stream = stream
+        self.pos = 0
+        self.chunk_sizes = itertools.cycle(chunk_sizes)
+
+    def recv_into(self, buffer):
+        n = min(next(self.chunk_sizes), len(buffer), len(self.stream) - self.pos)
+        buffer[:n] = self.stream[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+def make_stream(packet_size, num_packets):
+    return bytes((i * 7 + i // 251) % 256 for i in range(packet_size * num_packets))
+
+
+def drain(reassembler, sock):
+    """Receive until the socket is exhausted, collecting every packet as bytes."""
+    packets = []
+    while reassembler.recv_into(sock):
+        packets.extend(bytes(p) for p in reassembler.packets())
+    return packets
+
+
+def test_partial_receives_reassemble_packets():
+    packet_size = 24
+    stream = make_stream(packet_size, 40)
+    reassembler = PacketReassembler(packet_size, capacity_packets=4)
+    packets = drain(reassembler, ChunkedSocket(stream, [5, 7, 3, 11]))
+
+    assert b''.join(packets) == stream
+    assert all(len(p) == packet_size for p in packets)
+    assert reassembler.packets_out == 40
+    assert len(reassembler) == 0
+
+
+def test_several_packets_in_one_recv():
+    packet_size = 10
+    stream = make_stream(packet_size, 30)
+    reassembler = PacketReassembler(packet_size, capacity_packets=8)
+    sock = ChunkedSocket(stream, [37])  # 3.7 packets per receive
+
+    assert reassembler.recv_into(sock) == 37
+    first = [bytes(p) for p in reassembler.packets()]
+    assert first == [stream[i * 10:(i + 1) * 10] for i in range(3)]
+    assert len(reassembler) == 7  # partial fourth packet kept for the next receive
+
+    packets = first + drain(reassembler, sock)
+    assert b''.join(packets) == stream
+
+
+def test_compaction_near_high_water_mark():
+    packet_size = 16
+    stream = make_stream(packet_size, 50)
+    reassembler = PacketReassembler(packet_size, capacity_packets=4, high_water=0.75)
+    # Odd sizes leave a partial packet behind, so the write end keeps reaching the
+    # end of the buffer with unread bytes that have to be moved to the front
+    packets = drain(reassembler, ChunkedSocket(stream, [53, 13, 29]))
+
+    assert b''.join(packets) == stream
+    stats = reassembler.get_stats()
+    assert stats['compactions'] > 0
+    assert stats['high_water_hits'] > 0
+    assert stats['peak_fill'] <= stats['capacity']
+    assert stats['bytes_received'] == len(stream)
+
+
+def test_unconsumed_buffer_raises():
+    reassembler = PacketReassembler(8, capacity_packets=2)
+    sock = ChunkedSocket(make_stream(8, 4), [16])
+    assert reassembler.recv_into(sock) == 16
+    with pytest.raises(BufferError):
+        reassembler.recv_into(sock)
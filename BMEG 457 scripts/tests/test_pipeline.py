@@ -0,0 +1,85 @@
+"""Tests for PipelineGraph stage evaluation and subscriptions."""
+
+import numpy as np
+import pytest
+
+from app.processing import filters
+from app.processing.pipeline import build_receiver_graph, clear_pipelines, get_pipeline
+
+FS = 2000
+
+
+@pytest.fixture(autouse=True)
+def fresh_pipelines():
+    clear_pipelines()
+    yield
+    clear_pipelines()
+
+
+class CountingStage:
+    def __init__(self):
+        self.calls = 0
+        self.resets = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return data
+
+    def reset(self):
+        self.resets += 1
+
+
+def test_only_needed_stages_run():
+    stage = CountingStage()
+    get_pipeline('filtered').add_stage(stage)
+    graph = build_receiver_graph()
+    block = np.zeros((4, 8))
+
+    assert set(graph.run(block)) == {'raw'}
+    graph.subscribe('rectified')
+    assert set(graph.run(block)) == {'raw', 'filtered', 'rectified'}
+    assert stage.calls == 1
+
+
+def test_stage_resets_when_resumed_after_a_gap():
+    stage = CountingStage()
+    get_pipeline('filtered').add_stage(stage)
+    get_pipeline('filtered').add_reset_hook(stage.reset)
+    graph = build_receiver_graph()
+    block = np.zeros((4, 8))
+
+    graph.subscribe('filtered')
+    graph.run(block)
+    graph.run(block)
+    assert stage.resets == 1  # first run only; consecutive blocks keep their state
+
+    graph.unsubscribe('filtered')
+    graph.run(block)
+    graph.subscribe('filtered')
+    graph.run(block)
+    assert stage.resets == 2
+
+    graph.unsubscribe('filtered')
+    graph.run(block)
+    graph.subscribe('spatial')  # 'filtered' also resumes as the source of 'spatial'
+    graph.run(block)
+    assert stage.resets == 3
+
+
+def test_resumed_streaming_filter_has_no_stale_transient():
+    bandpass = filters.StreamingBandpass(low=20, high=450)
+    get_pipeline('filtered').add_stage(lambda data: bandpass.process(data, fs=FS))
+    get_pipeline('filtered').add_reset_hook(bandpass.reset)
+    graph = build_receiver_graph()
+    rng = np.random.default_rng(0)
+
+    graph.subscribe('filtered')
+    graph.run(1000 * rng.standard_normal((2, FS // 16)))  # loud signal leaves large filter state
+    graph.unsubscribe('filtered')
+    graph.run(rng.standard_normal((2, FS // 16)))  # packet nobody filters
+
+    quiet = rng.standard_normal((2, FS // 16))
+    graph.subscribe('filtered')
+    resumed = graph.run(quiet)['filtered']
+    expected = filters.StreamingBandpass(low=20, high=450).process(quiet, fs=FS)
+    np.testing.assert_allclose(resumed, expected)
@@ -0,0 +1,126 @@
+"""Tests for sample-loss detection from the Ramp counter (app.data.ramp_monitor)."""
+
+import numpy as np
+
+from app.data.device_simulator import SyntheticEMG
+from app.data.ramp_monitor import RampMonitor, accessory_channels
+
+NCH = 72
+FS = 2000
+PACKET = FS // 16
+
+
+def make_monitor():
+    buffer_channel, ramp_channel = accessory_channels(NCH)
+    return RampMonitor(ramp_channel, buffer_channel)
+
+
+def packets(num_packets, start_sample=0):
+    """Simulator packets whose ramp starts at `start_sample`."""
+    signal = SyntheticEMG(NCH, FS, seed=0)
+    signal.sample = start_sample
+    return [signal.next_block(PACKET) for _ in range(num_packets)]
+
+
+def test_accessory_channels():
+    assert accessory_channels(72) == (70, 71)
+    assert accessory_channels(40) == (38, 39)
+    assert accessory_channels(8) is None
+
+
+def test_continuous_stream_across_int16_wrap():
+    monitor = make_monitor()
+    # Ramp runs through 32767 -> -32768 inside a packet and across packet boundaries
+    blocks = packets(4, start_sample=2 ** 15 - PACKET - 10)
+    ramp = np.concatenate([b[71] for b in blocks])
+    assert 32767 in ramp and -32768 in ramp
+    assert [monitor.check(b) for b in blocks] == [0, 0, 0, 0]
+
+    stats = monitor.get_stats()
+    assert stats['samples_checked'] == 4 * PACKET
+    assert stats['lost_samples'] == stats['gaps'] == stats['repeated_samples'] == 0
+    assert stats['buffer_level'] == stats['buffer_max'] == 0
+
+
+def test_first_packet_after_construction_has_no_reference():
+    monitor = make_monitor()
+    assert monitor.check(packets(1, start_sample=12345)[0]) == 0  # any starting value is fine
+    monitor.reset()
+    assert monitor.check(packets(1, start_sample=999)[0]) == 0
+    assert monitor.get_stats()['samples_checked'] == PACKET
+
+
+def test_gap_between_packets():
+    monitor = make_monitor()
+    blocks = packets(6)
+    for k in (1, 7, PACKET):
+        monitor.reset()
+        monitor.check(blocks[0])
+        # Skip k samples: the next packet starts k samples later than expected
+        late = packets(1, start_sample=PACKET + k)[0]
+        assert monitor.check(late) == k
+        assert monitor.get_stats()['gaps'] == 1
+
+
+def test_gap_inside_a_packet_and_across_the_wrap():
+    monitor = make_monitor()
+    block = packets(1, start_sample=2 ** 15 - 50)[0]
+    block[71, 60:] += 5  # 5 samples missing right after the wrap (int16 arithmetic wraps too)
+    assert monitor.check(block) == 5
+    stats = monitor.get_stats()
+    assert stats['lost_samples'] == 5
+    assert stats['gaps'] == 1
+    assert 0 < stats['loss_ratio'] < 1
+
+
+def test_repeated_sample():
+    monitor = make_monitor()
+    first, second = packets(2)
+    second[71, 0] = first[71, -1]  # last sample sent twice
+    second[71, 1:] -= 1
+    assert monitor.check(first) == 0
+    assert monitor.check(second) == 0
+    stats = monitor.get_stats()
+    assert stats['repeated_samples'] == 1
+    assert stats['lost_samples'] == 0
+
+
+def test_buffer_level_is_tracked():
+    monitor = make_monitor()
+    blocks = packets(3)
+    for level, block in zip((10, 700, 40), blocks):
+        block[70] = level
+        monitor.check(block)
+    stats = monitor.get_stats()
+    assert stats['buffer_level'] == 40
+    assert stats['buffer_max'] == 700
+
+
+def test_counter_restart_is_a_resync_not_a_loss():
+    monitor = make_monitor()
+    first = packets(1, start_sample=102 - PACKET + 1)[0]  # ends at ramp 102
+    assert first[71, -1] == 102
+    assert monitor.check(first) == 0
+    # Device restarted its stream: the ramp starts again from 0
+    restarted = packets(2)
+    assert monitor.check(restarted[0]) == 0
+    assert monitor.check(restarted[1]) == 0  # continues from the new value
+    stats = monitor.get_stats()
+    assert stats['resyncs'] == 1
+    assert stats['lost_samples'] == stats['gaps'] == 0
+
+    # A restart inside a packet
+    block = packets(1, start_sample=2 * PACKET)[0]
+    block[71, 40:] = np.arange(PACKET - 40)
+    assert monitor.check(block) == 0
+    assert monitor.get_stats()['resyncs'] == 2  # one between packets, one inside
+    monitor.reset()
+    assert monitor.get_stats()['resyncs'] == 0
+
+
+def test_large_forward_gap_is_still_a_loss():
+    monitor = make_monitor()
+    monitor.check(packets(1)[0])
+    late = packets(1, start_sample=PACKET + 2 ** 15 - 1)[0]
+    assert monitor.check(late) == 2 ** 15 - 1
+    assert monitor.get_stats()['resyncs'] == 0
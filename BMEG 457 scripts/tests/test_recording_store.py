@@ -0,0 +1,35 @@
+"""Tests for app.data.recording_store.ChunkedSampleStore."""
+
+import numpy as np
+
+from app.data.recording_store import ChunkedSampleStore
+from tests.helpers import FS, PACKET, bursty_packets
+
+
+def test_timestamps_are_monotonic_for_bursty_packets():
+    store = ChunkedSampleStore(3, FS, chunk_samples=300)  # chunks smaller than packets
+    data, anchors = bursty_packets()
+    for block, anchor in zip(data, anchors):
+        store.append(block, anchor)
+
+    timestamps = store.timestamps()
+    assert np.all(np.diff(timestamps) > 0)
+    np.testing.assert_allclose(timestamps, anchors[0] + np.arange(store.num_samples) / FS)
+    np.testing.assert_allclose(store.timestamps(250, 260), timestamps[250:260])
+    np.testing.assert_array_equal(store.to_array(), np.concatenate(data, axis=1))
+
+
+def test_without_sampling_frequency_samples_get_packet_anchor():
+    store = ChunkedSampleStore(3)
+    data, anchors = bursty_packets(num_packets=3)
+    for block, anchor in zip(data, anchors):
+        store.append(block, anchor)
+    np.testing.assert_allclose(store.timestamps(), np.repeat(anchors, PACKET))
+
+
+def test_max_samples_caps_the_store():
+    store = ChunkedSampleStore(3, FS)
+    data, anchors = bursty_packets(num_packets=3)
+    stored = [store.append(block, anchor, max_samples=300) for block, anchor in zip(data, anchors)]
+    assert stored == [PACKET, PACKET, 300 - 2 * PACKET]
+    assert len(store) == 300
@@ -0,0 +1,215 @@
+"""Tests for replaying recordings through the receive path (app.data.replay)."""
+
+import io
+import socket
+import tarfile
+import time
+
+import numpy as np
+import pytest
+
+from app.data.binary_recording import BinarySink
+from app.data.chunked_recording import ChunkedSink
+from app.data.data_receiver import decode_packet
+from app.data.packet_buffer import PacketReassembler
+from app.data.replay import ReplayDevice, ReplaySocket, load_recording
+
+FS = 2000
+PACKET = FS // 16
+NCH = 72
+
+
+def make_data(nchannels=NCH, num_samples=4 * PACKET + 30, seed=0):
+    """Random samples; the 30 trailing samples do not fill a packet."""
+    return np.random.default_rng(seed).integers(-32768, 32768, (nchannels, num_samples), dtype=np.int16)
+
+
+def add_member(archive, name, payload):
+    info = tarfile.TarInfo(name)
+    info.size = len(payload)
+    archive.addfile(info, io.BytesIO(payload))
+
+
+def sig_bytes(data):
+    """OT BioLab .sig payload: little-endian int16, interleaved by channel."""
+    return data.T.astype('<i2').tobytes()
+
+
+def write_bin(filename, data):
+    sink = BinarySink(filename, data.shape[0], FS)
+    sink.write(data, 0.0)
+    sink.close()
+
+
+def write_otbc(filename, data):
+    sink = ChunkedSink(filename, data.shape[0], FS)
+    sink.write(data, 0.0)
+    sink.close()
+
+
+def write_otb_plus(filename, data):
+    with tarfile.open(filename, 'w') as archive:
+        add_member(archive, 'rec.xml', (f'<Device DeviceTotalChannels="{data.shape[0]}" '
+                                        f'SampleFrequency="{FS}" ad_bits="16"/>').encode())
+        add_member(archive, 'rec.sig', sig_bytes(data))
+
+
+def write_otb4(filename, data):
+    # Two tracks share the main stream; a smaller second stream must be ignored
+    tracks = ''.join(f'<TrackInfo><SignalStreamPath>{path}</SignalStreamPath>'
+                     f'<NumberOfChannels>{n}</NumberOfChannels><SamplingFrequency>{FS}</SamplingFrequency>'
+                     f'<ADC_Nbits>16</ADC_Nbits></TrackInfo>'
+                     for path, n in (('main.sig', 64), ('main.sig', data.shape[0] - 64), ('aux.sig', 2)))
+    with tarfile.open(filename, 'w') as archive:
+        add_member(archive, 'Tracks_000.xml', f'<ArrayOfTrackInfo>{tracks}</ArrayOfTrackInfo>'.encode())
+        add_member(archive, 'main.sig', sig_bytes(data))
+        add_member(archive, 'aux.sig', sig_bytes(make_data(2, 100, seed=1)))
+
+
+WRITERS = {'.bin': write_bin, '.otbc': write_otbc, '.otb+': write_otb_plus, '.otb4': write_otb4}
+
+
+def make_recording(tmp_path, ext, data):
+    filename = str(tmp_path / f'rec{ext}')
+    WRITERS[ext](filename, data)
+    return filename
+
+
+def drain(sock, packet_bytes, max_recv=None):
+    """Receive through a PacketReassembler until the socket returns 0; return the packets as bytes."""
+    reassembler = PacketReassembler(packet_bytes)
+    if max_recv is not None:
+        recv_into = sock.recv_into
+        sock.recv_into = lambda buffer, nbytes=0: recv_into(buffer, max_recv)
+    packets = []
+    while reassembler.recv_into(sock):
+        packets += [bytes(p) for p in reassembler.packets()]
+    assert len(reassembler) == 0
+    return packets
+
+
+@pytest.mark.parametrize('ext', sorted(WRITERS))
+def test_load_recording(tmp_path, ext):
+    data = make_data()
+    replayed, frequency = load_recording(make_recording(tmp_path, ext, data))
+    assert frequency == FS
+    assert replayed.dtype == np.int16
+    np.testing.assert_array_equal(replayed, data)
+
+
+@pytest.mark.parametrize('ext', sorted(WRITERS))
+def test_replay_packets_through_the_reassembler(tmp_path, ext):
+    data = make_data()
+    device = ReplayDevice(make_recording(tmp_path, ext, data), speed=0)
+    device.start_server()
+    device.send_command(device.create_command(GO=1))
+    sock = device.client_socket
+
+    packets = drain(sock, NCH * 2 * PACKET)
+    assert len(packets) == 4  # the incomplete last packet is not sent
+    for k, packet in enumerate(packets):
+        np.testing.assert_array_equal(decode_packet(packet, NCH), data[:, k * PACKET:(k + 1) * PACKET])
+    assert sock.finished
+    assert sock.recv_into(bytearray(16)) == 0
+    assert sock.position == sock.duration == 4 / 16
+
+
+def test_packets_are_big_endian_and_interleaved():
+    data = np.zeros((2, PACKET), dtype=np.int16)
+    data[0, 0], data[1, 0], data[0, 1] = 0x0102, -2, 0x7fff
+    sock = ReplaySocket(data, FS, speed=0)
+    sock.start()
+    buffer = bytearray(2 * 2 * PACKET)
+    assert sock.recv_into(buffer) == len(buffer)
+    assert bytes(buffer[:6]) == bytes.fromhex('0102 fffe 7fff')
+
+
+def test_partial_reads():
+    data = make_data()
+    packet_bytes = NCH * 2 * PACKET
+    sock = ReplaySocket(data, FS, speed=0)
+    sock.start()
+    # 7-byte reads never line up with samples or packets
+    packets = drain(sock, packet_bytes, max_recv=7)
+    assert b''.join(packets) == data[:, :4 * PACKET].T.astype('>i2').tobytes()
+
+    sock = ReplaySocket(data, FS, speed=0)
+    sock.start()
+    small = bytearray(1000)
+    assert sock.recv_into(small) == 1000
+    assert not sock.finished
+    assert sock.recv_into(small, 10) == 10
+    assert sock.packet_index == 1  # still inside the first packet
+
+
+def test_pacing():
+    data = make_data(num_samples=8 * PACKET)
+    packet_bytes = NCH * 2 * PACKET
+
+    sock = ReplaySocket(data, FS, speed=0)
+    sock.start()
+    start = time.perf_counter()
+    assert len(drain(sock, packet_bytes)) == 8
+    unthrottled = time.perf_counter() - start
+
+    sock = ReplaySocket(data, FS, speed=8)  # one packet every 1/128 s
+    sock.start()
+    start = time.perf_counter()
+    assert len(drain(sock, packet_bytes)) == 8
+    paced = time.perf_counter() - start
+    assert paced >= 7 / 128
+    assert unthrottled < paced
+
+
+def test_timeouts_and_close():
+    data = make_data(num_samples=2 * PACKET)
+    sock = ReplaySocket(data, FS, speed=0.5)  # second packet due after 125 ms
+    sock.settimeout(0.01)
+    with pytest.raises(socket.timeout):
+        sock.recv_into(bytearray(16))  # no GO yet
+    sock.start()
+    buffer = bytearray(NCH * 2 * PACKET)
+    assert sock.recv_into(buffer) == len(buffer)
+    with pytest.raises(socket.timeout):
+        sock.recv_into(buffer)
+    sock.close()
+    with pytest.raises(OSError):
+        sock.recv_into(buffer)
+
+
+@pytest.mark.parametrize('ext, has_ramp', [('.bin', True), ('.otbc', True), ('.otb+', False), ('.otb4', False)])
+def test_otb_archives_have_no_ramp(tmp_path, ext, has_ramp):
+    pytest.importorskip('PyQt5.QtCore')
+    from app.data.data_receiver import DataReceiverThread
+    from app.processing.pipeline import clear_pipelines
+
+    device = ReplayDevice(make_recording(tmp_path, ext, make_data()), speed=0)
+    assert device.has_ramp is has_ramp
+    device.start_server()
+    clear_pipelines()
+    try:
+        receiver = DataReceiverThread(device, device.client_socket, [])
+        # The receiver only checks continuity when the source carries a Ramp channel
+        assert (receiver.ramp_monitor is not None) is has_ramp
+        assert (receiver.get_metrics()['continuity'] is not None) is has_ramp
+    finally:
+        clear_pipelines()
+
+
+def test_otb_tracks_are_not_labelled_buffer_and_ramp(tmp_path):
+    QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+    from app.processing.pipeline import clear_pipelines
+    from app.ui.windows.main_window import SoundtrackWindow
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    clear_pipelines()
+    try:
+        device = ReplayDevice(make_recording(tmp_path, '.otb+', make_data()), speed=0)
+        window = SoundtrackWindow(device)
+        titles = window.track_manager.get_track_titles()
+        assert 'Buffer' not in titles and 'Ramp' not in titles
+        assert titles[-2:] == ['Channel 71', 'Channel 72']
+        window.close()
+    finally:
+        clear_pipelines()
+        app.processEvents()
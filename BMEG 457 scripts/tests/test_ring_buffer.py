@@ -0,0 +1,71 @@
+"""Tests for app.core.ring_buffer.RingBuffer against a plain history array."""
+
+import numpy as np
+
+from app.core.ring_buffer import RingBuffer
+
+NCH = 3
+LENGTH = 50
+
+
+def expected_window(history, length, fill_value=0):
+    """The newest `length` samples of `history`, left-padded with fill_value."""
+    window = np.full((history.shape[0], length), fill_value, dtype=np.float64)
+    n = min(history.shape[1], length)
+    if n:
+        window[:, length - n:] = history[:, history.shape[1] - n:]
+    return window
+
+
+def feed(ring, block_sizes, seed=0):
+    """Append random blocks, checking every view against brute force after each one."""
+    rng = np.random.default_rng(seed)
+    history = np.empty((ring.num_channels, 0))
+    for n in block_sizes:
+        block = rng.standard_normal((ring.num_channels, n))
+        ring.append_block(block)
+        history = np.concatenate([history, block], axis=1)
+
+        window = expected_window(history, ring.length, ring.fill_value)
+        np.testing.assert_array_equal(ring.ordered_view(), window)
+        for k in (1, 7, ring.length):
+            np.testing.assert_array_equal(ring.latest(k), window[:, ring.length - k:])
+        assert len(ring) == min(history.shape[1], ring.length)
+        assert ring.total == history.shape[1]
+    return history
+
+
+def test_wraparound_with_small_blocks():
+    ring = RingBuffer(NCH, LENGTH)
+    feed(ring, [7] * 30)  # wraps several times, blocks straddle the end of the ring
+
+
+def test_blocks_at_and_past_capacity():
+    ring = RingBuffer(NCH, LENGTH)
+    feed(ring, [LENGTH - 1, 1, LENGTH, 3, LENGTH + 17, 2 * LENGTH + 5, 49, 1])
+
+
+def test_fill_value_before_the_ring_is_full():
+    ring = RingBuffer(NCH, LENGTH, fill_value=np.nan)
+    ring.append_block(np.ones((NCH, 10)))
+    view = ring.ordered_view()
+    assert np.isnan(view[:, :LENGTH - 10]).all()
+    assert (view[:, LENGTH - 10:] == 1).all()
+
+
+def test_resized_keeps_newest_samples():
+    ring = RingBuffer(NCH, LENGTH)
+    history = feed(ring, [13] * 9)
+    for length in (20, LENGTH, 80):
+        resized = ring.resized(length)
+        assert resized.length == length
+        np.testing.assert_array_equal(resized.ordered_view(), expected_window(history[:, -LENGTH:], length))
+
+
+def test_clear():
+    ring = RingBuffer(NCH, LENGTH)
+    feed(ring, [30, 30])
+    ring.clear()
+    assert len(ring) == 0 and ring.index == 0
+    assert (ring.ordered_view() == 0).all()
+    feed(ring, [11] * 6, seed=1)
@@ -0,0 +1,84 @@
+"""Tests for app.processing.spatial.SpatialFilter."""
+
+import numpy as np
+import pytest
+
+from app.core.electrode_grid import get_layout
+from app.processing.spatial import SPATIAL_FILTERS, SpatialFilter
+
+# Number of outputs on the 8x8 grid: differentials lose one (SD) or two (DD) rows/columns
+OUTPUTS_8X8 = {'sd_long': 56, 'sd_trans': 56, 'dd_long': 48, 'dd_trans': 48, 'ndd': 36}
+
+
+def filtered_grid(kind, grid, values):
+    """Apply the filter and lay the outputs out at their stencil centers (NaN elsewhere)."""
+    spatial = SpatialFilter(grid, kind)
+    return spatial.output_grid.to_grid(spatial.apply(values), fill=np.nan)
+
+
+@pytest.fixture
+def grid_values():
+    grid = get_layout('8x8')
+    values = np.random.default_rng(0).normal(size=grid.shape)
+    return grid, values, grid.to_channels(values)
+
+
+def test_single_differentials_match_np_diff(grid_values):
+    grid, values, channels = grid_values
+    np.testing.assert_allclose(filtered_grid('sd_long', grid, channels)[:-1], -np.diff(values, axis=0))
+    np.testing.assert_allclose(filtered_grid('sd_trans', grid, channels)[:, :-1], -np.diff(values, axis=1))
+
+
+def test_double_differentials_match_np_diff(grid_values):
+    grid, values, channels = grid_values
+    np.testing.assert_allclose(filtered_grid('dd_long', grid, channels)[1:-1], -np.diff(values, n=2, axis=0))
+    np.testing.assert_allclose(filtered_grid('dd_trans', grid, channels)[:, 1:-1], -np.diff(values, n=2, axis=1))
+
+
+def test_ndd_matches_hand_computed_laplacian(grid_values):
+    grid, values, channels = grid_values
+    laplacian = (4 * values[1:-1, 1:-1] - values[:-2, 1:-1] - values[2:, 1:-1]
+                 - values[1:-1, :-2] - values[1:-1, 2:])
+    np.testing.assert_allclose(filtered_grid('ndd', grid, channels)[1:-1, 1:-1], laplacian)
+
+    # On a quadratic surface v = r^2 + 3c the Laplacian is the same everywhere
+    rows, cols = np.mgrid[0:8, 0:8]
+    surface = grid.to_channels((rows ** 2 + 3 * cols).astype(float))
+    np.testing.assert_allclose(SpatialFilter(grid, 'ndd').apply(surface), -2.0)
+
+
+@pytest.mark.parametrize('kind', sorted(SPATIAL_FILTERS))
+def test_output_shapes(grid_values, kind):
+    grid, _, _ = grid_values
+    spatial = SpatialFilter(grid, kind)
+    assert spatial.num_outputs == OUTPUTS_8X8[kind]
+    assert spatial.matrix.shape == (OUTPUTS_8X8[kind], 64)
+    assert spatial.output_grid.shape == grid.shape
+    assert spatial.output_grid.num_channels == OUTPUTS_8X8[kind]
+    assert np.all(np.diff(spatial.centers) > 0)
+
+    block = np.ones((66, 125), dtype=np.int16)  # grid + Buffer/Ramp
+    assert spatial.process(block).shape == (OUTPUTS_8X8[kind], 125)
+    assert spatial.apply(np.ones(64)).shape == (OUTPUTS_8X8[kind],)
+    # Stencil weights sum to zero: a constant signal is removed
+    np.testing.assert_allclose(spatial.process(block), 0.0)
+
+
+def test_missing_electrode_has_no_output():
+    grid = get_layout('13x5')
+    values = np.random.default_rng(1).normal(size=grid.shape)
+    channels = grid.to_channels(values)
+
+    sd_long = SpatialFilter(grid, 'sd_long')
+    assert sd_long.num_outputs == 11 + 4 * 12  # column 0 has 12 electrodes
+    out = sd_long.output_grid.to_grid(sd_long.apply(channels), fill=np.nan)
+    assert np.isnan(out[0, 0])
+    np.testing.assert_allclose(out[1:-1, 0], -np.diff(values[1:, 0]))
+    np.testing.assert_allclose(out[:-1, 1:], -np.diff(values[:, 1:], axis=0))
+
+    assert SpatialFilter(grid, 'ndd').num_outputs == 11 * 3
+
+
+def test_unknown_filter():
+    with pytest.raises(ValueError):
+        SpatialFilter(get_layout('8x8'), 'tripole')